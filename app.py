@@ -1,8 +1,15 @@
-from flask import Flask, request
+from flask import Flask, Response, jsonify, request
 from dotenv import load_dotenv
+import atexit
 import os
-import requests
-from services.ai_service import get_ai_response
+from services.ai_service import ai_cache_stats, ai_client_stats
+from services.intent_engine import handle_traitbuddy_parts, intent_stats
+from services.info_service import info_cache_stats
+from services.occupancy import get_occupancy, occupancy_stream
+from services.webhook_messages import MessageDeduper, extract_messages
+from services.webhook_worker import WebhookWorkerPool
+from services.whatsapp_sender import OutboundSender
+from db.database import pool_stats
 from datetime import datetime
 
 load_dotenv()
@@ -10,8 +17,6 @@ load_dotenv()
 app = Flask(__name__)
 
 VERIFY_TOKEN = os.getenv("VERIFY_TOKEN")
-WHATSAPP_TOKEN = os.getenv("WHATSAPP_TOKEN")
-PHONE_NUMBER_ID = os.getenv("PHONE_NUMBER_ID")
 
 
 @app.route("/webhook", methods=["GET"])
@@ -28,77 +33,94 @@ def verify_webhook():
 
 @app.route("/webhook", methods=["POST"])
 def receive_message():
+    # Acknowledge right away; Meta retries deliveries that take too long,
+    # which used to make us answer the same message twice.
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or "entry" not in data:
+        return "Invalid payload", 400
+
+    if not webhook_pool.submit(data):
+        print("⚠️ Webhook queue full (or shutting down), asking Meta to retry later")
+        return "Busy", 503
+
+    return "EVENT_RECEIVED", 200
+
+
+def process_webhook(data):
+    """Runs on a webhook worker thread; one call per delivery (which may hold several messages)."""
     print("="*50)
-    print("🔔 WEBHOOK POST REQUEST RECEIVED!")
-    print("="*50)
-    data = request.get_json()
+    print("🔔 WEBHOOK PAYLOAD")
     print("INCOMING DATA:", data)
     print("="*50)
 
-    try:
-        value = data["entry"][0]["changes"][0]["value"]
+    # Meta retries deliveries and may batch messages: handle every message once
+    messages = message_deduper.filter_new(extract_messages(data))
 
-        # ❌ Ignore non-message events (status, etc.)
-        if "messages" not in value:
-            return "EVENT_RECEIVED", 200
+    for message in messages:
+        # ❌ Ignore non-text messages for now
+        if message.type != "text" or not message.text:
+            continue
 
-        message = value["messages"][0]
+        print("FROM:", message.sender)
+        print("TEXT:", message.text)
 
-        # ❌ Ignore non-text messages for now
-        if "text" not in message:
-            return "EVENT_RECEIVED", 200
+        try:
+            # long AI answers go out part by part while Gemini is still writing
+            for reply in handle_traitbuddy_parts(message.text):
+                send_message(message.sender, reply)
+        except Exception as e:
+            print("ERROR:", e)
 
-        text = message["text"]["body"]
-        sender = message["from"]
 
-        print("FROM:", sender)
-        print("TEXT:", text)
+message_deduper = MessageDeduper()
+webhook_pool = WebhookWorkerPool(process_webhook)
 
-        reply = handle_traitbuddy(text)
-        send_message(sender, reply)
 
-    except Exception as e:
-        print("ERROR:", e)
+@app.route("/occupancy", methods=["GET"])
+def occupancy():
+    return jsonify(get_occupancy().snapshot().as_dict())
 
-    return "EVENT_RECEIVED", 200
 
+@app.route("/occupancy/stream", methods=["GET"])
+def occupancy_feed():
+    # Dashboards use EventSource("/occupancy/stream"); needs a threaded server
+    return Response(
+        occupancy_stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
-def send_message(to, text):
-    url = f"https://graph.facebook.com/v24.0/{PHONE_NUMBER_ID}/messages"
-    headers = {
-        "Authorization": f"Bearer {WHATSAPP_TOKEN}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "messaging_product": "whatsapp",
-        "to": to,
-        "text": {"body": text}
-    }
+@app.route("/stats", methods=["GET"])
+def stats():
+    return jsonify({
+        "db_pool": pool_stats(),
+        "info_cache": info_cache_stats(),
+        "webhook": webhook_pool.stats(),
+        "webhook_messages": message_deduper.stats(),
+        "outbound": outbound.stats(),
+        "intents": intent_stats(),
+        "ai_cache": ai_cache_stats(),
+        "ai_client": ai_client_stats(),
+    })
 
-    response = requests.post(url, json=payload, headers=headers)
-    print("SEND STATUS:", response.status_code, response.text)
 
+def send_message(to, text):
+    # Durable, rate-limited and retried; see services/whatsapp_sender.py
+    outbound.send(to, text)
 
-def handle_traitbuddy(text):
-    text_lower = text.lower()
 
-    if "meeting summary" in text_lower:
-        mom_file = "data/meeting_minutes.txt"
-        if os.path.exists(mom_file):
-            with open(mom_file, "r") as f:
-                return f"📄 {f.read()}"
-        return "📄 No meeting summary available yet."
+outbound = OutboundSender()
 
-    if "attendance" in text_lower:
-        return "📊 Attendance system is active."
 
-    # fallback to AI
-    try:
-        return get_ai_response(text)
-    except:
-        return "🤖 I’m TRAIT Buddy. Try typing *attendance* or *help*."
+@atexit.register
+def shutdown():
+    # Finish queued webhooks first; their replies land in the outbox, and
+    # whatever the sender can't finish is sent after the next start.
+    webhook_pool.stop()
+    outbound.stop()
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # no reloader: it would start a second process with its own worker pool
+    app.run(host="0.0.0.0", port=5000, debug=True, use_reloader=False, threaded=True)
@@ -0,0 +1,191 @@
+"""
+Async WhatsApp webhook server: same endpoints and replies as app.py, but on
+asyncio (Starlette + asyncpg + httpx), so slow Gemini calls and Graph API
+sends wait on the event loop instead of holding worker threads.
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+
+Dedupe and the outbox use asyncpg. Answers from the attendance/info
+services still run on the sync psycopg2 pool in threads, at most
+DB_POOL_MAX at a time (services/intent_engine.py); raise DB_POOL_MAX with
+ASGI_PROCESS_CONCURRENCY if local answers queue up.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from db.async_database import ASYNC_UNAVAILABLE_ERRORS, async_pool_stats, close_async_pool, get_async_pool
+from db.migrate import ensure_schema
+from db.processed_messages import claim_message_ids_async, purge_processed_messages_async
+from services.ai_service import ai_cache_stats, ai_client_stats
+from services.async_sender import AsyncOutboundSender, make_graph_client
+from services.intent_engine import handle_traitbuddy_parts_async, intent_stats
+from services.occupancy import get_occupancy, occupancy_stream_async
+from services.webhook_messages import MessageDeduper, extract_messages, persisted_ids
+
+load_dotenv()
+
+VERIFY_TOKEN = os.getenv("VERIFY_TOKEN")
+# Deliveries accepted but not finished; beyond this the webhook answers 503
+ASGI_MAX_IN_FLIGHT = int(os.getenv("ASGI_MAX_IN_FLIGHT", "500"))
+# Of those, how many are worked on at once (each may be waiting on Gemini)
+ASGI_PROCESS_CONCURRENCY = int(os.getenv("ASGI_PROCESS_CONCURRENCY", "100"))
+
+
+class WebhookProcessor:
+    """One task per accepted delivery, at most ``max_in_flight`` at a time."""
+
+    def __init__(self, pool, deduper: MessageDeduper, sender: AsyncOutboundSender,
+                 max_in_flight: int = ASGI_MAX_IN_FLIGHT, concurrency: int = ASGI_PROCESS_CONCURRENCY):
+        self.pool = pool
+        self.deduper = deduper
+        self.sender = sender
+        self.max_in_flight = max_in_flight
+        self._tasks = set()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._accepting = True
+        self._latencies = deque(maxlen=1000)
+        self._counters = {"accepted": 0, "rejected": 0, "processed": 0, "failed": 0}
+
+    def submit(self, payload: dict) -> bool:
+        if not self._accepting or len(self._tasks) >= self.max_in_flight:
+            self._counters["rejected"] += 1
+            return False
+        task = asyncio.create_task(self._process(payload, time.monotonic()))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self._counters["accepted"] += 1
+        return True
+
+    async def drain(self, timeout: float = 30.0) -> None:
+        self._accepting = False
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=timeout)
+
+    async def _dedupe(self, messages):
+        fresh = self.deduper.filter_memory(messages)
+        if self.deduper.persist and fresh:
+            try:
+                claimed = await claim_message_ids_async(self.pool, persisted_ids(fresh))
+                fresh = self.deduper.filter_claimed(fresh, claimed)
+                if self.deduper.purge_due():
+                    await purge_processed_messages_async(self.pool, self.deduper.ttl)
+            except ASYNC_UNAVAILABLE_ERRORS as e:
+                self.deduper.database_unavailable(e)
+        self.deduper.record(messages, fresh)
+        return fresh
+
+    async def _process(self, payload: dict, accepted_at: float) -> None:
+        async with self._slots:
+            await self._process_delivery(payload)
+        self._latencies.append(time.monotonic() - accepted_at)
+
+    async def _process_delivery(self, payload: dict) -> None:
+        try:
+            for message in await self._dedupe(extract_messages(payload)):
+                # ❌ Ignore non-text messages for now
+                if message.type != "text" or not message.text:
+                    continue
+                async for reply in handle_traitbuddy_parts_async(message.text):
+                    await self.sender.send(message.sender, reply)
+            self._counters["processed"] += 1
+        except Exception as e:
+            self._counters["failed"] += 1
+            print("Webhook processing error:", e)
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        p95 = 1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        return {**self._counters, "in_flight": len(self._tasks), "latency_p95_ms": p95}
+
+
+async def verify_webhook(request: Request):
+    mode = request.query_params.get("hub.mode")
+    token = request.query_params.get("hub.verify_token")
+    challenge = request.query_params.get("hub.challenge")
+
+    if mode == "subscribe" and token == VERIFY_TOKEN:
+        return PlainTextResponse(challenge or "", 200)
+
+    return PlainTextResponse("Verification failed", 403)
+
+
+async def receive_message(request: Request):
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or "entry" not in data:
+        return PlainTextResponse("Invalid payload", 400)
+
+    if not request.app.state.processor.submit(data):
+        return PlainTextResponse("Busy", 503)
+
+    return PlainTextResponse("EVENT_RECEIVED", 200)
+
+
+async def occupancy(request: Request):
+    snapshot = await run_in_threadpool(get_occupancy().snapshot)
+    return JSONResponse(snapshot.as_dict())
+
+
+async def occupancy_feed(request: Request):
+    return StreamingResponse(
+        occupancy_stream_async(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def stats(request: Request):
+    state = request.app.state
+    return JSONResponse({
+        "db_pool": async_pool_stats(),
+        "webhook": state.processor.stats(),
+        "webhook_messages": state.deduper.stats(),
+        "outbound": state.sender.stats(),
+        "intents": intent_stats(),
+        "ai_cache": ai_cache_stats(),
+        "ai_client": ai_client_stats(),
+    })
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await run_in_threadpool(ensure_schema)
+    pool = await get_async_pool()
+    client = make_graph_client()
+
+    app.state.deduper = MessageDeduper()
+    app.state.sender = AsyncOutboundSender(pool, client)
+    app.state.sender.start()
+    app.state.processor = WebhookProcessor(pool, app.state.deduper, app.state.sender)
+    try:
+        yield
+    finally:
+        # Same order as app.py: finish deliveries, then the sender
+        await app.state.processor.drain()
+        await app.state.sender.stop()
+        await client.aclose()
+        await close_async_pool()
+
+
+app = Starlette(
+    routes=[
+        Route("/webhook", verify_webhook, methods=["GET"]),
+        Route("/webhook", receive_message, methods=["POST"]),
+        Route("/occupancy", occupancy, methods=["GET"]),
+        Route("/occupancy/stream", occupancy_feed, methods=["GET"]),
+        Route("/stats", stats, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
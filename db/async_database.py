@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Optional
+
+import asyncpg
+
+from db.database import DB_CONFIG
+
+# asyncpg pool for the async server (asgi_app.py). Same database settings as
+# the psycopg2 pool; sized separately because one process can hold many more
+# concurrent conversations.
+ASYNC_POOL_CONFIG = {
+    'min_size': int(os.getenv('DB_ASYNC_POOL_MIN', '2')),
+    'max_size': int(os.getenv('DB_ASYNC_POOL_MAX', '20')),
+    'max_inactive_connection_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+    'command_timeout': float(os.getenv('DB_ASYNC_COMMAND_TIMEOUT', '10')),
+}
+
+# asyncpg's counterpart of db.database.UNAVAILABLE_ERRORS
+ASYNC_UNAVAILABLE_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.exceptions.ConnectionDoesNotExistError,
+    asyncpg.exceptions.CannotConnectNowError,
+    asyncpg.exceptions.InterfaceError,
+)
+
+_pool: Optional[asyncpg.Pool] = None
+
+
+async def get_async_pool() -> asyncpg.Pool:
+    """The process-wide asyncpg pool, created on first use (call from the server's event loop)."""
+    global _pool
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            database=DB_CONFIG['dbname'],
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            host=DB_CONFIG['host'],
+            port=int(DB_CONFIG['port']),
+            **ASYNC_POOL_CONFIG,
+        )
+    return _pool
+
+
+async def close_async_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def async_pool_stats() -> dict:
+    if _pool is None:
+        return {"size": 0}
+    return {
+        "size": _pool.get_size(),
+        "idle": _pool.get_idle_size(),
+        "min_size": _pool.get_min_size(),
+        "max_size": _pool.get_max_size(),
+    }
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from psycopg2.extras import execute_values
+
+from db.database import cursor
+from db.migrate import ensure_schema
+
+
+class Transition(NamedTuple):
+    student_id: int
+    previous_status: str
+    status: str
+    recorded: bool                  # False when the student was already in ``status``
+    event_id: Optional[int]
+    timestamp: Optional[datetime]
+
+
+# Lock the student's current-status row, then append the event only if it
+# changes the status. The row lock serializes concurrent taps for the same
+# student: the second one re-reads the updated status after the first
+# commits and becomes a no-op. The status row itself is updated by the
+# attendance trigger (migration 0002) within the same statement.
+_TRANSITION_SQL = """
+WITH target AS (
+    SELECT cs.student_id, cs.status
+    FROM student_current_status cs
+    JOIN students s ON s.id = cs.student_id
+    WHERE {match} AND s.is_active = TRUE
+    LIMIT 1
+    FOR UPDATE OF cs
+),
+logged AS (
+    -- clock_timestamp(), not the transaction start: a tap that waited on the
+    -- row lock above must not get an earlier time than the one it waited for
+    INSERT INTO attendance (student_id, status, activity_type, reason, timestamp)
+    SELECT student_id, %(status)s::attendance_status, %(activity_type)s::activity_type, %(reason)s,
+           clock_timestamp()::timestamp
+    FROM target
+    WHERE status IS DISTINCT FROM %(status)s::attendance_status
+    RETURNING id, timestamp
+)
+SELECT t.student_id, t.status, l.id, l.timestamp
+FROM target t
+LEFT JOIN logged l ON TRUE
+"""
+
+_TRANSITION_BY_NAME_SQL = _TRANSITION_SQL.format(match="s.name = %(name)s")
+_TRANSITION_BY_ID_SQL = _TRANSITION_SQL.format(match="s.id = %(student_id)s")
+
+
+def record_transition(
+    status: str,
+    *,
+    name: str | None = None,
+    student_id: int | None = None,
+    activity_type: str = "VOICE_COMMAND",
+    reason: str | None = None,
+) -> Optional[Transition]:
+    """
+    Resolve an active student (by ``student_id`` or lower-cased ``name``) and
+    move them to ``status`` in one atomic round trip.
+
+    Returns None if no such active student exists.
+    """
+    if student_id is None and not name:
+        raise ValueError("record_transition needs a name or a student_id")
+
+    ensure_schema()
+
+    params = {
+        "name": name,
+        "student_id": student_id,
+        "status": status,
+        "activity_type": activity_type,
+        "reason": reason,
+    }
+    sql = _TRANSITION_BY_ID_SQL if student_id is not None else _TRANSITION_BY_NAME_SQL
+
+    with cursor() as cur:
+        cur.execute(sql, params)
+        row = cur.fetchone()
+
+    if not row:
+        return None
+
+    resolved_id, previous_status, event_id, timestamp = row
+    return Transition(
+        student_id=resolved_id,
+        previous_status=previous_status,
+        status=status if event_id is not None else previous_status,
+        recorded=event_id is not None,
+        event_id=event_id,
+        timestamp=timestamp,
+    )
+
+
+# timestamp lets the update prune to the event's partition
+SET_REASON_SQL = "UPDATE attendance SET reason = %(reason)s WHERE id = %(id)s AND timestamp = %(timestamp)s"
+
+
+def set_event_reason(event_id: int, timestamp: datetime, reason: str | None) -> bool:
+    """Attach a reason to an already recorded event. Returns False if it no longer exists."""
+    with cursor() as cur:
+        cur.execute(SET_REASON_SQL, {"reason": reason, "id": event_id, "timestamp": timestamp})
+        return cur.rowcount > 0
+
+
+# -------------------------
+# Batch writes
+# -------------------------
+# Building blocks for callers that apply many events in one transaction
+# (group commit). Both take the caller's cursor.
+
+def lock_current_statuses(cur, student_ids: Iterable[int]) -> Dict[int, str]:
+    """
+    Lock the current-status rows of ``student_ids`` (in id order, so
+    concurrent batches cannot deadlock) and return student_id -> status.
+    """
+    ids = sorted(set(student_ids))
+    if not ids:
+        return {}
+    cur.execute(
+        """
+        SELECT student_id, status
+        FROM student_current_status
+        WHERE student_id = ANY(%s)
+        ORDER BY student_id
+        FOR UPDATE
+        """,
+        (ids,),
+    )
+    return dict(cur.fetchall())
+
+
+def insert_events(cur, events: Sequence[Tuple[int, str, str, Optional[str]]]) -> List[Tuple[int, datetime]]:
+    """
+    Append (student_id, status, activity_type, reason) rows in one statement.
+    Rows get increasing timestamps in the given order. Returns (id, timestamp)
+    per row, in the same order.
+    """
+    if not events:
+        return []
+    return execute_values(
+        cur,
+        """
+        INSERT INTO attendance (student_id, status, activity_type, reason, timestamp)
+        VALUES %s
+        RETURNING id, timestamp
+        """,
+        events,
+        template="(%s, %s::attendance_status, %s::activity_type, %s, clock_timestamp()::timestamp)",
+        page_size=len(events),
+        fetch=True,
+    )
+
+
+def upsert_edge_events(cur, events: Sequence[Tuple[str, int, str, str, Optional[str], datetime]]) -> int:
+    """
+    Idempotently apply (event_uuid, student_id, status, activity_type,
+    reason, timestamp) rows recorded by an edge gate. Resending an event only
+    refreshes its reason (which may be captured after the first send).
+    Returns the number of rows inserted or changed.
+    """
+    if not events:
+        return 0
+    execute_values(
+        cur,
+        """
+        INSERT INTO attendance (event_uuid, student_id, status, activity_type, reason, timestamp)
+        VALUES %s
+        ON CONFLICT (event_uuid, timestamp) DO UPDATE
+            SET reason = EXCLUDED.reason
+            WHERE attendance.reason IS DISTINCT FROM EXCLUDED.reason
+        """,
+        events,
+        template="(%s::uuid, %s, %s::attendance_status, %s::activity_type, %s, %s)",
+        page_size=len(events),
+    )
+    return cur.rowcount
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import List, Optional
+
+from db.database import cursor
+from db.migrate import ensure_schema
+
+
+def backfill_summary(start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """
+    Rebuild attendance_summary rows for days in [start, end) from the raw
+    attendance log. None means unbounded. Returns the number of rows written.
+    """
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute("SELECT backfill_attendance_summary(%s, %s)", (start, end))
+        return cur.fetchone()[0]
+
+
+PRESENT_ON_DAY_SQL = """
+SELECT s.name
+FROM attendance_summary d
+JOIN students s ON s.id = d.student_id
+WHERE d.date = COALESCE(%(day)s::date, CURRENT_DATE)
+  AND d.inside_count > 0
+  AND s.is_active = TRUE
+ORDER BY s.name
+"""
+
+ABSENT_ON_DAY_SQL = """
+SELECT s.name
+FROM students s
+WHERE s.is_active = TRUE
+  AND NOT EXISTS (
+      SELECT 1
+      FROM attendance_summary d
+      WHERE d.student_id = s.id
+        AND d.date = COALESCE(%(day)s::date, CURRENT_DATE)
+        AND d.inside_count > 0
+  )
+ORDER BY s.name
+"""
+
+
+def _names_on_day(sql: str, day: Optional[date]) -> List[str]:
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute(sql, {"day": day})
+        return [r[0] for r in cur.fetchall()]
+
+
+def present_names(day: Optional[date] = None) -> List[str]:
+    """Active students with at least one INSIDE event on ``day`` (default today)."""
+    return _names_on_day(PRESENT_ON_DAY_SQL, day)
+
+
+def absent_names(day: Optional[date] = None) -> List[str]:
+    """Active students with no INSIDE event on ``day`` (default today)."""
+    return _names_on_day(ABSENT_ON_DAY_SQL, day)
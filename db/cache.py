@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry.
+
+    ``None`` is a valid cached value and is treated as a negative entry
+    ("looked it up, nothing there"); negative entries can have their own,
+    usually shorter, TTL.
+
+    clear() bumps a generation counter, and get_or_load() only stores a
+    loaded value if no clear() happened while it was loading, so an
+    invalidation racing a slow load can't leave stale data behind.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0,
+                 negative_ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        """Cached value for ``key``; ``default`` (or a private sentinel) if absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[1] <= now:
+                if item is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            if item[0] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None,
+            ttl: Optional[float] = None) -> bool:
+        """
+        Store ``value`` (for ``ttl`` seconds instead of the cache default, if given).
+        Returns False if ``generation`` is given and the cache was cleared since.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        # caller holds self._lock
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def add(self, key: Hashable, value: Any = True) -> bool:
+        """Store ``value`` only if ``key`` has no live entry. Returns True if it was added."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return False
+            self.misses += 1
+            self._store(key, value)
+            return True
+
+    def get_or_load(self, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+        generation = self._generation
+        value = loader(key)
+        self.put(key, value, generation)
+        return value
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, _payload=None) -> None:
+        """Drop everything. Accepts (and ignores) a NOTIFY payload so it can be a listener callback."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def items(self) -> List[Tuple[Hashable, Any, float]]:
+        """Live entries as (key, value, seconds_left), least recently used first."""
+        now = time.monotonic()
+        with self._lock:
+            return [(k, v, exp - now) for k, (v, exp) in self._entries.items() if exp > now]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from db.database import cursor
+from db.migrate import ensure_schema
+
+
+def get_current_status(student_id: int) -> Optional[str]:
+    """Latest status from student_current_status, or None if no row exists."""
+    with cursor() as cur:
+        cur.execute(
+            "SELECT status FROM student_current_status WHERE student_id = %s",
+            (student_id,),
+        )
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def get_status_by_name(name: str) -> Optional[Tuple[int, Optional[str]]]:
+    """(student_id, status) for an active student, or None if unknown."""
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute(
+            """
+            SELECT s.id, cs.status
+            FROM students s
+            LEFT JOIN student_current_status cs ON cs.student_id = s.id
+            WHERE s.name = %s AND s.is_active = TRUE
+            LIMIT 1
+            """,
+            (name,),
+        )
+        row = cur.fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def get_names_with_status(status: str) -> List[str]:
+    """Names of active students whose current status is ``status``."""
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute(
+            """
+            SELECT s.name
+            FROM student_current_status cs
+            JOIN students s ON s.id = cs.student_id
+            WHERE cs.status = %s AND s.is_active = TRUE
+            ORDER BY s.name
+            """,
+            (status,),
+        )
+        return [r[0] for r in cur.fetchall()]
+
+
+def rebuild_current_status() -> int:
+    """Regenerate student_current_status from the attendance log."""
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute("SELECT rebuild_student_current_status()")
+        return cur.fetchone()[0]
@@ -1,6 +1,11 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.extensions
+from psycopg2.pool import PoolError
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,121 +19,310 @@ DB_CONFIG = {
     'port': os.getenv('DB_PORT', '5432')
 }
 
+# Connection pool sizing/recycling, shared by every db/ and services/ helper
+POOL_CONFIG = {
+    'minconn': int(os.getenv('DB_POOL_MIN', '1')),
+    'maxconn': int(os.getenv('DB_POOL_MAX', '10')),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+    'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+    'health_check_after': float(os.getenv('DB_POOL_HEALTH_CHECK_AFTER', '30')),
+}
+
+
+class PoolTimeout(PoolError):
+    """Raised when no pooled connection became free within the wait timeout."""
+
+
+# Errors meaning the database can't be reached right now (as opposed to a
+# bad query); offline-capable callers fall back to local state on these.
+UNAVAILABLE_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, PoolTimeout)
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of psycopg2 connections.
+
+    Connections idle for longer than ``health_check_after`` seconds are pinged
+    before being handed out, and any connection older than ``max_lifetime``
+    seconds is closed and replaced so long-lived processes pick up server
+    restarts/failovers instead of holding stale sockets.
+    """
+
+    def __init__(
+        self,
+        minconn=1,
+        maxconn=10,
+        timeout=10.0,
+        max_lifetime=1800.0,
+        health_check_after=30.0,
+        **conn_kwargs,
+    ):
+        if maxconn < 1 or minconn < 0 or minconn > maxconn:
+            raise ValueError("invalid pool bounds: need 0 <= minconn <= maxconn, maxconn >= 1")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self._conn_kwargs = conn_kwargs
+
+        self._cond = threading.Condition()
+        self._idle = deque()   # (conn, created_at, returned_at); LIFO keeps hot conns warm
+        self._created = {}     # id(conn) -> created_at for every open pooled connection
+        self._opening = 0      # slots reserved by threads currently connecting
+        self._waiting = 0
+        self._closed = False
+        self._counters = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+            'opened': 0,
+            'closed': 0,
+            'recycled': 0,
+            'health_check_failures': 0,
+        }
+
+        for _ in range(minconn):
+            with self._cond:
+                self._opening += 1
+            conn = self._open()
+            with self._cond:
+                self._idle.append((conn, self._created[id(conn)], time.monotonic()))
+
+    # -------------------------
+    # Internals
+    # -------------------------
+    def _open(self):
+        """Connect using a slot already reserved in ``self._opening``."""
+        try:
+            conn = psycopg2.connect(**self._conn_kwargs)
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._opening -= 1
+            self._created[id(conn)] = time.monotonic()
+            self._counters['opened'] += 1
+        return conn
+
+    def _close(self, conn):
+        """Close ``conn`` and forget it. Caller must hold the lock."""
+        self._created.pop(id(conn), None)
+        self._counters['closed'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _replace(self, conn):
+        """Close ``conn`` and open a new one in the same slot."""
+        with self._cond:
+            self._close(conn)
+            self._opening += 1
+        return self._open()
+
+    @staticmethod
+    def _ping(conn) -> bool:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def getconn(self, timeout=None):
+        """Check out a healthy connection, waiting up to ``timeout`` seconds."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    conn, created_at, returned_at = self._idle.pop()
+                    break
+                if len(self._created) + self._opening < self.maxconn:
+                    self._opening += 1
+                    conn = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"no database connection available after {timeout:.1f}s "
+                        f"(maxconn={self.maxconn})"
+                    )
+                waited = True
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            wait_time = time.monotonic() - started
+            self._counters['checkouts'] += 1
+            if waited:
+                self._counters['waits'] += 1
+            self._counters['wait_time_total'] += wait_time
+            self._counters['wait_time_max'] = max(self._counters['wait_time_max'], wait_time)
+
+        if conn is None:
+            return self._open()
+
+        now = time.monotonic()
+        if conn.closed or now - created_at > self.max_lifetime:
+            with self._cond:
+                self._counters['recycled'] += 1
+            return self._replace(conn)
+
+        if now - returned_at > self.health_check_after and not self._ping(conn):
+            with self._cond:
+                self._counters['health_check_failures'] += 1
+            return self._replace(conn)
+
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """Return ``conn`` to the pool, rolling back any open transaction."""
+        if not discard and not conn.closed:
+            status = conn.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+
+        with self._cond:
+            created_at = self._created.get(id(conn))
+            if created_at is None:
+                raise PoolError("connection does not belong to this pool")
+
+            expired = time.monotonic() - created_at > self.max_lifetime
+            if discard or conn.closed or expired or self._closed:
+                if expired and not discard:
+                    self._counters['recycled'] += 1
+                self._close(conn)
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Borrow a connection; commit on success, roll back on error."""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _, _ = self._idle.pop()
+                self._close(conn)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Pool usage and wait statistics (wait times in seconds)."""
+        with self._cond:
+            counters = dict(self._counters)
+            size = len(self._created)
+            idle = len(self._idle)
+            stats = {
+                'maxconn': self.maxconn,
+                'size': size,
+                'idle': idle,
+                'in_use': size - idle,
+                'opening': self._opening,
+                'waiting': self._waiting,
+            }
+        checkouts = counters['checkouts']
+        counters['wait_time_avg'] = counters['wait_time_total'] / checkouts if checkouts else 0.0
+        stats.update(counters)
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide pool, created on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(**POOL_CONFIG, **DB_CONFIG)
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+def pool_stats() -> dict:
+    return get_pool().stats()
+
+
+@contextmanager
+def connection(timeout=None):
+    """
+    Pooled connection for one unit of work::
+
+        with connection() as conn:
+            cur = conn.cursor()
+            ...
+
+    The transaction is committed when the block exits normally and rolled
+    back otherwise; the connection always goes back to the pool.
+    """
+    with get_pool().connection(timeout) as conn:
+        yield conn
+
+
+@contextmanager
+def cursor(cursor_factory=None):
+    """Shortcut for a single-cursor unit of work on a pooled connection."""
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=cursor_factory)
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+
 def get_conn():
+    """
+    Dedicated, unpooled connection. The caller owns it and must close it.
+    Prefer ``connection()`` / ``cursor()`` for request paths.
+    """
     return psycopg2.connect(**DB_CONFIG)
 
+
 def init_db():
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS students (
-        id SERIAL PRIMARY KEY,
-        name VARCHAR(255) NOT NULL,
-        uid VARCHAR(50) NOT NULL UNIQUE,
-        program VARCHAR(100),
-        is_active BOOLEAN DEFAULT TRUE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-
-    cur.execute("""
-    DO $$
-    BEGIN
-        IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'attendance_status') THEN
-            CREATE TYPE attendance_status AS ENUM ('INSIDE', 'OUTSIDE');
-        END IF;
-        IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'activity_type') THEN
-            CREATE TYPE activity_type AS ENUM ('VOICE_COMMAND', 'RFID');
-        END IF;
-        IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'project_status') THEN
-            CREATE TYPE project_status AS ENUM ('ONGOING');
-        END IF;
-    END$$;
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS attendance (
-        id SERIAL PRIMARY KEY,
-        student_id INTEGER NOT NULL
-            REFERENCES students(id) ON DELETE CASCADE,
-        status attendance_status NOT NULL,
-        activity_type activity_type DEFAULT 'VOICE_COMMAND',
-        reason TEXT,
-        timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS attendance_summary (
-        id SERIAL PRIMARY KEY,
-        student_id INTEGER NOT NULL
-            REFERENCES students(id) ON DELETE CASCADE,
-        date DATE NOT NULL,
-        inside_count INTEGER DEFAULT 0,
-        outside_count INTEGER DEFAULT 0,
-        last_status attendance_status,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE (student_id, date)
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS rfid_cards (
-        id SERIAL PRIMARY KEY,
-        uid VARCHAR(50) UNIQUE NOT NULL,
-        user_id INTEGER REFERENCES students(id) ON DELETE CASCADE,
-        is_active BOOLEAN DEFAULT TRUE,
-        registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS guests (
-        id SERIAL PRIMARY KEY,
-        name VARCHAR(255) NOT NULL,
-        designation VARCHAR(255),
-        organization VARCHAR(255),
-        visit_purpose TEXT,
-        welcome_note TEXT NOT NULL,
-        visit_date DATE DEFAULT CURRENT_DATE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS trait_info (
-        id SERIAL PRIMARY KEY,
-        title VARCHAR(255) NOT NULL,
-        description TEXT NOT NULL,
-        vision TEXT,
-        mission TEXT,
-        location VARCHAR(255),
-        contact_email VARCHAR(255),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS projects (
-        id SERIAL PRIMARY KEY,
-        title VARCHAR(255) NOT NULL,
-        description TEXT,
-        domain VARCHAR(100),
-        status project_status DEFAULT 'ONGOING',
-        mentor VARCHAR(255),
-        start_date DATE,
-        end_date DATE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_students_uid ON students(uid)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_students_active ON students(is_active)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_attendance_student_id ON attendance(student_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_attendance_timestamp ON attendance(timestamp)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_attendance_status ON attendance(status)")
-
-    conn.commit()
-    conn.close()
+    """Apply any pending schema migrations (see db/migrate.py)."""
+    from db.migrate import apply_migrations
+
+    apply_migrations()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import os
+import select
+import threading
+from collections import defaultdict
+from typing import Callable, Optional
+
+from db.database import get_conn
+
+# Set to 0 to disable LISTEN/NOTIFY; caches then rely on their TTLs alone
+LISTEN_ENABLED = os.getenv("DB_LISTEN_NOTIFY", "1") not in ("0", "false", "False", "")
+
+Callback = Callable[[Optional[str]], None]
+
+
+class NotificationListener:
+    """
+    Background thread holding one dedicated connection that LISTENs on every
+    subscribed channel and hands notification payloads to the callbacks.
+
+    Notifications sent while the connection is down are lost, so on every
+    (re)connect each callback is invoked with ``None`` meaning "anything may
+    have changed" — caches should drop everything they hold. That happens
+    after the LISTENs are issued, and subscribe() on a connected listener
+    LISTENs before returning, so a cache that subscribes and then loads
+    never misses a change in between.
+    """
+
+    def __init__(self, poll_interval=1.0, reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connected = False
+
+        self._callbacks = defaultdict(list)
+        self._conn = None  # live connection, set once its LISTENs are issued
+        self._listening = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, channel: str, callback: Callback) -> None:
+        with self._lock:
+            self._callbacks[channel].append(callback)
+            if self._conn is not None and channel not in self._listening:
+                try:
+                    self._listen_on(self._conn, channel)
+                except Exception as e:
+                    # the listener thread reconnects, LISTENs and reloads everything
+                    print("DB listener error:", e)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="db-listener", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _dispatch(self, channel: Optional[str], payload: Optional[str]) -> None:
+        with self._lock:
+            if channel is None:
+                callbacks = [cb for cbs in self._callbacks.values() for cb in cbs]
+            else:
+                callbacks = list(self._callbacks.get(channel, ()))
+
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception as e:
+                print("DB listener callback error:", e)
+
+    def _listen_on(self, conn, channel: str) -> None:
+        # caller holds self._lock
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN "{channel}"')
+        self._listening.add(channel)
+
+    def _listen(self, conn) -> None:
+        with self._lock:
+            self._listening = set()
+            for channel in list(self._callbacks):
+                self._listen_on(conn, channel)
+            self._conn = conn
+        self.connected = True
+        self._dispatch(None, None)
+
+        while not self._stop.is_set():
+            select.select([conn], [], [], self.poll_interval)
+
+            # A LISTEN issued by subscribe() may already have read pending
+            # notifications into conn.notifies, so drain after every wait.
+            with self._lock:
+                conn.poll()
+                notifies = list(conn.notifies)
+                conn.notifies.clear()
+            for notify in notifies:
+                self._dispatch(notify.channel, notify.payload)
+
+    def _run(self) -> None:
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = get_conn()
+                conn.autocommit = True
+                delay = self.reconnect_delay
+                self._listen(conn)
+            except Exception as e:
+                print("DB listener error:", e)
+            finally:
+                self.connected = False
+                with self._lock:
+                    self._conn = None
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def subscribe(channel: str, callback: Callback) -> bool:
+    """
+    Register ``callback`` for NOTIFYs on ``channel`` on the process-wide
+    listener. Returns False (and does nothing) when LISTEN is disabled.
+    """
+    global _listener
+    if not LISTEN_ENABLED:
+        return False
+
+    with _listener_lock:
+        if _listener is None:
+            _listener = NotificationListener()
+    _listener.subscribe(channel, callback)
+    return True
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from typing import List, NamedTuple, Optional
+
+from db.database import connection
+
+# Ordered SQL files named NNNN_description.sql. Add a new file for every schema
+# change; never edit one that has already been applied somewhere.
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+_FILENAME_RE = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+
+# Serializes concurrent migrators (e.g. gate + webhook starting together)
+MIGRATION_LOCK_KEY = 741_020_001
+
+# Apply pending migrations on first use instead of refusing to start
+AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "1") not in ("0", "false", "False", "")
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: str
+
+    def read(self) -> str:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def checksum(self) -> str:
+        return hashlib.sha256(self.read().encode("utf-8")).hexdigest()
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def load_migrations() -> List[Migration]:
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        m = _FILENAME_RE.match(filename)
+        if not m:
+            continue
+        migrations.append(
+            Migration(int(m.group(1)), m.group(2), os.path.join(MIGRATIONS_DIR, filename))
+        )
+
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions in {MIGRATIONS_DIR}")
+    return migrations
+
+
+def _ensure_version_table(cur) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum VARCHAR(64) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def applied_versions() -> dict:
+    """version -> checksum for every migration recorded in schema_version."""
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            return {}
+        cur.execute("SELECT version, checksum FROM schema_version")
+        return dict(cur.fetchall())
+
+
+def pending_migrations() -> List[Migration]:
+    applied = applied_versions()
+    return [m for m in load_migrations() if m.version not in applied]
+
+
+def apply_migrations(target: Optional[int] = None) -> List[int]:
+    """
+    Apply pending migrations in order, each in its own transaction.
+    Returns the versions that were applied by this call.
+    """
+    applied = []
+    for migration in pending_migrations():
+        if target is not None and migration.version > target:
+            break
+
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+            _ensure_version_table(cur)
+
+            # Another process may have applied it while we waited for the lock
+            cur.execute("SELECT 1 FROM schema_version WHERE version = %s", (migration.version,))
+            if cur.fetchone():
+                continue
+
+            cur.execute(migration.read())
+            cur.execute(
+                "INSERT INTO schema_version (version, name, checksum) VALUES (%s, %s, %s)",
+                (migration.version, migration.name, migration.checksum()),
+            )
+
+        print(f"Applied migration {migration.version:04d}_{migration.name}")
+        applied.append(migration.version)
+
+    return applied
+
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def ensure_schema() -> None:
+    """
+    Make sure the database schema is current. The check runs once per
+    process; afterwards this is a flag test, so request paths can call it
+    freely without ever issuing DDL.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+
+    with _schema_lock:
+        if _schema_ready:
+            return
+
+        pending = pending_migrations()
+        if pending:
+            if not AUTO_MIGRATE:
+                names = ", ".join(f"{m.version:04d}_{m.name}" for m in pending)
+                raise SchemaOutOfDate(
+                    f"Database schema is out of date (pending: {names}). "
+                    "Run `python scripts/migrate.py`."
+                )
+            apply_migrations()
+
+        # Keep upcoming monthly attendance partitions in place, now and
+        # (for long-running processes) daily after that; a catalog check
+        # when nothing is missing.
+        from db.partitions import ensure_partitions, start_partition_maintenance
+
+        ensure_partitions()
+        start_partition_maintenance()
+
+        _schema_ready = True
@@ -0,0 +1,96 @@
+-- Baseline schema (previously created by init_db() on every call).
+-- Every statement is idempotent so this also applies cleanly to databases
+-- created before migrations existed.
+
+CREATE TABLE IF NOT EXISTS students (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    uid VARCHAR(50) NOT NULL UNIQUE,
+    program VARCHAR(100),
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'attendance_status') THEN
+        CREATE TYPE attendance_status AS ENUM ('INSIDE', 'OUTSIDE');
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'activity_type') THEN
+        CREATE TYPE activity_type AS ENUM ('VOICE_COMMAND', 'RFID');
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'project_status') THEN
+        CREATE TYPE project_status AS ENUM ('ONGOING');
+    END IF;
+END$$;
+
+CREATE TABLE IF NOT EXISTS attendance (
+    id SERIAL PRIMARY KEY,
+    student_id INTEGER NOT NULL
+        REFERENCES students(id) ON DELETE CASCADE,
+    status attendance_status NOT NULL,
+    activity_type activity_type DEFAULT 'VOICE_COMMAND',
+    reason TEXT,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS attendance_summary (
+    id SERIAL PRIMARY KEY,
+    student_id INTEGER NOT NULL
+        REFERENCES students(id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    inside_count INTEGER DEFAULT 0,
+    outside_count INTEGER DEFAULT 0,
+    last_status attendance_status,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (student_id, date)
+);
+
+CREATE TABLE IF NOT EXISTS rfid_cards (
+    id SERIAL PRIMARY KEY,
+    uid VARCHAR(50) UNIQUE NOT NULL,
+    user_id INTEGER REFERENCES students(id) ON DELETE CASCADE,
+    is_active BOOLEAN DEFAULT TRUE,
+    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS guests (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    designation VARCHAR(255),
+    organization VARCHAR(255),
+    visit_purpose TEXT,
+    welcome_note TEXT NOT NULL,
+    visit_date DATE DEFAULT CURRENT_DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS trait_info (
+    id SERIAL PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    description TEXT NOT NULL,
+    vision TEXT,
+    mission TEXT,
+    location VARCHAR(255),
+    contact_email VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS projects (
+    id SERIAL PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    domain VARCHAR(100),
+    status project_status DEFAULT 'ONGOING',
+    mentor VARCHAR(255),
+    start_date DATE,
+    end_date DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_students_uid ON students(uid);
+CREATE INDEX IF NOT EXISTS idx_students_active ON students(is_active);
+CREATE INDEX IF NOT EXISTS idx_attendance_student_id ON attendance(student_id);
+CREATE INDEX IF NOT EXISTS idx_attendance_timestamp ON attendance(timestamp);
+CREATE INDEX IF NOT EXISTS idx_attendance_status ON attendance(status);
@@ -0,0 +1,83 @@
+-- One row per student holding their latest INSIDE/OUTSIDE state, so status
+-- lookups no longer scan the attendance log. Maintained by triggers in the
+-- same transaction as the attendance insert.
+
+CREATE TABLE IF NOT EXISTS student_current_status (
+    student_id INTEGER PRIMARY KEY
+        REFERENCES students(id) ON DELETE CASCADE,
+    status attendance_status NOT NULL DEFAULT 'OUTSIDE',
+    last_event_id INTEGER,
+    changed_at TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_student_current_status_status
+    ON student_current_status(status);
+
+-- Apply each attendance event to the student's row. Events older than the
+-- one already applied (late/out-of-order inserts) do not overwrite it.
+CREATE OR REPLACE FUNCTION attendance_apply_current_status() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO student_current_status (student_id, status, last_event_id, changed_at, updated_at)
+    VALUES (NEW.student_id, NEW.status, NEW.id, NEW.timestamp, CURRENT_TIMESTAMP)
+    ON CONFLICT (student_id) DO UPDATE SET
+        status = EXCLUDED.status,
+        last_event_id = EXCLUDED.last_event_id,
+        changed_at = EXCLUDED.changed_at,
+        updated_at = EXCLUDED.updated_at
+    WHERE student_current_status.changed_at IS NULL
+       OR student_current_status.changed_at <= EXCLUDED.changed_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_attendance_current_status ON attendance;
+CREATE TRIGGER trg_attendance_current_status
+    AFTER INSERT ON attendance
+    FOR EACH ROW EXECUTE FUNCTION attendance_apply_current_status();
+
+-- Every student gets a row (OUTSIDE) as soon as they are created
+CREATE OR REPLACE FUNCTION students_init_current_status() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO student_current_status (student_id)
+    VALUES (NEW.id)
+    ON CONFLICT (student_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_students_current_status ON students;
+CREATE TRIGGER trg_students_current_status
+    AFTER INSERT ON students
+    FOR EACH ROW EXECUTE FUNCTION students_init_current_status();
+
+-- Regenerate every row from the attendance history. Blocks concurrent
+-- attendance inserts (their trigger needs ROW EXCLUSIVE) until it commits.
+CREATE OR REPLACE FUNCTION rebuild_student_current_status() RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    LOCK TABLE student_current_status IN SHARE ROW EXCLUSIVE MODE;
+
+    INSERT INTO student_current_status (student_id, status, last_event_id, changed_at, updated_at)
+    SELECT s.id, COALESCE(latest.status, 'OUTSIDE'), latest.id, latest.timestamp, CURRENT_TIMESTAMP
+    FROM students s
+    LEFT JOIN LATERAL (
+        SELECT a.id, a.status, a.timestamp
+        FROM attendance a
+        WHERE a.student_id = s.id
+        ORDER BY a.timestamp DESC, a.id DESC
+        LIMIT 1
+    ) latest ON TRUE
+    ON CONFLICT (student_id) DO UPDATE SET
+        status = EXCLUDED.status,
+        last_event_id = EXCLUDED.last_event_id,
+        changed_at = EXCLUDED.changed_at,
+        updated_at = EXCLUDED.updated_at;
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_student_current_status();
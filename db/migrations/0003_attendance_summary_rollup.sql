@@ -0,0 +1,74 @@
+-- Maintain attendance_summary (one row per student per day) from each
+-- attendance insert, so daily queries read the rollup instead of the log.
+
+ALTER TABLE attendance_summary ADD COLUMN IF NOT EXISTS last_event_at TIMESTAMP;
+ALTER TABLE attendance_summary ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+CREATE OR REPLACE FUNCTION attendance_apply_summary() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO attendance_summary
+        (student_id, date, inside_count, outside_count, last_status, last_event_at, updated_at)
+    VALUES (
+        NEW.student_id,
+        NEW.timestamp::date,
+        CASE WHEN NEW.status = 'INSIDE' THEN 1 ELSE 0 END,
+        CASE WHEN NEW.status = 'OUTSIDE' THEN 1 ELSE 0 END,
+        NEW.status,
+        NEW.timestamp,
+        CURRENT_TIMESTAMP
+    )
+    ON CONFLICT (student_id, date) DO UPDATE SET
+        inside_count = attendance_summary.inside_count + EXCLUDED.inside_count,
+        outside_count = attendance_summary.outside_count + EXCLUDED.outside_count,
+        last_status = CASE
+            WHEN attendance_summary.last_event_at IS NULL
+              OR attendance_summary.last_event_at <= EXCLUDED.last_event_at
+            THEN EXCLUDED.last_status
+            ELSE attendance_summary.last_status
+        END,
+        last_event_at = GREATEST(attendance_summary.last_event_at, EXCLUDED.last_event_at),
+        updated_at = EXCLUDED.updated_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_attendance_summary ON attendance;
+CREATE TRIGGER trg_attendance_summary
+    AFTER INSERT ON attendance
+    FOR EACH ROW EXECUTE FUNCTION attendance_apply_summary();
+
+-- Recompute rollups for days in [from_date, to_date) from the raw log
+-- (NULL bounds mean "from the first" / "through the last" event).
+-- Blocks concurrent attendance inserts until it commits.
+CREATE OR REPLACE FUNCTION backfill_attendance_summary(from_date DATE, to_date DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    LOCK TABLE attendance_summary IN SHARE ROW EXCLUSIVE MODE;
+
+    DELETE FROM attendance_summary
+    WHERE (from_date IS NULL OR date >= from_date)
+      AND (to_date IS NULL OR date < to_date);
+
+    INSERT INTO attendance_summary
+        (student_id, date, inside_count, outside_count, last_status, last_event_at, updated_at)
+    SELECT
+        a.student_id,
+        a.timestamp::date,
+        COUNT(*) FILTER (WHERE a.status = 'INSIDE'),
+        COUNT(*) FILTER (WHERE a.status = 'OUTSIDE'),
+        (ARRAY_AGG(a.status ORDER BY a.timestamp DESC, a.id DESC))[1],
+        MAX(a.timestamp),
+        CURRENT_TIMESTAMP
+    FROM attendance a
+    WHERE (from_date IS NULL OR a.timestamp >= from_date)
+      AND (to_date IS NULL OR a.timestamp < to_date)
+    GROUP BY a.student_id, a.timestamp::date;
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT backfill_attendance_summary(NULL, NULL);
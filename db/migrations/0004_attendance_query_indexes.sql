@@ -0,0 +1,23 @@
+-- Indexes matching how attendance is actually queried: per-student latest
+-- event, half-open timestamp ranges filtered by status, and today's rollup.
+
+CREATE INDEX IF NOT EXISTS idx_attendance_student_ts
+    ON attendance (student_id, timestamp DESC);
+
+-- Covered by idx_attendance_student_ts (same leading column)
+DROP INDEX IF EXISTS idx_attendance_student_id;
+
+-- Two-value column: a plain index on status is never selective enough to use
+DROP INDEX IF EXISTS idx_attendance_status;
+
+CREATE INDEX IF NOT EXISTS idx_attendance_inside_ts
+    ON attendance (timestamp, student_id)
+    WHERE status = 'INSIDE';
+
+CREATE INDEX IF NOT EXISTS idx_attendance_outside_ts
+    ON attendance (timestamp, student_id)
+    WHERE status = 'OUTSIDE';
+
+CREATE INDEX IF NOT EXISTS idx_attendance_summary_present
+    ON attendance_summary (date, student_id)
+    WHERE inside_count > 0;
@@ -0,0 +1,112 @@
+-- Convert attendance into a table range-partitioned by month on timestamp.
+-- Monthly partitions are named attendance_YYYY_MM; attendance_default catches
+-- anything outside the created months (clock skew, missed maintenance).
+
+-- Schema-qualified name of the partition holding month_start
+CREATE OR REPLACE FUNCTION attendance_partition_name(month_start DATE) RETURNS TEXT AS $$
+    SELECT format('%I.%I', n.nspname, 'attendance_' || to_char(date_trunc('month', month_start), 'YYYY_MM'))
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.oid = 'attendance'::regclass;
+$$ LANGUAGE sql STABLE;
+
+-- Create the partition for month_start's month. Returns its name, or NULL
+-- if it already existed or could not be created.
+CREATE OR REPLACE FUNCTION create_attendance_partition(month_start DATE) RETURNS TEXT AS $$
+DECLARE
+    lower_bound DATE := date_trunc('month', month_start)::date;
+    upper_bound DATE := (date_trunc('month', month_start) + INTERVAL '1 month')::date;
+    part_name TEXT := attendance_partition_name(month_start);
+BEGIN
+    IF to_regclass(part_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Attaching a month that already has rows in the default partition
+    -- would fail; leave those rows where they are.
+    IF EXISTS (
+        SELECT 1 FROM attendance_default
+        WHERE timestamp >= lower_bound AND timestamp < upper_bound
+    ) THEN
+        RAISE NOTICE 'attendance_default holds rows for %, not creating %', lower_bound, part_name;
+        RETURN NULL;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %s PARTITION OF attendance FOR VALUES FROM (%L) TO (%L)',
+        part_name, lower_bound, upper_bound
+    );
+    RETURN part_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Make sure partitions exist from the current month through months_ahead
+CREATE OR REPLACE FUNCTION ensure_attendance_partitions(months_ahead INTEGER) RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE := date_trunc('month', CURRENT_DATE)::date;
+    created INTEGER := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        IF create_attendance_partition(month_start) IS NOT NULL THEN
+            created := created + 1;
+        END IF;
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE attendance RENAME TO attendance_unpartitioned;
+
+CREATE TABLE attendance (
+    id INTEGER NOT NULL DEFAULT nextval('attendance_id_seq'),
+    student_id INTEGER NOT NULL
+        REFERENCES students(id) ON DELETE CASCADE,
+    status attendance_status NOT NULL,
+    activity_type activity_type DEFAULT 'VOICE_COMMAND',
+    reason TEXT,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE attendance_default PARTITION OF attendance DEFAULT;
+
+-- One partition per month of existing history, plus the upcoming months
+DO $$
+DECLARE
+    month_start DATE;
+BEGIN
+    SELECT date_trunc('month', MIN(timestamp))::date INTO month_start
+    FROM attendance_unpartitioned;
+
+    WHILE month_start < date_trunc('month', CURRENT_DATE) LOOP
+        PERFORM create_attendance_partition(month_start);
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+
+    PERFORM ensure_attendance_partitions(3);
+END;
+$$;
+
+-- Copy history before the triggers exist: derived tables are already current
+INSERT INTO attendance (id, student_id, status, activity_type, reason, timestamp)
+SELECT id, student_id, status, activity_type, reason, timestamp
+FROM attendance_unpartitioned;
+
+ALTER SEQUENCE attendance_id_seq OWNED BY attendance.id;
+DROP TABLE attendance_unpartitioned;
+
+-- Unique constraints on a partitioned table must include the partition key
+ALTER TABLE attendance ADD PRIMARY KEY (id, timestamp);
+
+CREATE INDEX idx_attendance_timestamp ON attendance (timestamp);
+CREATE INDEX idx_attendance_student_ts ON attendance (student_id, timestamp DESC);
+CREATE INDEX idx_attendance_inside_ts ON attendance (timestamp, student_id) WHERE status = 'INSIDE';
+CREATE INDEX idx_attendance_outside_ts ON attendance (timestamp, student_id) WHERE status = 'OUTSIDE';
+
+CREATE TRIGGER trg_attendance_current_status
+    AFTER INSERT ON attendance
+    FOR EACH ROW EXECUTE FUNCTION attendance_apply_current_status();
+
+CREATE TRIGGER trg_attendance_summary
+    AFTER INSERT ON attendance
+    FOR EACH ROW EXECUTE FUNCTION attendance_apply_summary();
@@ -0,0 +1,19 @@
+-- Tell in-process roster caches when students or cards change. One
+-- statement-level notification per write, so bulk imports send one NOTIFY.
+
+CREATE OR REPLACE FUNCTION notify_roster_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('roster_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_students_roster_notify ON students;
+CREATE TRIGGER trg_students_roster_notify
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_roster_changed();
+
+DROP TRIGGER IF EXISTS trg_rfid_cards_roster_notify ON rfid_cards;
+CREATE TRIGGER trg_rfid_cards_roster_notify
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON rfid_cards
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_roster_changed();
@@ -0,0 +1,9 @@
+-- Events recorded offline by an edge gate carry a client-generated UUID so
+-- the sync worker can resend a batch without creating duplicates. Rows
+-- written directly (voice commands, online RFID) leave it NULL.
+-- Unique indexes on a partitioned table must include the partition key.
+
+ALTER TABLE attendance ADD COLUMN IF NOT EXISTS event_uuid UUID;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_event_uuid
+    ON attendance (event_uuid, timestamp);
@@ -0,0 +1,42 @@
+-- Publish every change of a student's current status so in-process
+-- occupancy counters stay live without polling. Fired from
+-- student_current_status (not attendance) so late events that don't change
+-- the status stay silent. Payload: {"student_id", "status", "program", "active"}.
+
+CREATE OR REPLACE FUNCTION notify_occupancy_changed() RETURNS trigger AS $$
+DECLARE
+    row_data student_current_status%ROWTYPE;
+    payload JSON;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := OLD;
+    ELSE
+        row_data := NEW;
+    END IF;
+
+    SELECT json_build_object(
+        'student_id', row_data.student_id,
+        -- a deleted student is no longer inside
+        'status', CASE WHEN TG_OP = 'DELETE' THEN 'OUTSIDE' ELSE row_data.status::text END,
+        'program', s.program,
+        'active', COALESCE(s.is_active, FALSE)
+    ) INTO payload
+    FROM (SELECT 1) one
+    LEFT JOIN students s ON s.id = row_data.student_id;
+
+    PERFORM pg_notify('occupancy_changed', payload::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_current_status_occupancy_change ON student_current_status;
+CREATE TRIGGER trg_current_status_occupancy_change
+    AFTER INSERT OR DELETE ON student_current_status
+    FOR EACH ROW EXECUTE FUNCTION notify_occupancy_changed();
+
+DROP TRIGGER IF EXISTS trg_current_status_occupancy_update ON student_current_status;
+CREATE TRIGGER trg_current_status_occupancy_update
+    AFTER UPDATE ON student_current_status
+    FOR EACH ROW
+    WHEN (OLD.status IS DISTINCT FROM NEW.status)
+    EXECUTE FUNCTION notify_occupancy_changed();
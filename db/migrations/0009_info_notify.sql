@@ -0,0 +1,24 @@
+-- Tell in-process info caches when centre info, projects or guests change.
+-- Payload is the table name so only that table's cached answers are dropped.
+
+CREATE OR REPLACE FUNCTION notify_info_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('info_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_trait_info_notify ON trait_info;
+CREATE TRIGGER trg_trait_info_notify
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON trait_info
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_info_changed();
+
+DROP TRIGGER IF EXISTS trg_projects_notify ON projects;
+CREATE TRIGGER trg_projects_notify
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON projects
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_info_changed();
+
+DROP TRIGGER IF EXISTS trg_guests_notify ON guests;
+CREATE TRIGGER trg_guests_notify
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON guests
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_info_changed();
@@ -0,0 +1,44 @@
+-- Indexed search over projects and guests (db/search.py).
+--
+-- Full-text: a weighted tsvector per row (title/name first), kept up to
+-- date as a generated column and GIN-indexed.
+-- Fuzzy: pg_trgm word-similarity on the lower-cased title/name, for
+-- misheard or partial voice input. pg_trgm ships with the standard
+-- PostgreSQL contrib packages; where it isn't available the trigram part is
+-- skipped and search falls back to full-text ranking only.
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    END IF;
+END;
+$$;
+
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(domain, '') || ' ' || coalesce(mentor, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED;
+
+ALTER TABLE guests ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(organization, '') || ' ' || coalesce(designation, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(visit_purpose, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_projects_search ON projects USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_guests_search ON guests USING GIN (search_vector);
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+        CREATE INDEX IF NOT EXISTS idx_projects_title_trgm
+            ON projects USING GIN (lower(title) gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_guests_name_trgm
+            ON guests USING GIN (lower(name) gin_trgm_ops);
+    END IF;
+END;
+$$;
@@ -0,0 +1,11 @@
+-- WhatsApp message ids already handled, so webhook redeliveries are ignored
+-- across restarts and across several app processes. Rows older than the
+-- dedupe window are purged by the app.
+
+CREATE TABLE IF NOT EXISTS processed_messages (
+    message_id TEXT PRIMARY KEY,
+    received_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_processed_messages_received_at
+    ON processed_messages (received_at);
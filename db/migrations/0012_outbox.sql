@@ -0,0 +1,23 @@
+-- Outgoing WhatsApp replies. Rows are written before sending, so queued
+-- replies survive restarts; senders claim rows with FOR UPDATE SKIP LOCKED,
+-- so several app processes can share the queue.
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id BIGSERIAL PRIMARY KEY,
+    recipient TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'PENDING'
+        CHECK (status IN ('PENDING', 'SENDING', 'SENT', 'FAILED')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    claimed_at TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP,
+    provider_message_id TEXT,
+    last_error TEXT
+);
+
+-- Only unfinished rows are indexed; sent history doesn't slow down claiming
+CREATE INDEX IF NOT EXISTS idx_outbox_due
+    ON outbox (next_attempt_at, id)
+    WHERE status IN ('PENDING', 'SENDING');
@@ -0,0 +1,7 @@
+-- Long AI answers are sent as several messages. Senders only claim a
+-- recipient's oldest unfinished message, so parallel workers and retries
+-- can't deliver the parts out of order; this index backs that check.
+
+CREATE INDEX IF NOT EXISTS idx_outbox_recipient_unfinished
+    ON outbox (recipient, id)
+    WHERE status IN ('PENDING', 'SENDING');
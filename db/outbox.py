@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from typing import List, NamedTuple, Optional
+
+from db.database import cursor
+from db.migrate import ensure_schema
+
+
+class OutboxMessage(NamedTuple):
+    id: int
+    recipient: str
+    body: str
+    attempts: int
+
+
+def enqueue_message(recipient: str, body: str) -> int:
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute(
+            "INSERT INTO outbox (recipient, body) VALUES (%s, %s) RETURNING id",
+            (recipient, body),
+        )
+        return cur.fetchone()[0]
+
+
+def claim_messages(limit: int, stale_after: float) -> List[OutboxMessage]:
+    """
+    Mark up to ``limit`` due messages as SENDING and return them, oldest
+    first. Rows left in SENDING for ``stale_after`` seconds (the sender died
+    mid-send) are claimed again. A message waits while an older one to the
+    same recipient is unfinished, so multi-part replies arrive in order.
+    """
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute(
+            """
+            WITH due AS (
+                SELECT id
+                FROM outbox
+                WHERE ((status = 'PENDING' AND next_attempt_at <= CURRENT_TIMESTAMP)
+                    OR (status = 'SENDING' AND claimed_at < CURRENT_TIMESTAMP - make_interval(secs => %(stale)s)))
+                  -- one message at a time per recipient, oldest first
+                  AND NOT EXISTS (
+                      SELECT 1 FROM outbox earlier
+                      WHERE earlier.recipient = outbox.recipient
+                        AND earlier.id < outbox.id
+                        AND earlier.status IN ('PENDING', 'SENDING')
+                  )
+                ORDER BY next_attempt_at, id
+                LIMIT %(limit)s
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE outbox o
+            SET status = 'SENDING', claimed_at = CURRENT_TIMESTAMP, attempts = o.attempts + 1
+            FROM due
+            WHERE o.id = due.id
+            RETURNING o.id, o.recipient, o.body, o.attempts
+            """,
+            {"limit": limit, "stale": stale_after},
+        )
+        rows = sorted(cur.fetchall())
+    return [OutboxMessage(*row) for row in rows]
+
+
+def mark_sent(message_id: int, provider_message_id: Optional[str]) -> Optional[float]:
+    """Returns seconds from enqueue to delivery."""
+    with cursor() as cur:
+        cur.execute(
+            """
+            UPDATE outbox
+            SET status = 'SENT', sent_at = clock_timestamp(), provider_message_id = %s, last_error = NULL
+            WHERE id = %s
+            RETURNING EXTRACT(EPOCH FROM sent_at - created_at)
+            """,
+            (provider_message_id, message_id),
+        )
+        row = cur.fetchone()
+    return float(row[0]) if row else None
+
+
+def mark_retry(message_id: int, delay: float, error: str) -> None:
+    with cursor() as cur:
+        cur.execute(
+            """
+            UPDATE outbox
+            SET status = 'PENDING', last_error = %s,
+                next_attempt_at = clock_timestamp() + make_interval(secs => %s)
+            WHERE id = %s
+            """,
+            (error, delay, message_id),
+        )
+
+
+def mark_failed(message_id: int, error: str) -> None:
+    with cursor() as cur:
+        cur.execute(
+            "UPDATE outbox SET status = 'FAILED', last_error = %s WHERE id = %s",
+            (error, message_id),
+        )
+
+
+def outbox_counts() -> dict:
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status")
+        return dict(cur.fetchall())
+
+
+def purge_sent(older_than_days: int) -> int:
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute(
+            """
+            DELETE FROM outbox
+            WHERE status = 'SENT' AND sent_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+            """,
+            (older_than_days,),
+        )
+        return cur.rowcount
+
+
+# asyncpg versions for the async server (pool from db.async_database)
+
+async def enqueue_message_async(pool, recipient: str, body: str) -> int:
+    return await pool.fetchval(
+        "INSERT INTO outbox (recipient, body) VALUES ($1, $2) RETURNING id",
+        recipient, body,
+    )
+
+
+async def claim_messages_async(pool, limit: int, stale_after: float) -> List[OutboxMessage]:
+    rows = await pool.fetch(
+        """
+        WITH due AS (
+            SELECT id
+            FROM outbox
+            WHERE ((status = 'PENDING' AND next_attempt_at <= CURRENT_TIMESTAMP)
+                OR (status = 'SENDING' AND claimed_at < CURRENT_TIMESTAMP - make_interval(secs => $2)))
+              -- one message at a time per recipient, oldest first
+              AND NOT EXISTS (
+                  SELECT 1 FROM outbox earlier
+                  WHERE earlier.recipient = outbox.recipient
+                    AND earlier.id < outbox.id
+                    AND earlier.status IN ('PENDING', 'SENDING')
+              )
+            ORDER BY next_attempt_at, id
+            LIMIT $1
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE outbox o
+        SET status = 'SENDING', claimed_at = CURRENT_TIMESTAMP, attempts = o.attempts + 1
+        FROM due
+        WHERE o.id = due.id
+        RETURNING o.id, o.recipient, o.body, o.attempts
+        """,
+        limit, float(stale_after),
+    )
+    return sorted(OutboxMessage(*row) for row in rows)
+
+
+async def mark_sent_async(pool, message_id: int, provider_message_id: Optional[str]) -> Optional[float]:
+    seconds = await pool.fetchval(
+        """
+        UPDATE outbox
+        SET status = 'SENT', sent_at = clock_timestamp(), provider_message_id = $1, last_error = NULL
+        WHERE id = $2
+        RETURNING EXTRACT(EPOCH FROM sent_at - created_at)
+        """,
+        provider_message_id, message_id,
+    )
+    return float(seconds) if seconds is not None else None
+
+
+async def mark_retry_async(pool, message_id: int, delay: float, error: str) -> None:
+    await pool.execute(
+        """
+        UPDATE outbox
+        SET status = 'PENDING', last_error = $1,
+            next_attempt_at = clock_timestamp() + make_interval(secs => $2)
+        WHERE id = $3
+        """,
+        error, float(delay), message_id,
+    )
+
+
+async def mark_failed_async(pool, message_id: int, error: str) -> None:
+    await pool.execute(
+        "UPDATE outbox SET status = 'FAILED', last_error = $1 WHERE id = $2",
+        error, message_id,
+    )
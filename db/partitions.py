@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import gzip
+import os
+import re
+import threading
+import time
+from datetime import date
+from typing import List, NamedTuple
+
+from db.database import connection, cursor
+
+# How many months past the current one should always have a partition
+PARTITION_MONTHS_AHEAD = int(os.getenv("ATTENDANCE_PARTITION_MONTHS_AHEAD", "3"))
+# How often a running process re-checks them (0 disables the background check)
+PARTITION_CHECK_HOURS = float(os.getenv("ATTENDANCE_PARTITION_CHECK_HOURS", "24"))
+
+_PARTITION_RE = re.compile(r"^attendance_(\d{4})_(\d{2})$")
+
+
+class Partition(NamedTuple):
+    name: str
+    month: date
+    rows: int
+
+
+def ensure_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD) -> int:
+    """Create any missing monthly partitions. Returns how many were created."""
+    with cursor() as cur:
+        cur.execute("SELECT ensure_attendance_partitions(%s)", (months_ahead,))
+        return cur.fetchone()[0]
+
+
+_maintenance_thread = None
+_maintenance_lock = threading.Lock()
+
+
+def start_partition_maintenance(interval_hours: float = PARTITION_CHECK_HOURS) -> None:
+    """
+    Re-run ensure_partitions() every ``interval_hours`` on a daemon thread,
+    so a process that stays up for months never runs past its last
+    partition. Started once per process; errors are retried next interval.
+    """
+    global _maintenance_thread
+    if interval_hours <= 0:
+        return
+    with _maintenance_lock:
+        if _maintenance_thread is not None:
+            return
+        _maintenance_thread = threading.Thread(
+            target=_maintain, args=(interval_hours * 3600,), name="attendance-partitions", daemon=True
+        )
+        _maintenance_thread.start()
+
+
+def _maintain(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            created = ensure_partitions()
+            if created:
+                print(f"Created {created} attendance partition(s)")
+        except Exception as e:
+            print("Partition maintenance error:", e)
+
+
+def list_partitions() -> List[Partition]:
+    """Monthly attendance partitions (oldest first) with estimated row counts."""
+    with cursor() as cur:
+        cur.execute(
+            """
+            SELECT c.relname, c.reltuples::bigint
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'attendance'::regclass
+            """
+        )
+        rows = cur.fetchall()
+
+    partitions = []
+    for name, estimate in rows:
+        m = _PARTITION_RE.match(name)
+        if m:
+            month = date(int(m.group(1)), int(m.group(2)), 1)
+            partitions.append(Partition(name, month, max(estimate, 0)))
+    return sorted(partitions, key=lambda p: p.month)
+
+
+def _months_before(day: date, months: int) -> date:
+    index = day.year * 12 + (day.month - 1) - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def archive_partitions(keep_months: int, out_dir: str, drop: bool = True) -> List[str]:
+    """
+    Export every monthly partition older than ``keep_months`` full months to
+    ``out_dir/attendance_YYYY_MM.csv.gz`` and then detach (and by default
+    drop) it. Daily rollups in attendance_summary are kept.
+
+    Returns the paths written.
+    """
+    if keep_months < 1:
+        raise ValueError("keep_months must be at least 1")
+
+    cutoff = _months_before(date.today().replace(day=1), keep_months)
+    os.makedirs(out_dir, exist_ok=True)
+
+    written = []
+    for partition in list_partitions():
+        if partition.month >= cutoff:
+            break
+
+        path = os.path.join(out_dir, f"{partition.name}.csv.gz")
+        tmp_path = path + ".tmp"
+
+        # Export while still attached: no inserts land in closed months, and
+        # reading does not block the gate.
+        with connection() as conn:
+            cur = conn.cursor()
+            with gzip.open(tmp_path, "wt", encoding="utf-8", newline="") as f:
+                cur.copy_expert(
+                    f'COPY "{partition.name}" TO STDOUT WITH (FORMAT csv, HEADER)', f
+                )
+        os.replace(tmp_path, path)
+
+        with connection() as conn:
+            cur = conn.cursor()
+            cur.execute(f'ALTER TABLE attendance DETACH PARTITION "{partition.name}"')
+            if drop:
+                cur.execute(f'DROP TABLE "{partition.name}"')
+
+        print(f"Archived {partition.name} -> {path}")
+        written.append(path)
+
+    return written
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import List, Sequence
+
+from db.database import cursor
+from db.migrate import ensure_schema
+
+
+def claim_message_ids(message_ids: Sequence[str]) -> List[str]:
+    """
+    Record ``message_ids`` as processed and return the ones that were not
+    already recorded (one statement, safe across processes).
+    """
+    if not message_ids:
+        return []
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO processed_messages (message_id)
+            SELECT DISTINCT unnest(%s::text[])
+            ON CONFLICT (message_id) DO NOTHING
+            RETURNING message_id
+            """,
+            (list(message_ids),),
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+def purge_processed_messages(older_than_seconds: float) -> int:
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute(
+            "DELETE FROM processed_messages WHERE received_at < CURRENT_TIMESTAMP - make_interval(secs => %s)",
+            (older_than_seconds,),
+        )
+        return cur.rowcount
+
+
+# asyncpg versions for the async server (pool from db.async_database)
+
+async def claim_message_ids_async(pool, message_ids: Sequence[str]) -> List[str]:
+    if not message_ids:
+        return []
+    rows = await pool.fetch(
+        """
+        INSERT INTO processed_messages (message_id)
+        SELECT DISTINCT unnest($1::text[])
+        ON CONFLICT (message_id) DO NOTHING
+        RETURNING message_id
+        """,
+        list(message_ids),
+    )
+    return [row[0] for row in rows]
+
+
+async def purge_processed_messages_async(pool, older_than_seconds: float) -> None:
+    await pool.execute(
+        "DELETE FROM processed_messages WHERE received_at < CURRENT_TIMESTAMP - make_interval(secs => $1)",
+        float(older_than_seconds),
+    )
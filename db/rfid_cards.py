@@ -1,9 +1,25 @@
 from __future__ import annotations
 
+import os
+import threading
 from typing import Optional
 import psycopg2.extras
 
-from db.database import get_conn, init_db
+from db import listener
+from db.cache import TTLCache
+from db.database import cursor
+from db.migrate import ensure_schema
+from db.roster import ROSTER_CHANNEL, get_roster, invalidate_roster
+
+# UID -> student cache. Unknown cards are cached too (as None) for a shorter
+# time, so a newly registered card works soon even without NOTIFY.
+UID_CACHE_SIZE = int(os.getenv("RFID_UID_CACHE_SIZE", "10000"))
+UID_CACHE_TTL = float(os.getenv("RFID_UID_CACHE_TTL", "300"))
+UID_CACHE_NEGATIVE_TTL = float(os.getenv("RFID_UID_CACHE_NEGATIVE_TTL", "60"))
+
+_uid_cache = TTLCache(UID_CACHE_SIZE, UID_CACHE_TTL, UID_CACHE_NEGATIVE_TTL)
+_subscribed = False
+_subscribe_lock = threading.Lock()
 
 
 def get_user_from_uid(uid: str) -> Optional[dict]:
@@ -11,22 +27,54 @@ def get_user_from_uid(uid: str) -> Optional[dict]:
     if not uid:
         return None
 
-    init_db()
-
-    conn = get_conn()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute(
-        """
-        SELECT s.id, s.name, s.uid, s.program
-        FROM rfid_cards r
-        JOIN students s ON s.id = r.user_id
-                WHERE r.uid = %s
-                    AND r.is_active = TRUE
-                    AND s.is_active = TRUE
-        LIMIT 1
-        """,
-        (uid,),
-    )
-    row = cur.fetchone()
-    conn.close()
+    global _subscribed
+    if not _subscribed:
+        with _subscribe_lock:
+            if not _subscribed:
+                # students/rfid_cards changes (and listener reconnects) drop everything
+                listener.subscribe(ROSTER_CHANNEL, _on_roster_changed)
+                _subscribed = True
+
+    user = _uid_cache.get_or_load(uid, _load_user)
+    # callers may mutate the dict; keep the cached copy clean
+    return dict(user) if user else None
+
+
+def _on_roster_changed(_payload=None) -> None:
+    # _load_user reads the roster, so mark it stale first: otherwise, if the
+    # roster's own callback runs after this one, a lookup in between would
+    # refill the UID cache from the old snapshot.
+    invalidate_roster()
+    _uid_cache.clear()
+
+
+def _load_user(uid: str) -> Optional[dict]:
+    entry = get_roster().by_card_uid.get(uid)
+    if entry:
+        return entry.as_user()
+
+    ensure_schema()
+
+    with cursor(psycopg2.extras.RealDictCursor) as cur:
+        cur.execute(
+            """
+            SELECT s.id, s.name, s.uid, s.program
+            FROM rfid_cards r
+            JOIN students s ON s.id = r.user_id
+            WHERE r.uid = %s
+              AND r.is_active = TRUE
+              AND s.is_active = TRUE
+            LIMIT 1
+            """,
+            (uid,),
+        )
+        row = cur.fetchone()
     return dict(row) if row else None
+
+
+def invalidate_uid_cache() -> None:
+    _on_roster_changed()
+
+
+def uid_cache_stats() -> dict:
+    return _uid_cache.stats()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from db import listener
+from db.database import cursor
+from db.migrate import ensure_schema
+
+# Channel notified by the students/rfid_cards triggers (migration 0006)
+ROSTER_CHANNEL = "roster_changed"
+
+# Reload at least this often even if no notification arrives (seconds)
+ROSTER_CACHE_TTL = float(os.getenv("ROSTER_CACHE_TTL", "300"))
+
+
+class StudentEntry(NamedTuple):
+    id: int
+    name: str
+    uid: str
+    program: Optional[str]
+    card_uids: Tuple[str, ...]
+
+    def as_user(self) -> dict:
+        """Same shape as db.rfid_cards.get_user_from_uid rows."""
+        return {"id": self.id, "name": self.name, "uid": self.uid, "program": self.program}
+
+
+class Roster:
+    """Immutable snapshot of every active student and their active cards."""
+
+    def __init__(self, students: List[StudentEntry], generation: int):
+        self.students = students
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+
+        self.by_id: Dict[int, StudentEntry] = {}
+        self.by_name: Dict[str, StudentEntry] = {}
+        self.by_card_uid: Dict[str, StudentEntry] = {}
+        for entry in students:
+            self.by_id[entry.id] = entry
+            self.by_name.setdefault(entry.name, entry)
+            for card_uid in entry.card_uids:
+                self.by_card_uid[card_uid] = entry
+
+        self.names = [entry.name for entry in students]
+
+
+class RosterCache:
+    """
+    Process-wide roster, loaded once and reused until a roster_changed
+    notification (or the TTL) marks it stale. Readers always get a complete
+    snapshot; a stale one is replaced by a single reload.
+    """
+
+    def __init__(self, ttl: float = ROSTER_CACHE_TTL):
+        self.ttl = ttl
+        self._snapshot: Optional[Roster] = None
+        self._generation = 0
+        self._gen_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.loads = 0
+
+    def _is_fresh(self, snapshot: Optional[Roster]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.generation == self._generation
+            and time.monotonic() - snapshot.loaded_at < self.ttl
+        )
+
+    def invalidate(self, _payload=None) -> None:
+        with self._gen_lock:
+            self._generation += 1
+
+    def get(self) -> Roster:
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        with self._load_lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+
+            # A notification arriving mid-load bumps the generation, so this
+            # snapshot is reloaded again on the next call.
+            generation = self._generation
+            snapshot = Roster(_load_students(), generation)
+            self._snapshot = snapshot
+            self.loads += 1
+            return snapshot
+
+
+def _load_students() -> List[StudentEntry]:
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute(
+            """
+            SELECT s.id, s.name, s.uid, s.program,
+                   COALESCE(
+                       ARRAY_AGG(r.uid ORDER BY r.uid) FILTER (WHERE r.uid IS NOT NULL),
+                       '{}'
+                   )
+            FROM students s
+            LEFT JOIN rfid_cards r ON r.user_id = s.id AND r.is_active = TRUE
+            WHERE s.is_active = TRUE
+            GROUP BY s.id
+            ORDER BY s.id
+            """
+        )
+        return [
+            StudentEntry(id=r[0], name=r[1], uid=r[2], program=r[3], card_uids=tuple(r[4]))
+            for r in cur.fetchall()
+        ]
+
+
+_cache = RosterCache()
+_subscribed = False
+_subscribe_lock = threading.Lock()
+
+
+def get_roster() -> Roster:
+    global _subscribed
+    if not _subscribed:
+        with _subscribe_lock:
+            if not _subscribed:
+                listener.subscribe(ROSTER_CHANNEL, _cache.invalidate)
+                _subscribed = True
+    return _cache.get()
+
+
+def invalidate_roster() -> None:
+    _cache.invalidate()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import List, Optional
+
+import psycopg2.extras
+
+from db.database import cursor
+from db.migrate import ensure_schema
+
+# Ranked search over projects and guests (indexes from migration 0010).
+#
+# A row matches if its title/name is trigram-similar to the query (pg_trgm
+# word similarity, robust to misheard words) or its text matches any query
+# word (full-text). Score is the better of the two, both in [0, 1).
+
+# Any query word may match; plainto_tsquery would require all of them
+_ANY_WORD_TSQUERY = "replace(plainto_tsquery('english', %(term)s)::text, '&', '|')::tsquery"
+
+PROJECT_COLUMNS = "id, title, description, domain, status, mentor, start_date, end_date"
+GUEST_COLUMNS = "id, name, welcome_note, organization, designation, visit_purpose, visit_date"
+
+# Single-answer lookups (info_service) ignore rows scoring below this: a
+# title word scores about 0.35, a lone word found only in a description
+# about 0.1, and query words that match nothing pull the rank down further.
+SEARCH_MIN_SCORE = float(os.getenv("SEARCH_MIN_SCORE", "0.2"))
+
+
+def _search_sql(table: str, columns: str, key: str, trigram: bool) -> str:
+    # The tsquery is written inline (not in a subquery) so the planner folds
+    # it to a constant and can use the GIN indexes.
+    tsq = _ANY_WORD_TSQUERY
+    if trigram:
+        match = f"(%(lower_term)s <%% lower({key}) OR search_vector @@ {tsq})"
+        score = f"GREATEST(word_similarity(%(lower_term)s, lower({key})), ts_rank(search_vector, {tsq}, 32))"
+    else:
+        match = f"search_vector @@ {tsq}"
+        score = f"ts_rank(search_vector, {tsq}, 32)"
+
+    return f"""
+        SELECT {columns}, {score} AS score
+        FROM {table}
+        WHERE {match}
+        ORDER BY score DESC, id DESC
+        LIMIT %(limit)s
+    """
+
+
+_has_trigram: Optional[bool] = None
+_trigram_lock = threading.Lock()
+
+
+def has_trigram() -> bool:
+    """Whether pg_trgm is installed (checked once per process)."""
+    global _has_trigram
+    if _has_trigram is None:
+        with _trigram_lock:
+            if _has_trigram is None:
+                ensure_schema()
+                with cursor() as cur:
+                    cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                    _has_trigram = cur.fetchone() is not None
+    return _has_trigram
+
+
+def _search(table: str, columns: str, key: str, term: str, limit: int,
+            min_score: float) -> List[dict]:
+    term = (term or "").strip()
+    if not term:
+        return []
+
+    sql = _search_sql(table, columns, key, has_trigram())
+    with cursor(psycopg2.extras.RealDictCursor) as cur:
+        cur.execute(sql, {"term": term, "lower_term": term.lower(), "limit": limit})
+        return [dict(row) for row in cur.fetchall() if row["score"] >= min_score]
+
+
+def search_projects(term: str, limit: int = 5, min_score: float = 0.0) -> List[dict]:
+    """Best matching projects for ``term``, best first, each with a ``score``."""
+    return _search("projects", PROJECT_COLUMNS, "title", term, limit, min_score)
+
+
+def search_guests(term: str, limit: int = 5, min_score: float = 0.0) -> List[dict]:
+    """Best matching guests for ``term``, best first, each with a ``score``."""
+    return _search("guests", GUEST_COLUMNS, "name", term, limit, min_score)
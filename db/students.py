@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-import psycopg2
-from typing import Iterable, Optional, Sequence, Tuple
+import csv
+import io
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
-from db.database import get_conn, init_db
+from db.database import connection, cursor
+from db.migrate import ensure_schema
 
 
 def get_name_from_uid(uid: str) -> Optional[str]:
@@ -11,11 +13,9 @@ def get_name_from_uid(uid: str) -> Optional[str]:
     if not uid:
         return None
 
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT name FROM students WHERE uid = %s AND is_active = TRUE LIMIT 1", (uid,))
-    row = cur.fetchone()
-    conn.close()
+    with cursor() as cur:
+        cur.execute("SELECT name FROM students WHERE uid = %s AND is_active = TRUE LIMIT 1", (uid,))
+        row = cur.fetchone()
     return row[0] if row else None
 
 
@@ -29,13 +29,11 @@ def upsert_student(name: str, uid: str, program: str | None = None) -> None:
     if not uid:
         raise ValueError("Student UID cannot be empty")
 
-    init_db()
-
-    conn = get_conn()
-    cur = conn.cursor()
+    ensure_schema()
 
     # Use PostgreSQL UPSERT with ON CONFLICT (uid is unique)
-    try:
+    with connection() as conn:
+        cur = conn.cursor()
         cur.execute(
             """
             INSERT INTO students (name, uid, program)
@@ -48,31 +46,114 @@ def upsert_student(name: str, uid: str, program: str | None = None) -> None:
             """,
             (name, uid, program),
         )
-    except psycopg2.Error as e:
-        conn.rollback()
-        conn.close()
-        raise
 
-    conn.commit()
-    conn.close()
+
+class ImportResult(NamedTuple):
+    inserted: int
+    updated: int
+    unchanged: int
+    deactivated: int
+
+
+def _normalize_rows(
+    students: Iterable[Tuple[str, str, str | None]],
+) -> List[Tuple[str, str, str | None]]:
+    # Same cleanup/validation as upsert_student; the last row wins per UID
+    by_uid = {}
+    for line, (name, uid, program) in enumerate(students, start=1):
+        name = (name or "").strip().lower()
+        uid = (uid or "").strip()
+        program = (program or "").strip() or None
+
+        if not name:
+            raise ValueError(f"Row {line}: student name cannot be empty")
+        if not uid:
+            raise ValueError(f"Row {line}: student UID cannot be empty")
+
+        by_uid[uid] = (name, uid, program)
+    return list(by_uid.values())
+
+
+def import_students(
+    students: Iterable[Tuple[str, str, str | None]],
+    deactivate_missing: bool = False,
+) -> ImportResult:
+    """
+    Load a whole roster in one transaction: COPY into a temp staging table,
+    then a single set-based upsert keyed on UID. With ``deactivate_missing``,
+    active students whose UID is not in the roster are marked inactive.
+    """
+    rows = _normalize_rows(students)
+
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+
+    ensure_schema()
+
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TEMP TABLE student_import (
+                name VARCHAR(255) NOT NULL,
+                uid VARCHAR(50) NOT NULL,
+                program VARCHAR(100)
+            ) ON COMMIT DROP
+            """
+        )
+        cur.copy_expert("COPY student_import (name, uid, program) FROM STDIN WITH (FORMAT csv)", buf)
+
+        # Rows that would not change are skipped, so "updated" is accurate
+        cur.execute(
+            """
+            INSERT INTO students (name, uid, program)
+            SELECT name, uid, program FROM student_import
+            ON CONFLICT(uid) DO UPDATE SET
+                name = EXCLUDED.name,
+                program = EXCLUDED.program,
+                is_active = TRUE,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE (students.name, students.program, students.is_active)
+                IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.program, TRUE)
+            RETURNING (xmax = 0) AS inserted
+            """
+        )
+        outcomes = [r[0] for r in cur.fetchall()]
+        inserted = sum(1 for was_insert in outcomes if was_insert)
+        updated = len(outcomes) - inserted
+
+        deactivated = 0
+        if deactivate_missing:
+            cur.execute(
+                """
+                UPDATE students s
+                SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP
+                WHERE s.is_active = TRUE
+                  AND NOT EXISTS (SELECT 1 FROM student_import i WHERE i.uid = s.uid)
+                """
+            )
+            deactivated = cur.rowcount
+
+    return ImportResult(
+        inserted=inserted,
+        updated=updated,
+        unchanged=len(rows) - inserted - updated,
+        deactivated=deactivated,
+    )
 
 
 def bulk_upsert_students(
     students: Iterable[Tuple[str, str, str | None]],
 ) -> int:
     """Insert/update many students. Returns how many rows were processed."""
-    count = 0
-    for name, uid, program in students:
-        upsert_student(name, uid, program)
-        count += 1
-    return count
+    result = import_students(students)
+    return result.inserted + result.updated + result.unchanged
 
 
 def get_all_student_names() -> Sequence[str]:
-    init_db()
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT name FROM students WHERE is_active = TRUE ORDER BY name ASC")
-    rows = cur.fetchall()
-    conn.close()
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute("SELECT name FROM students WHERE is_active = TRUE ORDER BY name ASC")
+        rows = cur.fetchall()
     return [r[0] for r in rows]
@@ -1,33 +1,69 @@
-from db.database import init_db
-from services.rfid_service import handle_rfid_event
+import argparse
+
+from db.database import UNAVAILABLE_ERRORS, init_db
+from services.edge_journal import EdgeJournal, EdgeRecorder, SyncWorker
+from services.rfid_ingest import IngestRecorder
+from services.rfid_reader import RFID_DEBOUNCE_SECONDS, AudioWorker, RfidReaderDaemon, open_device
 from voice.listen_whisper import listen_whisper
 from voice.speak import speak
 
-# SIMULATION: type UID + action in laptop terminal
-# Later on Raspberry Pi, this will come from RFID reader automatically.
-
-init_db()
-speak("RFID mode ready. Waiting for scans.")
-
-while True:
-    print("\n📌 Enter RFID UID (or type exit):")
-    uid = input("UID: ").strip()
-    if uid.lower() == "exit":
-        break
-
-    action = input("Action (in/out): ").strip().lower()
-    if action not in ["in", "out"]:
-        print("❌ Invalid action. Use in/out.")
-        continue
-
-    # If OUT → ask reason using voice
-    reason = ""
-    if action == "out":
-        speak("Why is the student out?")
-        reason = listen_whisper(seconds=4).strip()
-        if not reason:
-            reason = "No reason given"
-
-    result = handle_rfid_event(uid, action, reason)
-    speak(result)
-    print("✅", result)
+# Reads cards from the RFID reader and toggles students in/out.
+# On a laptop, the default "stdin" device lets you type UIDs (one per line),
+# which is also how USB keyboard-wedge readers deliver them on the Raspberry Pi.
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TRAIT Buddy RFID gate")
+    parser.add_argument("--device", default="stdin",
+                        help="stdin | file:/path | serial:/dev/ttyUSB0[@9600] | fake:UID1,UID2")
+    parser.add_argument("--debounce", type=float, default=RFID_DEBOUNCE_SECONDS,
+                        help="seconds to ignore repeated reads of the same card")
+    parser.add_argument("--no-reasons", action="store_true",
+                        help="do not ask students why they are going out")
+    parser.add_argument("--edge", action="store_true",
+                        help="record taps in a local journal and sync to PostgreSQL in the background")
+    args = parser.parse_args()
+
+    recorder = None
+    worker = None
+    if args.edge:
+        # The gate keeps working if the server is down at startup
+        try:
+            init_db()
+        except UNAVAILABLE_ERRORS as e:
+            print("⚠️ Database unreachable, starting offline:", e)
+        journal = EdgeJournal()
+        worker = SyncWorker(journal).start()
+        recorder = EdgeRecorder(journal, worker)
+    else:
+        init_db()
+        # Taps are group-committed through the shared ingestion queue
+        recorder = IngestRecorder()
+
+    audio = AudioWorker(speak, listen_whisper)
+    daemon = RfidReaderDaemon(
+        open_device(args.device),
+        audio,
+        recorder=recorder,
+        debounce_window=args.debounce,
+        capture_reasons=not args.no_reasons,
+    )
+
+    audio.announce("RFID mode ready. Waiting for scans.")
+    print("\n📌 Waiting for RFID scans (type exit to stop)")
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Drain queued taps first so their feedback is announced
+        if isinstance(recorder, IngestRecorder):
+            recorder.stop(timeout=10)
+        audio.stop(timeout=10)
+        if worker:
+            worker.stop(timeout=10)
+            print("Edge journal:", worker.stats())
+
+
+if __name__ == "__main__":
+    main()
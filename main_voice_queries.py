@@ -1,24 +1,12 @@
 from voice.listen_whisper import listen_whisper
-from voice.speak import speak
-from services.name_matcher import get_all_student_names, match_name
-from services.ai_service import get_ai_response
+from voice.speak import speak, speak_stream
+from services.ai_service import stream_ai_response
+from services.attendance_service import set_offline_status_lookup
+from services.edge_journal import local_status_by_name
+from services.intent_engine import voice_engine
+from services.text_chunker import sentences
 from datetime import datetime
-
-from services.parser import parse_command
-from services.attendance_service import (
-    mark_present,
-    mark_absent,
-    who_present_today,
-    who_absent_today,
-    where_is,
-    summary_today
-)
-from services.info_service import (
-    get_trait_response,
-    get_guest_welcome_note,
-    get_projects_summary,
-    get_project_details,
-)
+import os
 
 import sounddevice as sd
 # =====================
@@ -76,55 +64,10 @@ def is_ai_mode_trigger(text: str) -> bool:
 # Command router
 # --------------------
 def run_query(cmd_text: str) -> str:
-    parsed = parse_command(cmd_text)
-
-    if not parsed:
-        return "Sorry, I didn't understand."
-
-    intent = parsed.get("intent")
-    spoken_name = parsed.get("name")
-
-    resolved_name = None
-
-    if spoken_name:
-        known_names = get_all_student_names()
-        resolved_name, _ = match_name(spoken_name, known_names)
-
-        if not resolved_name:
-            return f"I couldn't find a student named {spoken_name}."
-
-    if intent == "WHO_PRESENT":
-        return who_present_today()
-
-    if intent == "WHO_ABSENT":
-        return who_absent_today()
-
-    if intent == "WHERE_IS" and resolved_name:
-        return where_is(resolved_name)
-
-    if intent == "SUMMARY":
-        return summary_today()
-
-    if intent == "TRAIT_INFO":
-        return get_trait_response(parsed.get("field"))
-
-    if intent == "GUEST_WELCOME":
-        return get_guest_welcome_note(parsed.get("name"))
-
-    if intent == "PROJECTS_LIST":
-        return get_projects_summary()
-
-    if intent == "PROJECT_DETAILS":
-        title = parsed.get("title")
-        return get_project_details(title) if title else get_projects_summary()
-
-    if intent == "MARK_PRESENT" and resolved_name:
-        return mark_present(resolved_name)
-
-    if intent == "MARK_ABSENT" and resolved_name:
-        return mark_absent(resolved_name)
-
-    return "Sorry, I didn't understand."
+    # Same router as WhatsApp (services/intent_engine.py), with writes allowed
+    reply = voice_engine.answer(cmd_text)
+    print(f"🧭 {reply.intent} ({reply.source}, {reply.latency * 1000:.0f} ms)")
+    return reply.text
 
 def generate_mom(transcript_list):
     if not transcript_list:
@@ -164,6 +107,8 @@ def main():
     global meeting_mode, meeting_transcript   # ✅ IMPORTANT
 
     setup_audio()
+    # "Where is X" falls back to the RFID gate's journal if the server is down
+    set_offline_status_lookup(local_status_by_name)
 
     speak("Buddy query mode ready. Say hey buddy.")
     ai_mode = False
@@ -223,8 +168,10 @@ def main():
                 speak("AI mode deactivated.")
                 continue
 
-            response = get_ai_response(wake)
-            speak(response)
+            # start speaking after the first sentence, not the whole answer
+            first_audio = speak_stream(sentences(stream_ai_response(wake)))
+            if first_audio is not None:
+                print(f"⏱️ First audio after {first_audio:.2f}s")
             continue
 
         # =====================
@@ -1,15 +1,19 @@
 INSIDE = "INSIDE"
 OUTSIDE = "OUTSIDE"
 
-def apply_status(current_status, new_event):
-    if new_event == "MARK_PRESENT":
-        if current_status == INSIDE:
-            return None  # no change
-        return INSIDE
+# Status each event moves a student to
+EVENT_STATUS = {
+    "MARK_PRESENT": INSIDE,
+    "MARK_ABSENT": OUTSIDE,
+}
+
 
-    if new_event == "MARK_ABSENT":
-        if current_status == OUTSIDE:
-            return None
-        return OUTSIDE
+def target_status(new_event):
+    return EVENT_STATUS.get(new_event)
 
-    return None
\ No newline at end of file
+
+def apply_status(current_status, new_event):
+    new_status = target_status(new_event)
+    if new_status is None or current_status == new_status:
+        return None  # no change
+    return new_status
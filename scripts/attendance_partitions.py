@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+
+# Allow running this script directly: `python scripts/attendance_partitions.py`
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from db.database import init_db
+from db.partitions import (
+    PARTITION_MONTHS_AHEAD,
+    archive_partitions,
+    ensure_partitions,
+    list_partitions,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain monthly attendance partitions")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ensure = sub.add_parser("ensure", help="create upcoming monthly partitions")
+    ensure.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+
+    sub.add_parser("list", help="list partitions with estimated row counts")
+
+    archive = sub.add_parser("archive", help="export and drop old partitions")
+    archive.add_argument("--keep-months", type=int, default=12,
+                         help="full months of raw attendance to keep online")
+    archive.add_argument("--out", default="archive", help="directory for .csv.gz exports")
+    archive.add_argument("--keep-table", action="store_true",
+                         help="detach but do not drop the exported partitions")
+
+    args = parser.parse_args()
+    init_db()
+
+    if args.command == "ensure":
+        created = ensure_partitions(args.months_ahead)
+        print(f"Created {created} partitions")
+    elif args.command == "list":
+        for partition in list_partitions():
+            print(f"{partition.name}: ~{partition.rows} rows")
+    else:
+        written = archive_partitions(args.keep_months, args.out, drop=not args.keep_table)
+        if not written:
+            print("Nothing to archive")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+# Allow running this script directly: `python scripts/backfill_attendance_summary.py`
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from db.attendance_summary import backfill_summary
+from db.database import init_db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild attendance_summary daily rollups from the attendance log"
+    )
+    parser.add_argument("--from", dest="start", type=date.fromisoformat,
+                        help="first day to rebuild (YYYY-MM-DD), default: all history")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat,
+                        help="day after the last one to rebuild (exclusive), default: no limit")
+    args = parser.parse_args()
+
+    init_db()
+
+    started = time.perf_counter()
+    rows = backfill_summary(args.start, args.end)
+    elapsed = time.perf_counter() - started
+    print(f"Rebuilt {rows} daily summary rows in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Exercise the Gemini response cache (services/llm_cache.py) against a stub
+model, no API key or network needed.
+
+Simulates --users WhatsApp users asking --questions distinct questions
+(with different casing/spacing/punctuation) from a thread pool, then the
+same from asyncio tasks, and reports upstream calls, hit rate, coalesced
+callers and wall time against calling the stub directly. Finally saves
+the cache to a temp file and checks a new cache reloads it.
+
+    python scripts/bench_llm_cache.py
+    python scripts/bench_llm_cache.py --users 200 --questions 10 --delay 0.5
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.llm_cache import LLMCache  # noqa: E402
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModels:
+    """Stands in for genai.Client().models: sleeps, counts calls, echoes the prompt."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, model, contents):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return _Response(f"[{model}] answer to: {contents.strip().lower()}")
+
+
+class StubAsyncModels(StubModels):
+    async def generate_content(self, model, contents):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return _Response(f"[{model}] answer to: {contents.strip().lower()}")
+
+
+class StubClient:
+    def __init__(self, delay: float):
+        self.models = StubModels(delay)
+        self.aio = type("Aio", (), {})()
+        self.aio.models = StubAsyncModels(delay)
+
+
+def variants(question: str):
+    return [question, question.upper(), f"  {question}  ", f"{question}?", question.replace(" ", "  ")]
+
+
+def workload(args):
+    rng = random.Random(42)
+    questions = [f"what is project {i} about" for i in range(args.questions)]
+    return [rng.choice(variants(rng.choice(questions))) for _ in range(args.users)]
+
+
+def report(label, started, calls, cache):
+    elapsed = time.perf_counter() - started
+    line = f"{label:<14} {elapsed:6.2f}s  upstream={calls:<5}"
+    if cache is not None:
+        s = cache.stats()
+        line += f" hit_rate={s['hit_rate']:.0%}  coalesced={s['coalesced']}  served_without_upstream={s['served_without_upstream']:.0%}"
+    print(line)
+
+
+def run_threads(args, prompts, client, cache):
+    def ask(prompt):
+        generate = lambda p: client.models.generate_content(model="stub", contents=p).text
+        if cache is None:
+            return generate(prompt)
+        return cache.get_or_generate(prompt, generate)
+
+    started = time.perf_counter()
+    before = client.models.calls
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(ask, prompts))
+    report("threads" + (" +cache" if cache else ""), started, client.models.calls - before, cache)
+
+
+async def run_async(args, prompts, client, cache):
+    async def generate(p):
+        return (await client.aio.models.generate_content(model="stub", contents=p)).text
+
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def ask(prompt):
+        async with limit:
+            if cache is None:
+                return await generate(prompt)
+            return await cache.get_or_generate_async(prompt, generate)
+
+    started = time.perf_counter()
+    before = client.aio.models.calls
+    await asyncio.gather(*(ask(p) for p in prompts))
+    report("asyncio" + (" +cache" if cache else ""), started, client.aio.models.calls - before, cache)
+
+
+def check_persistence(prompts, client):
+    path = os.path.join(tempfile.mkdtemp(), "llm_cache.json")
+    generate = lambda p: client.models.generate_content(model="stub", contents=p).text
+
+    first = LLMCache("stub", path=path)
+    for p in prompts:
+        first.get_or_generate(p, generate)
+    first.flush()
+
+    second = LLMCache("stub", path=path)
+    before = client.models.calls
+    for p in prompts:
+        second.get_or_generate(p, generate)
+    print(f"persistence    reloaded={len(second._cache)} entries, upstream after restart={client.models.calls - before}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100, help="questions asked (default 100)")
+    parser.add_argument("--questions", type=int, default=8, help="distinct questions (default 8)")
+    parser.add_argument("--concurrency", type=int, default=32, help="callers in flight (default 32)")
+    parser.add_argument("--delay", type=float, default=0.2, help="stub model latency in seconds (default 0.2)")
+    args = parser.parse_args()
+
+    prompts = workload(args)
+    client = StubClient(args.delay)
+    print(f"{len(prompts)} prompts, {args.questions} distinct questions, model latency {args.delay * 1000:.0f} ms\n")
+
+    run_threads(args, prompts, client, None)
+    run_threads(args, prompts, client, LLMCache("stub", path=""))
+    asyncio.run(run_async(args, prompts, client, None))
+    asyncio.run(run_async(args, prompts, client, LLMCache("stub", path="")))
+    check_persistence(prompts, client)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compare the precomputed NameIndex with the original linear extractOne scan.
+
+    python scripts/bench_name_matcher.py --sizes 1000 10000 100000 --queries 200
+
+Names are synthetic; queries are roster names with a dropped/swapped
+character or a missing token, like noisy speech-to-text output.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Allow running this script directly: `python scripts/bench_name_matcher.py`
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from rapidfuzz import fuzz, process
+
+from services.name_index import NameIndex
+
+SYLLABLES = [
+    "ka", "ra", "mu", "gi", "lan", "a", "bi", "ni", "thi", "ma", "si", "sri", "vish",
+    "nu", "cha", "ran", "je", "vi", "thesh", "shi", "va", "na", "dra", "san", "dhya",
+    "kav", "in", "ku", "mar", "ni", "dish", "sa", "dhi", "ne", "sh", "ram", "lin",
+    "gam", "re", "ties", "ra", "ga", "ven", "var", "shi", "de", "su", "rya", "ve",
+    "tha", "ja", "he", "mas", "hree", "af", "rin", "ka", "nik", "shaa", "pri", "ya",
+]
+
+
+def make_name(rng: random.Random) -> str:
+    first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    initials = " ".join(rng.choice("abcdefghijklmnoprstuvy") for _ in range(rng.randint(0, 2)))
+    return f"{first} {initials}".strip()
+
+
+def make_query(rng: random.Random, name: str) -> str:
+    tokens = name.split()
+    first = tokens[0]
+    kind = rng.random()
+    if kind < 0.3 and len(first) > 4:
+        i = rng.randrange(len(first))
+        first = first[:i] + first[i + 1:]
+    elif kind < 0.6 and len(first) > 4:
+        i = rng.randrange(len(first) - 1)
+        first = first[:i] + first[i + 1] + first[i] + first[i + 2:]
+    elif kind < 0.8:
+        return first
+    return " ".join([first] + tokens[1:])
+
+
+def linear_match(query, names, threshold=80):
+    match = process.extractOne(query, names, scorer=fuzz.WRatio)
+    if match and match[1] >= threshold:
+        return match[0]
+    return None
+
+
+def bench(size: int, n_queries: int, seed: int) -> None:
+    rng = random.Random(seed)
+    names = list({make_name(rng) for _ in range(size * 2)})[:size]
+    targets = [rng.choice(names) for _ in range(n_queries)]
+    queries = [make_query(rng, target) for target in targets]
+
+    started = time.perf_counter()
+    index = NameIndex(names)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    linear = [linear_match(q, names) for q in queries]
+    linear_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indexed = [index.match(q).name for q in queries]
+    index_time = time.perf_counter() - started
+
+    agree = sum(1 for a, b in zip(linear, indexed) if a == b) / n_queries
+    linear_hits = sum(1 for got, want in zip(linear, targets) if got == want) / n_queries
+    index_hits = sum(1 for got, want in zip(indexed, targets) if got == want) / n_queries
+    print(
+        f"{size:>7} names | build {build * 1000:7.1f} ms | "
+        f"linear {linear_time / n_queries * 1000:7.3f} ms/q, {linear_hits:6.1%} correct | "
+        f"index {index_time / n_queries * 1000:7.3f} ms/q, {index_hits:6.1%} correct | "
+        f"speedup {linear_time / index_time:5.1f}x | same top-1 {agree:6.1%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark name matching strategies")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        bench(size, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
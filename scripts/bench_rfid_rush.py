@@ -0,0 +1,121 @@
+"""
+Replay a simulated gate rush against the database and compare the direct
+per-tap path (handle_rfid_event) with the batched ingestion queue.
+
+    python scripts/bench_rfid_rush.py --students 200 --gates 4 --rate 0
+
+Creates temporary BENCH-* students and cards, and deletes them (with their
+attendance) afterwards.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Allow running this script directly: `python scripts/bench_rfid_rush.py`
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from db.database import cursor, init_db
+from db.roster import invalidate_roster
+from db.students import import_students
+from services.rfid_ingest import RfidIngestor
+from services.rfid_service import handle_rfid_event
+
+PREFIX = "BENCH-"
+
+
+def setup(students: int) -> list:
+    uids = [f"{PREFIX}{i:05d}" for i in range(students)]
+    import_students((f"bench student {i}", uid, "BENCH") for i, uid in enumerate(uids))
+    with cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO rfid_cards (uid, user_id)
+            SELECT uid, id FROM students WHERE uid LIKE %s
+            ON CONFLICT (uid) DO NOTHING
+            """,
+            (PREFIX + "%",),
+        )
+    invalidate_roster()
+    return uids
+
+
+def cleanup() -> None:
+    with cursor() as cur:
+        cur.execute("DELETE FROM rfid_cards WHERE uid LIKE %s", (PREFIX + "%",))
+        cur.execute("DELETE FROM students WHERE uid LIKE %s", (PREFIX + "%",))
+    invalidate_roster()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def replay(label, uids, submit, rate):
+    """
+    Everyone taps in, then everyone taps out. Taps arrive at ``rate`` per
+    second (0 = all at once); latency is arrival -> result known.
+    """
+    latencies = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    for action in ("in", "out"):
+        futures = []
+        phase_start = time.perf_counter()
+        for i, uid in enumerate(uids):
+            if rate:
+                delay = phase_start + i / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            arrived = time.perf_counter()
+            future = submit(uid, action)
+
+            def done(_, arrived=arrived):
+                with lock:
+                    latencies.append(time.perf_counter() - arrived)
+
+            future.add_done_callback(done)
+            futures.append(future)
+        wait(futures)
+
+    total = time.perf_counter() - started
+    print(
+        f"{label:<8} {len(latencies)} taps in {total:.2f}s "
+        f"({len(latencies) / total:.0f} taps/s) | "
+        f"p50 {percentile(latencies, 0.5) * 1000:.1f} ms | "
+        f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark RFID rush-hour ingestion")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--gates", type=int, default=4, help="concurrent readers on the direct path")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="tap arrivals per second (0 = everyone at once)")
+    args = parser.parse_args()
+
+    init_db()
+    uids = setup(args.students)
+    try:
+        # Direct path: each gate reader handles its own taps one at a time
+        with ThreadPoolExecutor(max_workers=args.gates) as readers:
+            replay("direct", uids, lambda uid, action: readers.submit(handle_rfid_event, uid, action),
+                   args.rate)
+
+        ingestor = RfidIngestor()
+        replay("batched", uids, ingestor.submit, args.rate)
+        ingestor.stop()
+        print("ingestor stats:", ingestor.stats())
+    finally:
+        cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Time to first audio (voice AI mode) and to first WhatsApp message for a
+long AI answer, full-response vs streaming, against a local streaming
+stub of Gemini and of the TTS/playback steps. No keys or network needed.
+
+    python scripts/bench_time_to_first_audio.py
+    python scripts/bench_time_to_first_audio.py --first-token 0.8 --words-per-second 30
+
+Blocking: get_ai_response() -> speak() (synthesize all, then play).
+Streaming: stream_ai_response() -> sentences() -> speak_stream(), which
+synthesizes the next sentence while the current one plays. WhatsApp
+compares one message after the full answer with message_parts().
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+os.environ.setdefault("GEMINI_API_KEY", "stub")
+
+from services import ai_service  # noqa: E402
+from services.text_chunker import message_parts, sentences  # noqa: E402
+from voice.speak import speak_stream  # noqa: E402
+
+ANSWER = (
+    "TRAIT is the innovation lab where students build robots, drones and speech systems. "
+    "Most teams meet in the evenings and on weekends. "
+    "Each project has a mentor who reviews progress every week. "
+    "New members usually start by helping on an existing project before proposing their own. "
+    "The lab has 3D printers, a soldering bench and a small machine shop. "
+    "Safety training is required before using any of the tools. "
+    "If you want to join, ask at the front desk or message this number with your interests."
+)
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class StreamingStubModels:
+    """genai-like .models: first chunk after ``first_token`` s, then a few words per chunk."""
+
+    def __init__(self, first_token: float, words_per_second: float, words_per_chunk: int = 4):
+        self.first_token = first_token
+        self.word_delay = 1.0 / words_per_second
+        self.words_per_chunk = words_per_chunk
+
+    def _chunks(self):
+        words = ANSWER.split(" ")
+        for i in range(0, len(words), self.words_per_chunk):
+            piece = " ".join(words[i:i + self.words_per_chunk])
+            yield piece + (" " if i + self.words_per_chunk < len(words) else "")
+
+    def generate_content(self, model, contents, config=None):
+        time.sleep(self.first_token + self.word_delay * len(ANSWER.split(" ")))
+        return _Chunk(ANSWER)
+
+    def generate_content_stream(self, model, contents, config=None):
+        time.sleep(self.first_token)
+        for piece in self._chunks():
+            yield _Chunk(piece)
+            time.sleep(self.word_delay * self.words_per_chunk)
+
+
+class StubClient:
+    def __init__(self, models):
+        self.models = models
+
+
+class StubVoice:
+    """TTS request latency plus playback time proportional to text length."""
+
+    def __init__(self, tts_latency: float, chars_per_second: float):
+        self.tts_latency = tts_latency
+        self.chars_per_second = chars_per_second
+        self.first_play = None
+        self._lock = threading.Lock()
+
+    def synthesize(self, text):
+        time.sleep(self.tts_latency)
+        return text.encode()
+
+    def play(self, audio, path=None):
+        with self._lock:
+            if self.first_play is None:
+                self.first_play = time.monotonic()
+        time.sleep(len(audio) / self.chars_per_second)
+
+
+def prompt():
+    return f"tell me about TRAIT {uuid.uuid4().hex}"  # unique: no cache hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--first-token", type=float, default=0.6, help="model latency to first chunk (default 0.6 s)")
+    parser.add_argument("--words-per-second", type=float, default=40, help="model output rate (default 40)")
+    parser.add_argument("--tts-latency", type=float, default=0.4, help="seconds per TTS request (default 0.4)")
+    parser.add_argument("--speech-rate", type=float, default=150, help="playback chars per second (default 150, ~10x real speech)")
+    args = parser.parse_args()
+
+    ai_service.set_client(StubClient(StreamingStubModels(args.first_token, args.words_per_second)))
+    print(f"answer {len(ANSWER)} chars, first chunk {args.first_token}s, {args.words_per_second:.0f} words/s, "
+          f"TTS {args.tts_latency}s per request\n")
+
+    # Voice, blocking
+    voice = StubVoice(args.tts_latency, args.speech_rate)
+    started = time.monotonic()
+    text = ai_service.get_ai_response(prompt())
+    voice.play(voice.synthesize(text))
+    blocking = (voice.first_play - started, time.monotonic() - started)
+
+    # Voice, streaming
+    voice = StubVoice(args.tts_latency, args.speech_rate)
+    started = time.monotonic()
+    speak_stream(sentences(ai_service.stream_ai_response(prompt())), voice.synthesize, voice.play)
+    streaming = (voice.first_play - started, time.monotonic() - started)
+
+    print(f"{'voice':<22}{'first audio':>12}{'done':>10}")
+    print(f"{'  blocking':<22}{blocking[0]:>11.2f}s{blocking[1]:>9.2f}s")
+    print(f"{'  streaming':<22}{streaming[0]:>11.2f}s{streaming[1]:>9.2f}s")
+
+    # WhatsApp
+    started = time.monotonic()
+    ai_service.get_ai_response(prompt())
+    whole = time.monotonic() - started
+
+    started = time.monotonic()
+    sent_at = [time.monotonic() - started for _ in message_parts(ai_service.stream_ai_response(prompt()))]
+
+    print(f"\n{'whatsapp':<22}{'first msg':>12}{'last msg':>10}{'messages':>10}")
+    print(f"{'  one message':<22}{whole:>11.2f}s{whole:>9.2f}s{1:>10}")
+    print(f"{'  progressive':<22}{sent_at[0]:>11.2f}s{sent_at[-1]:>9.2f}s{len(sent_at):>10}")
+
+
+if __name__ == "__main__":
+    main()
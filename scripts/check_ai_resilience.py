@@ -0,0 +1,102 @@
+"""
+Drive services/ai_service.py against scripts/fake_llm_server.py through
+healthy, flaky, slow, down and recovered phases, and show that callers
+always get an answer (real or canned) within the deadline.
+
+    python scripts/fake_llm_server.py --port 5002 --quiet
+    python scripts/check_ai_resilience.py --llm http://127.0.0.1:5002
+
+Each phase fires --requests distinct prompts from --concurrency threads
+(like webhook workers) and prints the answer mix, caller latency and
+what the wrapper did (retries, breaker rejections, sheds). Short
+timeouts are used unless GEMINI_* settings are already in the environment.
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+DEFAULTS = {
+    "GEMINI_API_KEY": "fake",
+    "GEMINI_TIMEOUT": "1",
+    "GEMINI_DEADLINE": "3",
+    "GEMINI_MAX_IN_FLIGHT": "4",
+    "GEMINI_MIN_BACKOFF": "0.1",
+    "GEMINI_MAX_BACKOFF": "0.5",
+    "GEMINI_BREAKER_FAILURES": "5",
+    "GEMINI_BREAKER_COOLDOWN": "3",
+}
+
+PHASES = [
+    ("healthy", {"delay": 0.1, "slow_rate": 0.0, "fail_rate": 0.0}),
+    ("flaky 30%", {"delay": 0.1, "slow_rate": 0.0, "fail_rate": 0.3}),
+    ("slow 20%", {"delay": 0.1, "slow_rate": 0.2, "slow_delay": 30.0, "fail_rate": 0.0}),
+    ("down", {"delay": 0.1, "slow_rate": 0.0, "fail_rate": 1.0}),
+    ("probe", {"delay": 0.1, "slow_rate": 0.0, "fail_rate": 0.0}),
+    ("recovered", {"delay": 0.1, "slow_rate": 0.0, "fail_rate": 0.0}),
+]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", default="http://127.0.0.1:5002", help="fake_llm_server.py URL")
+    parser.add_argument("--requests", type=int, default=40, help="prompts per phase (default 40)")
+    parser.add_argument("--concurrency", type=int, default=8, help="caller threads (default 8)")
+    args = parser.parse_args()
+
+    os.environ["GEMINI_BASE_URL"] = args.llm
+    for key, value in DEFAULTS.items():
+        os.environ.setdefault(key, value)
+
+    from services import ai_service  # noqa: E402  (reads GEMINI_* at import)
+
+    def ask(_):
+        started = time.monotonic()
+        reply = ai_service.get_ai_response(f"resilience check {uuid.uuid4().hex}")
+        return reply != ai_service.CANNED_REPLY, time.monotonic() - started
+
+    print(f"deadline {ai_service.GEMINI_DEADLINE}s, attempt timeout {ai_service.GEMINI_TIMEOUT}s, "
+          f"{ai_service.GEMINI_MAX_IN_FLIGHT} in flight, breaker after {ai_service.GEMINI_BREAKER_FAILURES} "
+          f"failures for {ai_service.GEMINI_BREAKER_COOLDOWN}s\n")
+
+    for name, control in PHASES:
+        count = args.requests
+        if name == "probe":
+            # after the cooldown one half-open call decides whether the breaker closes
+            time.sleep(ai_service.GEMINI_BREAKER_COOLDOWN)
+            count = 1
+        requests.post(f"{args.llm}/control", json=control, timeout=5).raise_for_status()
+        before = ai_service.ai_client_stats()
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(ask, range(count)))
+        elapsed = time.monotonic() - started
+
+        after = ai_service.ai_client_stats()
+        answered = sum(1 for ok, _ in results if ok)
+        latencies = [t for _, t in results]
+        delta = {k: after[k] - before[k] for k in ("retries", "rejected", "shed")}
+        print(f"{name:<10} answered {answered:>3}/{len(results)}  canned {len(results) - answered:>3}  "
+              f"p50 {percentile(latencies, 0.5) * 1000:6.0f} ms  p99 {percentile(latencies, 0.99) * 1000:6.0f} ms  "
+              f"max {max(latencies) * 1000:6.0f} ms  wall {elapsed:5.1f}s  "
+              f"retries {delta['retries']:>3}  rejected {delta['rejected']:>3}  shed {delta['shed']:>3}  "
+              f"breaker {after['breaker']}")
+
+    print("\nfailures:", ai_service.ai_client_stats()["failures"])
+    requests.post(f"{args.llm}/control", json=PHASES[0][1], timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+EXPLAIN-based regression check for the attendance queries.
+
+Builds the full schema in a scratch schema inside one transaction, loads a
+large synthetic attendance log, and fails if any checked query plans a
+sequential scan over attendance or attendance_summary. Everything is rolled
+back at the end, so it is safe to run against a development database.
+
+    python scripts/check_query_plans.py --students 5000 --events 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+# Allow running this script directly: `python scripts/check_query_plans.py`
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from db.attendance import SET_REASON_SQL
+from db.attendance_summary import ABSENT_ON_DAY_SQL, PRESENT_ON_DAY_SQL
+from db.database import get_conn
+from db.migrate import load_migrations
+
+SCRATCH_SCHEMA = "plan_check"
+WATCHED_TABLES = ("attendance", "attendance_summary")
+
+def load_synthetic_data(cur, students: int, events: int, days: int) -> None:
+    cur.execute(
+        """
+        INSERT INTO students (name, uid, program)
+        SELECT 'student ' || g, 'UID' || g, 'PROGRAM ' || (g %% 20)
+        FROM generate_series(1, %s) g
+        """,
+        (students,),
+    )
+
+    cur.execute(
+        """
+        SELECT create_attendance_partition(m::date)
+        FROM generate_series(
+            date_trunc('month', CURRENT_DATE) - make_interval(days => %s),
+            date_trunc('month', CURRENT_DATE),
+            INTERVAL '1 month'
+        ) m
+        """,
+        (days + 31,),
+    )
+
+    # Load the log without per-row triggers, then build the derived tables
+    # the same way the maintenance commands do.
+    cur.execute("ALTER TABLE attendance DISABLE TRIGGER USER")
+    cur.execute("SELECT setseed(0.42)")
+    cur.execute(
+        """
+        INSERT INTO attendance (student_id, status, activity_type, timestamp)
+        SELECT
+            1 + floor(random() * %(students)s)::int,
+            CASE WHEN random() < 0.5 THEN 'INSIDE' ELSE 'OUTSIDE' END::attendance_status,
+            'RFID',
+            date_trunc('day', LOCALTIMESTAMP) - random() * make_interval(days => %(days)s)
+        FROM generate_series(1, %(events)s)
+        """,
+        {"students": students, "events": events, "days": days},
+    )
+    cur.execute("ALTER TABLE attendance ENABLE TRIGGER USER")
+    cur.execute("SELECT backfill_attendance_summary(NULL, NULL)")
+    cur.execute("SELECT rebuild_student_current_status()")
+
+    for table in ("students", "attendance", "attendance_summary", "student_current_status"):
+        cur.execute(f"ANALYZE {table}")
+
+
+def walk(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def check(cur, label: str, sql: str, params: dict) -> bool:
+    cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    raw = cur.fetchone()[0]
+    plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+
+    seq_scans = []
+    indexes = set()
+    for node in walk(plan):
+        relation = node.get("Relation Name", "")
+        if node["Node Type"] == "Seq Scan" and relation.startswith(WATCHED_TABLES):
+            seq_scans.append(relation)
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+
+    ok = not seq_scans
+    status = "OK  " if ok else "FAIL"
+    detail = f"seq scan on {', '.join(seq_scans)}" if seq_scans else "indexes: " + (
+        ", ".join(sorted(indexes)) or "none"
+    )
+    print(f"[{status}] {label}: {detail}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check attendance query plans use indexes")
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(f"CREATE SCHEMA {SCRATCH_SCHEMA}")
+        cur.execute(f"SET LOCAL search_path TO {SCRATCH_SCHEMA}, public")
+        for migration in load_migrations():
+            cur.execute(migration.read())
+
+        started = time.perf_counter()
+        load_synthetic_data(cur, args.students, args.events, args.days)
+        print(f"Loaded {args.events} events for {args.students} students "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        # The queries the services run against the watched tables:
+        # who_present_today / who_absent_today and the exit-reason update
+        day = date.today() - timedelta(days=1)
+        cur.execute("SELECT id, timestamp FROM attendance ORDER BY timestamp DESC LIMIT 1")
+        event_id, timestamp = cur.fetchone()
+        checks = [
+            ("present on day (rollup)", PRESENT_ON_DAY_SQL, {"day": day}),
+            ("absent on day (rollup)", ABSENT_ON_DAY_SQL, {"day": day}),
+            ("exit reason update", SET_REASON_SQL, {"reason": "check", "id": event_id, "timestamp": timestamp}),
+        ]
+        results = [check(cur, *c) for c in checks]
+    finally:
+        conn.rollback()
+        conn.close()
+
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
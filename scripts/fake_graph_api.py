@@ -0,0 +1,107 @@
+"""
+Local stand-in for the WhatsApp Cloud (Graph) API, for testing app.py
+without sending real messages.
+
+    python scripts/fake_graph_api.py --port 5001 --delay 0.3 --fail-rate 0.1
+    GRAPH_API_BASE=http://localhost:5001/v24.0 python app.py
+
+Accepts POST /<version>/<phone_number_id>/messages and answers like the real
+API. --delay simulates slow sends; --fail-rate answers that share of
+requests with a random 429 or 500. GET /sent lists the messages received so
+far; DELETE /sent clears them.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sent = []
+sent_lock = threading.Lock()
+
+
+def make_handler(delay: float, fail_rate: float, quiet: bool):
+    class GraphHandler(BaseHTTPRequestHandler):
+        # keep-alive, like the real API; HTTP/1.0 would reconnect per send
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/sent":
+                with sent_lock:
+                    return self._reply(200, {"count": len(sent), "messages": list(sent)})
+            self._reply(404, {"error": {"message": "not found"}})
+
+        def do_DELETE(self):
+            if self.path.rstrip("/") == "/sent":
+                with sent_lock:
+                    sent.clear()
+                return self._reply(200, {"ok": True})
+            self._reply(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/messages"):
+                return self._reply(404, {"error": {"message": "not found"}})
+
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return self._reply(400, {"error": {"message": "invalid JSON"}})
+
+            if delay:
+                time.sleep(delay)
+
+            if random.random() < fail_rate:
+                status = random.choice([429, 500])
+                return self._reply(status, {"error": {"message": "simulated failure", "code": status}})
+
+            message_id = f"wamid.{uuid.uuid4().hex}"
+            with sent_lock:
+                sent.append({
+                    "id": message_id,
+                    "to": payload.get("to"),
+                    "text": (payload.get("text") or {}).get("body"),
+                    "received_at": time.time(),
+                })
+            self._reply(200, {
+                "messaging_product": "whatsapp",
+                "contacts": [{"input": payload.get("to"), "wa_id": payload.get("to")}],
+                "messages": [{"id": message_id}],
+            })
+
+        def log_message(self, fmt, *args):
+            if not quiet:
+                super().log_message(fmt, *args)
+
+    return GraphHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake WhatsApp Graph API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of sends answered 429/500")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.delay, args.fail_rate, args.quiet))
+    print(f"Fake Graph API on http://{args.host}:{args.port} (use GRAPH_API_BASE=http://{args.host}:{args.port}/v24.0)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Local stand-in for the Gemini API, for testing services/ai_service.py
+(timeouts, retries, the circuit breaker) without a key or network.
+
+    python scripts/fake_llm_server.py --port 5002 --delay 0.3 --fail-rate 0.2
+    GEMINI_BASE_URL=http://127.0.0.1:5002 GEMINI_API_KEY=fake python app.py
+
+Answers POST /<version>/models/<model>:generateContent like the real API,
+echoing the prompt. --delay simulates model latency; --slow-rate answers
+that share of requests after --slow-delay instead; --fail-rate answers that
+share with a random 429, 500 or 503. POST /control with a JSON object
+(e.g. {"fail_rate": 1.0}) changes those settings while running; GET /calls
+returns request counts, DELETE /calls resets them.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+settings = {}
+calls = {"total": 0, "ok": 0, "failed": 0, "slow": 0}
+lock = threading.Lock()
+
+
+def count(key: str) -> None:
+    with lock:
+        calls[key] += 1
+
+
+def prompt_text(payload: dict) -> str:
+    parts = []
+    for content in payload.get("contents") or []:
+        for part in content.get("parts") or []:
+            parts.append(part.get("text") or "")
+    return " ".join(parts)
+
+
+def make_handler(quiet: bool):
+    class GeminiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/calls":
+                with lock:
+                    return self._reply(200, {**calls, "settings": dict(settings)})
+            self._reply(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+
+        def do_DELETE(self):
+            if self.path.rstrip("/") == "/calls":
+                with lock:
+                    for key in calls:
+                        calls[key] = 0
+                return self._reply(200, {"ok": True})
+            self._reply(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+
+        def do_POST(self):
+            try:
+                payload = self._body()
+            except ValueError:
+                return self._reply(400, {"error": {"code": 400, "message": "invalid JSON", "status": "INVALID_ARGUMENT"}})
+
+            if self.path.rstrip("/") == "/control":
+                with lock:
+                    settings.update({k: float(v) for k, v in payload.items() if k in settings})
+                    return self._reply(200, dict(settings))
+
+            path = self.path.split("?")[0]
+            if not path.endswith(":generateContent"):
+                return self._reply(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+            model = path.rsplit("/", 1)[-1].split(":")[0]
+
+            count("total")
+            with lock:
+                current = dict(settings)
+
+            if random.random() < current["slow_rate"]:
+                count("slow")
+                time.sleep(current["slow_delay"])
+            elif current["delay"]:
+                time.sleep(current["delay"])
+
+            if random.random() < current["fail_rate"]:
+                count("failed")
+                status = random.choice([429, 500, 503])
+                return self._reply(status, {"error": {"code": status, "message": "simulated failure", "status": "UNAVAILABLE"}})
+
+            count("ok")
+            self._reply(200, {
+                "candidates": [{
+                    "content": {"role": "model", "parts": [{"text": f"Fake answer to: {prompt_text(payload)}"}]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }],
+                "modelVersion": model,
+            })
+
+        def log_message(self, fmt, *args):
+            if not quiet:
+                super().log_message(fmt, *args)
+
+    return GeminiHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Gemini API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5002)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of requests answered after --slow-delay")
+    parser.add_argument("--slow-delay", type=float, default=30.0, help="seconds for slow requests")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered 429/500/503")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    settings.update({
+        "delay": args.delay,
+        "slow_rate": args.slow_rate,
+        "slow_delay": args.slow_delay,
+        "fail_rate": args.fail_rate,
+    })
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.quiet))
+    server.daemon_threads = True
+    print(f"Fake Gemini API on http://{args.host}:{args.port} (use GEMINI_BASE_URL=http://{args.host}:{args.port})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Load-test a webhook server (Flask app.py or asgi_app.py) end to end.
+
+Fires --deliveries webhook POSTs with --concurrency in flight, then waits
+until the fake Graph API has received every reply. Reports acknowledgement
+latency (p50/p99), request throughput and end-to-end reply throughput.
+
+    python scripts/fake_graph_api.py --port 5001 --delay 0.2 --quiet
+    GRAPH_API_BASE=http://127.0.0.1:5001/v24.0 python app.py                  # Flask, port 5000
+    GRAPH_API_BASE=http://127.0.0.1:5001/v24.0 uvicorn asgi_app:app --port 8000
+    python scripts/load_test_webhook.py --url http://127.0.0.1:5000/webhook
+    python scripts/load_test_webhook.py --url http://127.0.0.1:8000/webhook
+
+Run both servers with the same WHATSAPP_SEND_RATE and WEBHOOK_DEDUPE_DB
+settings for a fair comparison. The default text is answered without Gemini.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+
+def payload(run_id: str, i: int, sender: str, text: str) -> dict:
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": "load-test",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "messages": [{
+                        "from": sender,
+                        "id": f"wamid.load.{run_id}.{i}",
+                        "timestamp": str(int(time.time())),
+                        "type": "text",
+                        "text": {"body": text},
+                    }],
+                },
+            }],
+        }],
+    }
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def sent_count(client: httpx.AsyncClient, graph: str) -> int:
+    return (await client.get(f"{graph}/sent")).json()["count"]
+
+
+async def run(args) -> None:
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        await client.delete(f"{args.graph}/sent")
+
+        latencies = []
+        statuses = {}
+        queue = asyncio.Queue()
+        for i in range(args.deliveries):
+            queue.put_nowait(i)
+
+        async def worker():
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                body = payload(run_id, i, f"91{i % args.senders:08d}", args.text)
+                started = time.perf_counter()
+                try:
+                    status = (await client.post(args.url, json=body)).status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        acked = time.perf_counter() - started
+
+        expected = statuses.get(200, 0)
+        delivered = await sent_count(client, args.graph)
+        while delivered < expected and time.perf_counter() - started < args.deadline:
+            await asyncio.sleep(0.1)
+            delivered = await sent_count(client, args.graph)
+        finished = time.perf_counter() - started
+
+    print(f"target:          {args.url}")
+    print(f"deliveries:      {args.deliveries} at concurrency {args.concurrency}")
+    print(f"responses:       {statuses}")
+    print(f"ack throughput:  {args.deliveries / acked:,.0f} req/s")
+    print(f"ack latency:     p50 {1000 * percentile(latencies, 0.5):.1f} ms, "
+          f"p99 {1000 * percentile(latencies, 0.99):.1f} ms")
+    print(f"replies sent:    {delivered}/{expected} in {finished:.2f}s "
+          f"({delivered / finished:,.1f} replies/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook load test")
+    parser.add_argument("--url", default="http://127.0.0.1:5000/webhook")
+    parser.add_argument("--graph", default="http://127.0.0.1:5001", help="fake Graph API base (for /sent)")
+    parser.add_argument("--deliveries", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--senders", type=int, default=300, help="distinct phone numbers")
+    parser.add_argument("--text", default="attendance")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--deadline", type=float, default=120.0, help="max seconds to wait for replies")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
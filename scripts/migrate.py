@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+
+# Allow running this script directly: `python scripts/migrate.py`
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from db.migrate import applied_versions, apply_migrations, load_migrations
+
+
+def show_status() -> None:
+    applied = applied_versions()
+    for migration in load_migrations():
+        checksum = applied.get(migration.version)
+        if checksum is None:
+            state = "pending"
+        elif checksum != migration.checksum():
+            state = "applied (file changed since!)"
+        else:
+            state = "applied"
+        print(f"{migration.version:04d}_{migration.name}: {state}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply trait-buddy schema migrations")
+    parser.add_argument("command", nargs="?", choices=["up", "status"], default="up")
+    parser.add_argument("--target", type=int, help="stop after this migration version")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        show_status()
+        return
+
+    applied = apply_migrations(target=args.target)
+    if not applied:
+        print("Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
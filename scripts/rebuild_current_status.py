@@ -0,0 +1,24 @@
+import os
+import sys
+import time
+
+# Allow running this script directly: `python scripts/rebuild_current_status.py`
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from db.current_status import rebuild_current_status
+from db.database import init_db
+
+
+def main() -> None:
+    init_db()
+
+    started = time.perf_counter()
+    rows = rebuild_current_status()
+    elapsed = time.perf_counter() - started
+    print(f"Rebuilt current status for {rows} students in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,36 @@
+import argparse
+import csv
+import json
 import os
 import sys
+import time
 
 # Allow running this script directly: `python scripts/seed_students.py`
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from db.students import bulk_upsert_students
+from db.students import import_students
 from db.database import init_db
 
 
-def main() -> None:
-    init_db()
+def read_roster(path: str) -> list:
+    """(name, uid, program) rows from a CSV (with header) or JSONL file."""
+    rows = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    rows.append((item.get("name"), item.get("uid"), item.get("program")))
+        else:
+            for item in csv.DictReader(f):
+                rows.append((item.get("name"), item.get("uid"), item.get("program")))
+    return rows
+
 
-    students = [
+def default_students() -> list:
+    return [
         ("karmugilan g r", "2303737720521032", "B.TECH (IT)-III"),
         ("abinithi g", "2303737724422038", "B.TECH (CSBS)-III"),
         ("mathiarasi e", "2303737724422047", "B.TECH (CSBS)-III"),
@@ -37,8 +54,30 @@ def main() -> None:
         ("kanikshaa r", "2403737714822048", "B.E CSE (AIML)-II"),
     ]
 
-    processed = bulk_upsert_students(students)
-    print(f"Seeded {processed} students into PostgreSQL")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import students into PostgreSQL")
+    parser.add_argument("--file", help="roster file: CSV with name,uid,program header, or JSONL")
+    parser.add_argument("--deactivate-missing", action="store_true",
+                        help="mark active students not present in the roster as inactive")
+    args = parser.parse_args()
+
+    init_db()
+
+    students = read_roster(args.file) if args.file else default_students()
+
+    started = time.perf_counter()
+    result = import_students(students, deactivate_missing=args.deactivate_missing)
+    elapsed = time.perf_counter() - started
+
+    # Rows repeating a UID collapse to the last one, so count what the upsert saw
+    unique = result.inserted + result.updated + result.unchanged
+    rate = len(students) / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"Read {len(students)} rows ({unique} unique UIDs) in {elapsed:.2f}s ({rate:.0f} rows/s): "
+        f"{result.inserted} inserted, {result.updated} updated, "
+        f"{result.unchanged} unchanged, {result.deactivated} deactivated"
+    )
 
 
 if __name__ == "__main__":
@@ -1,16 +1,511 @@
+import asyncio
+import atexit
 import os
+import random
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Iterator
+
+import httpx
 from google import genai
-# Create client
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+from google.genai import errors, types
+
+from services.llm_cache import LLMCache
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+# Point at scripts/fake_llm_server.py for testing; empty = Google's endpoint
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "")
+
+# Per attempt, and for the whole call (queueing + retries + backoff)
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "8"))
+GEMINI_DEADLINE = float(os.getenv("GEMINI_DEADLINE", "15"))
+GEMINI_MAX_IN_FLIGHT = int(os.getenv("GEMINI_MAX_IN_FLIGHT", "4"))
+GEMINI_MAX_ATTEMPTS = int(os.getenv("GEMINI_MAX_ATTEMPTS", "3"))
+GEMINI_MIN_BACKOFF = float(os.getenv("GEMINI_MIN_BACKOFF", "0.5"))
+GEMINI_MAX_BACKOFF = float(os.getenv("GEMINI_MAX_BACKOFF", "4"))
+# Consecutive failed calls that open the breaker, and how long it stays open
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Spoken by the voice assistant too, so no emoji
+CANNED_REPLY = "Sorry, I can't answer that right now. Please try again in a minute."
+
+
+class AIUnavailable(Exception):
+    """Gemini gave no answer: breaker open, overloaded, timed out or failed."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+# Created on first use; scripts can install a stub with set_client()
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        # one client only: a discarded genai.Client closes its HTTP session
+        if _client is None:
+            http_options = types.HttpOptions(
+                base_url=GEMINI_BASE_URL or None,
+                # retries are ours (GeminiClient), not the SDK's
+                retry_options=types.HttpRetryOptions(attempts=1),
+            )
+            _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"), http_options=http_options)
+        return _client
+
+
+def set_client(client) -> None:
+    """Use ``client`` (anything with .models / .aio.models.generate_content) instead of Gemini."""
+    global _client
+    _client = client
+
+
+def failure_reason(error: BaseException) -> str:
+    if isinstance(error, errors.APIError):
+        return f"http_{error.code}"
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "network"
+    return "error"
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRY_STATUSES
+    return failure_reason(error) in ("timeout", "network")
+
+
+def backoff_delay(attempts: int) -> float:
+    """Jittered exponential backoff before attempt ``attempts + 1``."""
+    backoff = min(GEMINI_MAX_BACKOFF, GEMINI_MIN_BACKOFF * 2 ** (attempts - 1))
+    return backoff * random.uniform(0.5, 1.0)
+
+
+async def _first_text(stream) -> str:
+    async for chunk in stream:
+        if chunk.text:
+            return chunk.text
+    return ""
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through. After ``failures`` consecutive failed calls it
+    opens and allow() says no for ``cooldown`` seconds; then one probe call
+    is let through (half-open), and its outcome closes or re-opens it.
+    """
+
+    def __init__(self, failures: int = GEMINI_BREAKER_FAILURES,
+                 cooldown: float = GEMINI_BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if self._probing else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive += 1
+            if self._probing or (self._opened_at is None and self._consecutive >= self.failures):
+                self._opened_at = time.monotonic()
+                self.times_opened += 1
+            self._probing = False
+
+    def release(self) -> None:
+        """The allowed call never reached Gemini (e.g. shed); let another probe through."""
+        with self._lock:
+            self._probing = False
+
+
+class GeminiClient:
+    """
+    Gemini calls with a deadline, at most ``max_in_flight`` at once (callers
+    wait for a slot until their deadline), jittered retries on 408/429/5xx,
+    timeouts and network errors, and a circuit breaker. Raises AIUnavailable
+    when there's no answer; get_ai_response() turns that into CANNED_REPLY.
+
+    The synchronous deadline is enforced through the HTTP timeout of each
+    attempt; the async one also cancels the request.
+    """
+
+    def __init__(self, max_in_flight: int = GEMINI_MAX_IN_FLIGHT,
+                 breaker: CircuitBreaker = None, window: int = 1000):
+        self.max_in_flight = max_in_flight
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._async_slots = None
+        self._async_loop = None
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._first_chunk_latencies = deque(maxlen=window)
+        self.in_flight = 0
+        self.calls = 0
+        self.succeeded = 0
+        self.retries = 0
+        self.rejected = 0  # breaker open
+        self.shed = 0  # no slot before the deadline
+        self.failures = {}
+
+    # -------------------------
+    # Sync
+    # -------------------------
+    def generate(self, prompt: str) -> str:
+        deadline = time.monotonic() + GEMINI_DEADLINE
+        self._admit()
+        if not self._slots.acquire(timeout=GEMINI_DEADLINE):
+            self._shed()
+        try:
+            self._started()
+            attempts = 0
+            while True:
+                attempts += 1
+                timeout = min(GEMINI_TIMEOUT, deadline - time.monotonic())
+                started = time.monotonic()
+                try:
+                    response = get_client().models.generate_content(
+                        model=GEMINI_MODEL, contents=prompt, config=self._config(timeout))
+                    return self._succeeded(response.text, started)
+                except Exception as e:
+                    delay = self._next_delay(e, attempts, deadline)
+                time.sleep(delay)
+        finally:
+            self._finished()
+            self._slots.release()
+
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        generate(), yielding text as Gemini produces it. Retries and the
+        deadline only cover the wait for the first chunk; a stream that
+        breaks later just ends early, since its start was already delivered.
+        """
+        deadline = time.monotonic() + GEMINI_DEADLINE
+        self._admit()
+        if not self._slots.acquire(timeout=GEMINI_DEADLINE):
+            self._shed()
+        try:
+            self._started()
+            attempts = 0
+            while True:
+                attempts += 1
+                timeout = min(GEMINI_TIMEOUT, deadline - time.monotonic())
+                started = time.monotonic()
+                try:
+                    stream = iter(get_client().models.generate_content_stream(
+                        model=GEMINI_MODEL, contents=prompt, config=self._config(timeout)))
+                    first = next((chunk.text for chunk in stream if chunk.text), "")
+                    break
+                except Exception as e:
+                    delay = self._next_delay(e, attempts, deadline)
+                time.sleep(delay)
+
+            self._first_chunk(started)
+            if first:
+                yield first
+            try:
+                for chunk in stream:
+                    if chunk.text:
+                        yield chunk.text
+            except Exception as e:
+                self._stream_broke(e)
+            self._succeeded(None, started)
+        finally:
+            self._finished()
+            self._slots.release()
+
+    # -------------------------
+    # Async
+    # -------------------------
+    async def generate_async(self, prompt: str) -> str:
+        deadline = time.monotonic() + GEMINI_DEADLINE
+        self._admit()
+        slots = self._loop_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), GEMINI_DEADLINE)
+        except asyncio.TimeoutError:
+            self._shed()
+        try:
+            self._started()
+            attempts = 0
+            while True:
+                attempts += 1
+                timeout = min(GEMINI_TIMEOUT, deadline - time.monotonic())
+                started = time.monotonic()
+                try:
+                    response = await asyncio.wait_for(
+                        get_client().aio.models.generate_content(
+                            model=GEMINI_MODEL, contents=prompt, config=self._config(timeout)),
+                        timeout)
+                    return self._succeeded(response.text, started)
+                except Exception as e:
+                    delay = self._next_delay(e, attempts, deadline)
+                await asyncio.sleep(delay)
+        finally:
+            self._finished()
+            slots.release()
+
+    async def generate_stream_async(self, prompt: str) -> AsyncIterator[str]:
+        """generate_stream() for asyncio servers."""
+        deadline = time.monotonic() + GEMINI_DEADLINE
+        self._admit()
+        slots = self._loop_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), GEMINI_DEADLINE)
+        except asyncio.TimeoutError:
+            self._shed()
+        try:
+            self._started()
+            attempts = 0
+            while True:
+                attempts += 1
+                timeout = min(GEMINI_TIMEOUT, deadline - time.monotonic())
+                started = time.monotonic()
+                try:
+                    stream = await asyncio.wait_for(
+                        get_client().aio.models.generate_content_stream(
+                            model=GEMINI_MODEL, contents=prompt, config=self._config(timeout)),
+                        timeout)
+                    first = await asyncio.wait_for(_first_text(stream), deadline - time.monotonic())
+                    break
+                except Exception as e:
+                    delay = self._next_delay(e, attempts, deadline)
+                await asyncio.sleep(delay)
+
+            self._first_chunk(started)
+            if first:
+                yield first
+            try:
+                async for chunk in stream:
+                    if chunk.text:
+                        yield chunk.text
+            except Exception as e:
+                self._stream_broke(e)
+            self._succeeded(None, started)
+        finally:
+            self._finished()
+            slots.release()
+
+    def _loop_slots(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one loop; uvicorn runs one, scripts may run several
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_slots = asyncio.Semaphore(self.max_in_flight)
+        return self._async_slots
+
+    # -------------------------
+    # Shared bookkeeping
+    # -------------------------
+    def _config(self, timeout: float):
+        return types.GenerateContentConfig(
+            http_options=types.HttpOptions(timeout=max(1, int(timeout * 1000))))
+
+    def _admit(self) -> None:
+        with self._lock:
+            self.calls += 1
+        if not self.breaker.allow():
+            with self._lock:
+                self.rejected += 1
+            raise AIUnavailable("circuit_open")
+
+    def _shed(self) -> None:
+        self.breaker.release()
+        with self._lock:
+            self.shed += 1
+        raise AIUnavailable("overloaded")
+
+    def _started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def _finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _succeeded(self, text: str, started: float) -> str:
+        self.breaker.record_success()
+        with self._lock:
+            self.succeeded += 1
+            self._latencies.append(time.monotonic() - started)
+        return text
+
+    def _first_chunk(self, started: float) -> None:
+        with self._lock:
+            self._first_chunk_latencies.append(time.monotonic() - started)
+
+    def _stream_broke(self, error: Exception) -> None:
+        if is_retryable(error):
+            self.breaker.record_failure()
+        reason = f"stream_{failure_reason(error)}"
+        with self._lock:
+            self.failures[reason] = self.failures.get(reason, 0) + 1
+        print(f"⚠️ Gemini stream ended early: {error}")
+        raise AIUnavailable(reason) from error
+
+    def _next_delay(self, error: Exception, attempts: int, deadline: float) -> float:
+        """Backoff before retrying ``error``; raises AIUnavailable if it's not worth retrying."""
+        reason = failure_reason(error)
+        delay = backoff_delay(attempts)
+        if is_retryable(error) and attempts < GEMINI_MAX_ATTEMPTS and time.monotonic() + delay < deadline:
+            with self._lock:
+                self.retries += 1
+            return delay
+
+        if is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            # Gemini answered (e.g. 400 for a blocked prompt); it isn't down
+            self.breaker.record_success()
+        with self._lock:
+            self.failures[reason] = self.failures.get(reason, 0) + 1
+        print(f"⚠️ Gemini call failed after {attempts} attempt(s): {error}")
+        raise AIUnavailable(reason) from error
+
+    def stats(self) -> dict:
+        with self._lock:
+            samples = sorted(self._latencies)
+            latency = {}
+            if samples:
+                latency = {
+                    "latency_avg_ms": 1000 * sum(samples) / len(samples),
+                    "latency_p95_ms": 1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                    "latency_max_ms": 1000 * samples[-1],
+                }
+            first = sorted(self._first_chunk_latencies)
+            if first:
+                latency["first_chunk_p50_ms"] = 1000 * first[len(first) // 2]
+                latency["first_chunk_p95_ms"] = 1000 * first[min(len(first) - 1, int(len(first) * 0.95))]
+            return {
+                "model": GEMINI_MODEL,
+                "breaker": self.breaker.state,
+                "breaker_opened": self.breaker.times_opened,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "calls": self.calls,
+                "succeeded": self.succeeded,
+                "retries": self.retries,
+                "rejected": self.rejected,
+                "shed": self.shed,
+                "failures": dict(self.failures),
+                **latency,
+            }
+
+
+gemini = GeminiClient()
+response_cache = LLMCache(GEMINI_MODEL)
+atexit.register(response_cache.flush)
+
+
+def ask_gemini(prompt: str) -> str:
+    """Cached Gemini answer; raises AIUnavailable if there is none."""
+    return response_cache.get_or_generate(prompt, gemini.generate)
+
+
+async def ask_gemini_async(prompt: str) -> str:
+    return await response_cache.get_or_generate_async(prompt, gemini.generate_async)
+
+
+def stream_gemini(prompt: str) -> Iterator[str]:
+    """
+    Gemini's answer as it is generated (a cached answer comes in one piece).
+    Raises AIUnavailable before the first piece if there is no answer.
+    Streams are not coalesced like ask_gemini(); a finished one is cached.
+    """
+    cached = response_cache.lookup(prompt)
+    if cached is not None:
+        yield cached
+        return
+
+    pieces = []
+    try:
+        for piece in gemini.generate_stream(prompt):
+            pieces.append(piece)
+            yield piece
+    except AIUnavailable:
+        if not pieces:
+            raise
+        return  # cut short: keep what was delivered, don't cache it
+    response_cache.remember(prompt, "".join(pieces))
+
+
+async def stream_gemini_async(prompt: str) -> AsyncIterator[str]:
+    cached = response_cache.lookup(prompt)
+    if cached is not None:
+        yield cached
+        return
+
+    pieces = []
+    try:
+        async for piece in gemini.generate_stream_async(prompt):
+            pieces.append(piece)
+            yield piece
+    except AIUnavailable:
+        if not pieces:
+            raise
+        return
+    response_cache.remember(prompt, "".join(pieces))
+
+
+def stream_ai_response(prompt: str) -> Iterator[str]:
+    """get_ai_response() as a stream of text pieces."""
+    try:
+        yield from stream_gemini(prompt)
+
+    except AIUnavailable:
+        yield CANNED_REPLY
+
 
 def get_ai_response(prompt: str) -> str:
     try:
-        response = client.models.generate_content(
-            model="gemini-1.5-flash",
-            contents=prompt
-        )
+        return ask_gemini(prompt)
+
+    except AIUnavailable:
+        return CANNED_REPLY
+
+
+async def get_ai_response_async(prompt: str) -> str:
+    """Same as get_ai_response, without holding a thread while Gemini answers."""
+    try:
+        return await ask_gemini_async(prompt)
+
+    except AIUnavailable:
+        return CANNED_REPLY
+
+
+def ai_cache_stats() -> dict:
+    return response_cache.stats()
 
-        return response.text
 
-    except Exception as e:
-        return f"AI error: {e}"
+def ai_client_stats() -> dict:
+    return gemini.stats()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import List
+
+import httpx
+
+from db import outbox
+from db.async_database import ASYNC_UNAVAILABLE_ERRORS
+from services.whatsapp_sender import (
+    GRAPH_API_BASE,
+    GRAPH_API_TIMEOUT,
+    PHONE_NUMBER_ID,
+    RETRY_STATUSES,
+    SEND_BURST,
+    SEND_MAX_ATTEMPTS,
+    SEND_RATE,
+    WHATSAPP_TOKEN,
+    TokenBucket,
+    provider_message_id,
+    retry_delay,
+)
+
+# Sends are I/O waits, so the async sender can keep many in flight
+ASYNC_SEND_WORKERS = int(os.getenv("WHATSAPP_ASYNC_SEND_WORKERS", "16"))
+
+
+def make_graph_client(max_connections: int = ASYNC_SEND_WORKERS) -> httpx.AsyncClient:
+    """Keep-alive async client for the WhatsApp Cloud API."""
+    return httpx.AsyncClient(
+        base_url=GRAPH_API_BASE,
+        headers={
+            "Authorization": f"Bearer {WHATSAPP_TOKEN}",
+            "Content-Type": "application/json",
+        },
+        timeout=GRAPH_API_TIMEOUT,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+
+
+class AsyncOutboundSender:
+    """
+    asyncio counterpart of services.whatsapp_sender.OutboundSender: same
+    outbox table and retry rules, with an httpx client and worker tasks
+    instead of threads. Both can run against the same outbox at once.
+    """
+
+    def __init__(self, pool, client: httpx.AsyncClient, workers: int = ASYNC_SEND_WORKERS,
+                 rate: float = SEND_RATE, burst: int = SEND_BURST, max_attempts: int = SEND_MAX_ATTEMPTS,
+                 batch_size: int = 10, idle_poll: float = 2.0, stale_after: float = 120.0,
+                 min_backoff: float = 1.0, max_backoff: float = 300.0):
+        self.pool = pool
+        self.client = client
+        self.path = f"/{PHONE_NUMBER_ID}/messages"
+        self.workers = workers
+        self.bucket = TokenBucket(rate, burst)
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.idle_poll = idle_poll
+        self.stale_after = stale_after
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._tasks: List[asyncio.Task] = []
+        self._delivery = deque(maxlen=1000)
+        self._request = deque(maxlen=1000)
+        self._counters = {"queued": 0, "sent": 0, "retried": 0, "failed": 0, "direct": 0, "rate_limited_wait_s": 0.0}
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def send(self, to: str, text: str) -> None:
+        try:
+            await outbox.enqueue_message_async(self.pool, to, text)
+        except ASYNC_UNAVAILABLE_ERRORS as e:
+            # No outbox without the database: still try to answer, once
+            print("Outbox unavailable, sending directly:", e)
+            self._counters["direct"] += 1
+            await self._send_direct(to, text)
+            return
+        self._counters["queued"] += 1
+        self._wake.set()
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Finish in-flight sends; anything still queued stays in the outbox."""
+        self._stopping = True
+        self._wake.set()
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=timeout)
+
+    async def _acquire(self) -> None:
+        while True:
+            delay = self.bucket.try_acquire()
+            if not delay:
+                return
+            self._counters["rate_limited_wait_s"] += delay
+            await asyncio.sleep(delay)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                batch = await outbox.claim_messages_async(self.pool, self.batch_size, self.stale_after)
+            except ASYNC_UNAVAILABLE_ERRORS as e:
+                print("Outbox unavailable:", e)
+                batch = []
+            except Exception as e:
+                # any other asyncpg error must not end this worker for good
+                print("Outbox claim error:", e)
+                batch = []
+
+            for message in batch:
+                if self._stopping:
+                    # give the rest back right away instead of waiting for stale_after
+                    try:
+                        await outbox.mark_retry_async(self.pool, message.id, 0, "sender stopped")
+                    except Exception as e:
+                        print(f"Outbox error (outbox {message.id}):", e)
+                    continue
+                try:
+                    await self._deliver(message)
+                except Exception as e:
+                    # left in SENDING; claimed again after stale_after
+                    print(f"Outbox error (outbox {message.id}):", e)
+
+            if len(batch) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.idle_poll)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    async def _send_direct(self, to: str, text: str) -> None:
+        await self._acquire()
+        try:
+            response = await self.client.post(self.path, json={
+                "messaging_product": "whatsapp",
+                "to": to,
+                "text": {"body": text},
+            })
+            print("SEND STATUS:", response.status_code, response.text)
+        except httpx.HTTPError as e:
+            print("SEND ERROR:", e)
+
+    async def _deliver(self, message: outbox.OutboxMessage) -> None:
+        await self._acquire()
+
+        response = None
+        started = time.monotonic()
+        try:
+            response = await self.client.post(self.path, json={
+                "messaging_product": "whatsapp",
+                "to": message.recipient,
+                "text": {"body": message.body},
+            })
+            error = None if response.is_success else f"HTTP {response.status_code}: {response.text[:200]}"
+            retryable = response.status_code in RETRY_STATUSES
+        except httpx.HTTPError as e:
+            error = str(e) or type(e).__name__
+            retryable = True
+        self._request.append(time.monotonic() - started)
+
+        if error is None:
+            delivered_in = await outbox.mark_sent_async(self.pool, message.id, provider_message_id(response))
+            self._counters["sent"] += 1
+            if delivered_in is not None:
+                self._delivery.append(delivered_in)
+            return
+
+        if retryable and message.attempts < self.max_attempts:
+            delay = retry_delay(message.attempts, response, self.min_backoff, self.max_backoff)
+            await outbox.mark_retry_async(self.pool, message.id, delay, error)
+            self._counters["retried"] += 1
+        else:
+            await outbox.mark_failed_async(self.pool, message.id, error)
+            self._counters["failed"] += 1
+            print(f"SEND FAILED (outbox {message.id}):", error)
+
+    def stats(self) -> dict:
+        delivery = sorted(self._delivery)
+        request = sorted(self._request)
+
+        def pct(values, p):
+            return 1000 * values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+        return {
+            **self._counters,
+            "workers": self.workers,
+            "delivery_p50_ms": pct(delivery, 0.5),
+            "delivery_p95_ms": pct(delivery, 0.95),
+            "request_p50_ms": pct(request, 0.5),
+            "request_p95_ms": pct(request, 0.95),
+        }
@@ -1,6 +1,20 @@
 from datetime import datetime
-from rules.status_rules import apply_status, INSIDE, OUTSIDE
-from db.database import get_conn, init_db
+from rules.status_rules import target_status, INSIDE, OUTSIDE
+from db import attendance_summary, current_status
+from db.attendance import record_transition
+from db.database import UNAVAILABLE_ERRORS, cursor
+from db.roster import get_roster
+
+# Optional name -> status lookup used by where_is() while the server is
+# unreachable (e.g. the gate's local journal); set by the entry point.
+_offline_status = None
+
+
+def set_offline_status_lookup(lookup):
+    """Register ``lookup(name) -> status or None`` for answering where_is() offline."""
+    global _offline_status
+    _offline_status = lookup
+
 
 # -------------------------
 # Helpers
@@ -10,105 +24,63 @@ def get_student_id(name):
     if not name:
         return None
 
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT id FROM students WHERE name = %s AND is_active = TRUE LIMIT 1",
-        (name,),
-    )
-    row = cur.fetchone()
-    conn.close()
+    entry = get_roster().by_name.get(name)
+    if entry:
+        return entry.id
+
+    with cursor() as cur:
+        cur.execute(
+            "SELECT id FROM students WHERE name = %s AND is_active = TRUE LIMIT 1",
+            (name,),
+        )
+        row = cur.fetchone()
     return row[0] if row else None
 
 
 def get_current_status(student_id):
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT status FROM attendance
-        WHERE student_id = %s
-        ORDER BY timestamp DESC
-        LIMIT 1
-        """,
-        (student_id,),
-    )
-
-    row = cur.fetchone()
-    conn.close()
-
-    return row[0] if row else OUTSIDE  # default OUTSIDE
+    status = current_status.get_current_status(student_id)
+    return status or OUTSIDE  # default OUTSIDE
 
 
 # -------------------------
 # ACTIONS
 # -------------------------
-def mark_present(name, activity_type="VOICE_COMMAND", reason=None):
-    init_db()
-    student_id = get_student_id(name)
-    if not student_id:
-        return f"I don't know {name}."
+def _transition(name, event, activity_type, reason):
+    name = (name or "").strip().lower()
+    if not name:
+        return None
 
-    current = get_current_status(student_id)
-    new_status = apply_status(current, "MARK_PRESENT")
+    # Resolve through the roster cache when possible; the SQL fallback
+    # resolves by name inside the same statement.
+    entry = get_roster().by_name.get(name)
+    return record_transition(
+        target_status(event),
+        student_id=entry.id if entry else None,
+        name=None if entry else name,
+        activity_type=activity_type,
+        reason=reason,
+    )
 
-    if new_status is None:
-        return f"{name.capitalize()} is already inside."
 
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO attendance (student_id, status, activity_type, reason)
-        VALUES (%s, %s, %s, %s)
-        """,
-        (
-            student_id,
-            new_status,
-            activity_type,
-            reason,
-        ),
-    )
+def mark_present(name, activity_type="VOICE_COMMAND", reason=None):
+    result = _transition(name, "MARK_PRESENT", activity_type, reason)
+    if not result:
+        return f"I don't know {name}."
 
-    conn.commit()
-    conn.close()
+    if not result.recorded:
+        return f"{name.capitalize()} is already inside."
 
     return f"{name.capitalize()} is marked present and is now inside."
 
 
 def mark_absent(name, activity_type="VOICE_COMMAND", reason=None):
-    init_db()
-    student_id = get_student_id(name)
-    if not student_id:
+    result = _transition(name, "MARK_ABSENT", activity_type, reason)
+    if not result:
         return f"I don't know {name}."
 
-    current = get_current_status(student_id)
-    new_status = apply_status(current, "MARK_ABSENT")
-
-    if new_status is None:
+    if not result.recorded:
         return f"{name.capitalize()} is already outside."
 
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        INSERT INTO attendance (student_id, status, activity_type, reason)
-        VALUES (%s, %s, %s, %s)
-        """,
-        (
-            student_id,
-            new_status,
-            activity_type,
-            reason,
-        ),
-    )
-
-    conn.commit()
-    conn.close()
-
     return f"{name.capitalize()} has been marked absent and is now outside."
 
 
@@ -116,24 +88,7 @@ def mark_absent(name, activity_type="VOICE_COMMAND", reason=None):
 # QUERIES
 # -------------------------
 def who_present_today():
-    init_db()
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT DISTINCT s.name
-        FROM attendance a
-        JOIN students s ON s.id = a.student_id
-        WHERE DATE(a.timestamp) = CURRENT_DATE
-          AND a.status = %s
-          AND s.is_active = TRUE
-        """,
-        (INSIDE,),
-    )
-
-    names = [r[0] for r in cur.fetchall()]
-    conn.close()
+    names = attendance_summary.present_names()
 
     if not names:
         return "No one is inside today."
@@ -142,27 +97,7 @@ def who_present_today():
 
 
 def who_absent_today():
-    init_db()
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT s.name
-        FROM students s
-        WHERE s.is_active = TRUE
-          AND s.id NOT IN (
-              SELECT a.student_id
-              FROM attendance a
-              WHERE DATE(a.timestamp) = CURRENT_DATE
-                AND a.status = %s
-          )
-        """,
-        (INSIDE,),
-    )
-
-    names = [r[0] for r in cur.fetchall()]
-    conn.close()
+    names = attendance_summary.absent_names()
 
     if not names:
         return "Everyone is present today."
@@ -170,12 +105,31 @@ def who_absent_today():
     return "Absent today: " + ", ".join(n.capitalize() for n in names)
 
 
-def where_is(name):
-    student_id = get_student_id(name)
-    if not student_id:
-        return f"I don't know {name}."
+def who_inside_now():
+    names = current_status.get_names_with_status(INSIDE)
+
+    if not names:
+        return "No one is inside right now."
+
+    return "Inside now: " + ", ".join(n.capitalize() for n in names)
 
-    status = get_current_status(student_id)
+
+def where_is(name):
+    key = (name or "").strip().lower()
+    try:
+        entry = get_roster().by_name.get(key)
+        if entry:
+            status = get_current_status(entry.id)
+        else:
+            found = current_status.get_status_by_name(key)
+            if not found:
+                return f"I don't know {name}."
+            _, status = found
+    except UNAVAILABLE_ERRORS:
+        # Server unreachable: answer from the local view if one was registered
+        status = _offline_status(key) if _offline_status else None
+        if status is None:
+            return "I can't reach the attendance records right now."
 
     if status == INSIDE:
         return f"{name.capitalize()} is inside."
@@ -0,0 +1,481 @@
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import psycopg2
+
+from db import current_status
+from db.attendance import upsert_edge_events
+from db.database import UNAVAILABLE_ERRORS, cursor
+from db.migrate import ensure_schema
+from db.rfid_cards import get_user_from_uid
+from rules.status_rules import INSIDE, target_status
+from services.rfid_reader import TapResult
+
+# Offline-first gate: taps are acknowledged once they are in a local SQLite
+# journal, and a background worker ships them to PostgreSQL. A relative
+# path is taken from the project root, so the gate and the voice assistant
+# find the same file whatever directory they were started from.
+EDGE_JOURNAL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    os.getenv("EDGE_JOURNAL_PATH", "edge_journal.db"),
+)
+# FULL survives power loss on the Pi; NORMAL only survives process crashes
+EDGE_JOURNAL_SYNCHRONOUS = os.getenv("EDGE_JOURNAL_SYNCHRONOUS", "FULL")
+EDGE_SYNC_BATCH = int(os.getenv("EDGE_SYNC_BATCH", "200"))
+EDGE_SNAPSHOT_INTERVAL = float(os.getenv("EDGE_SNAPSHOT_INTERVAL", "60"))
+EDGE_RETENTION_DAYS = float(os.getenv("EDGE_JOURNAL_RETENTION_DAYS", "7"))
+
+TS_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_uuid TEXT NOT NULL UNIQUE,
+    student_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    activity_type TEXT NOT NULL,
+    reason TEXT,
+    recorded_at TEXT NOT NULL,
+    -- 0 = waiting, 1 = in PostgreSQL, -1 = rejected by PostgreSQL
+    synced INTEGER NOT NULL DEFAULT 0,
+    -- bumped by every local change, so a send racing a change isn't marked done
+    version INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_pending ON events (seq) WHERE synced = 0;
+
+-- Latest known status per student: server snapshot merged with local taps
+CREATE TABLE IF NOT EXISTS local_status (
+    student_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    changed_at TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_local_status_name ON local_status (name);
+
+-- Active cards, so UIDs resolve without the server
+CREATE TABLE IF NOT EXISTS cards (
+    uid TEXT PRIMARY KEY,
+    student_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    student_uid TEXT,
+    program TEXT
+);
+"""
+
+
+def _ts(value: Optional[datetime]) -> str:
+    return value.strftime(TS_FORMAT) if value else ""
+
+
+class LocalEvent(NamedTuple):
+    event_uuid: str
+    student_id: int
+    status: str
+    timestamp: datetime
+
+
+class PendingEvent(NamedTuple):
+    seq: int
+    version: int
+    event_uuid: str
+    student_id: int
+    status: str
+    activity_type: str
+    reason: Optional[str]
+    timestamp: datetime
+
+    def as_row(self):
+        return (self.event_uuid, self.student_id, self.status, self.activity_type, self.reason, self.timestamp)
+
+
+class EdgeJournal:
+    """
+    Durable local log of gate events plus the local status/card view.
+    Safe to use from several threads (one SQLite connection per thread) and
+    from several processes (WAL mode).
+    """
+
+    def __init__(self, path: str = EDGE_JOURNAL_PATH, synchronous: str = EDGE_JOURNAL_SYNCHRONOUS):
+        self.path = path
+        self.synchronous = synchronous
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.conn = conn
+        return conn
+
+    # -------------------------
+    # Events
+    # -------------------------
+    def append(self, student_id: int, name: str, status: str,
+               activity_type: str = "RFID", reason: Optional[str] = None) -> LocalEvent:
+        """Durably record an event and apply it to the local status view."""
+        event = LocalEvent(str(uuid.uuid4()), student_id, status, datetime.now())
+        recorded_at = _ts(event.timestamp)
+        with self._conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO events (event_uuid, student_id, status, activity_type, reason, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (event.event_uuid, student_id, status, activity_type, reason, recorded_at),
+            )
+            conn.execute(
+                """
+                INSERT INTO local_status (student_id, name, status, changed_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (student_id) DO UPDATE SET
+                    name = excluded.name, status = excluded.status, changed_at = excluded.changed_at
+                """,
+                (student_id, name, status, recorded_at),
+            )
+        return event
+
+    def set_reason(self, event_uuid: str, reason: Optional[str]) -> None:
+        """Attach a reason; the event is (re)sent so the server copy gets it too."""
+        with self._conn() as conn:
+            conn.execute(
+                """
+                UPDATE events SET reason = ?, synced = 0, version = version + 1
+                WHERE event_uuid = ? AND synced >= 0
+                """,
+                (reason, event_uuid),
+            )
+
+    def pending(self, limit: int = EDGE_SYNC_BATCH) -> List[PendingEvent]:
+        rows = self._conn().execute(
+            """
+            SELECT seq, version, event_uuid, student_id, status, activity_type, reason, recorded_at
+            FROM events WHERE synced = 0 ORDER BY seq LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+        return [
+            PendingEvent(*row[:7], datetime.strptime(row[7], TS_FORMAT))
+            for row in rows
+        ]
+
+    def mark_synced(self, events: Iterable[PendingEvent]) -> None:
+        with self._conn() as conn:
+            conn.executemany(
+                "UPDATE events SET synced = 1, last_error = NULL WHERE seq = ? AND version = ?",
+                [(e.seq, e.version) for e in events],
+            )
+
+    def mark_failed(self, events: Iterable[PendingEvent], error: str, permanent: bool = False) -> None:
+        with self._conn() as conn:
+            conn.executemany(
+                """
+                UPDATE events SET attempts = attempts + 1, last_error = ?,
+                                  synced = CASE WHEN ? THEN -1 ELSE synced END
+                WHERE seq = ? AND version = ?
+                """,
+                [(error, permanent, e.seq, e.version) for e in events],
+            )
+
+    def prune(self, retention_days: float = EDGE_RETENTION_DAYS) -> int:
+        """Delete events already in PostgreSQL that are older than the retention window."""
+        cutoff = _ts(datetime.now() - timedelta(days=retention_days))
+        with self._conn() as conn:
+            return conn.execute(
+                "DELETE FROM events WHERE synced = 1 AND recorded_at < ?", (cutoff,)
+            ).rowcount
+
+    def stats(self) -> Dict[str, object]:
+        pending, failed, oldest = self._conn().execute(
+            """
+            SELECT COUNT(*) FILTER (WHERE synced = 0),
+                   COUNT(*) FILTER (WHERE synced = -1),
+                   MIN(recorded_at) FILTER (WHERE synced = 0)
+            FROM events
+            """
+        ).fetchone()
+        return {"pending": pending, "failed": failed, "oldest_pending": oldest}
+
+    # -------------------------
+    # Local view
+    # -------------------------
+    def local_status(self, student_id: int) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT status FROM local_status WHERE student_id = ?", (student_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def status_by_name(self, name: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT status FROM local_status WHERE name = ? LIMIT 1", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def lookup_card(self, uid: str) -> Optional[dict]:
+        row = self._conn().execute(
+            "SELECT student_id, name, student_uid, program FROM cards WHERE uid = ?", (uid,)
+        ).fetchone()
+        if not row:
+            return None
+        return {"id": row[0], "name": row[1], "uid": row[2], "program": row[3]}
+
+    def remember_card(self, uid: str, user: dict) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cards (uid, student_id, name, student_uid, program) VALUES (?, ?, ?, ?, ?)",
+                (uid, user["id"], user["name"], user.get("uid"), user.get("program")),
+            )
+
+    def apply_snapshot(self, students: Iterable[tuple]) -> None:
+        """
+        Replace the card table and merge server statuses from
+        (id, name, uid, program, status, changed_at, card_uids) rows. A local
+        tap newer than the server's status wins until it has been synced.
+        """
+        cards = []
+        statuses = []
+        for student_id, name, student_uid, program, status, changed_at, card_uids in students:
+            statuses.append((student_id, name, status, _ts(changed_at)))
+            cards.extend((card_uid, student_id, name, student_uid, program) for card_uid in card_uids)
+
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cards")
+            conn.executemany("INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?, ?)", cards)
+            conn.executemany(
+                """
+                INSERT INTO local_status (student_id, name, status, changed_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (student_id) DO UPDATE SET
+                    name = excluded.name, status = excluded.status, changed_at = excluded.changed_at
+                WHERE excluded.changed_at > local_status.changed_at
+                """,
+                statuses,
+            )
+
+
+# -------------------------
+# Sync worker
+# -------------------------
+class SyncWorker:
+    """
+    Ships pending journal events to PostgreSQL in batches. Sends are
+    idempotent (event_uuid), so a batch whose commit acknowledgement was lost
+    is simply sent again. While the server is unreachable it retries with
+    jittered exponential backoff.
+    """
+
+    def __init__(self, journal: EdgeJournal, batch_size: int = EDGE_SYNC_BATCH,
+                 snapshot_interval: float = EDGE_SNAPSHOT_INTERVAL,
+                 min_backoff: float = 1.0, max_backoff: float = 60.0, idle_poll: float = 5.0):
+        self.journal = journal
+        self.batch_size = batch_size
+        self.snapshot_interval = snapshot_interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.idle_poll = idle_poll
+
+        self.online = False
+        self.synced = 0
+        self.rejected = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+        self._next_snapshot = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="edge-sync", daemon=True)
+
+    def start(self) -> "SyncWorker":
+        self._thread.start()
+        return self
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after one last attempt to flush what is pending."""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        backoff = 0.0
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                ensure_schema()
+                while self.sync_once() == self.batch_size:
+                    pass
+                if time.monotonic() >= self._next_snapshot and not stopping:
+                    self.refresh_snapshot()
+                self.online = True
+                backoff = 0.0
+                delay = self.idle_poll
+            except UNAVAILABLE_ERRORS as e:
+                self.online = False
+                self.failures += 1
+                self.last_error = str(e).strip()
+                backoff = min(self.max_backoff, max(self.min_backoff, backoff * 2))
+                delay = backoff * random.uniform(0.5, 1.0)
+                print(f"Edge sync: database unreachable, retrying in {delay:.1f}s")
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e).strip()
+                print("Edge sync error:", e)
+                delay = self.max_backoff
+
+            if stopping:
+                return
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def sync_once(self) -> int:
+        """Send one batch. Returns how many pending events it covered."""
+        events = self.journal.pending(self.batch_size)
+        if not events:
+            return 0
+
+        try:
+            with cursor() as cur:
+                upsert_edge_events(cur, [e.as_row() for e in events])
+        except (psycopg2.IntegrityError, psycopg2.DataError):
+            # Some row can never be stored (e.g. the student was deleted):
+            # send one by one and set the bad rows aside.
+            for event in events:
+                try:
+                    with cursor() as cur:
+                        upsert_edge_events(cur, [event.as_row()])
+                except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+                    self.journal.mark_failed([event], str(e).strip(), permanent=True)
+                    self.rejected += 1
+                    print(f"Edge sync: dropped event {event.event_uuid}: {e}")
+                else:
+                    self.journal.mark_synced([event])
+                    self.synced += 1
+            return len(events)
+
+        self.journal.mark_synced(events)
+        self.synced += len(events)
+        return len(events)
+
+    def refresh_snapshot(self) -> None:
+        with cursor() as cur:
+            cur.execute(
+                """
+                SELECT s.id, s.name, s.uid, s.program,
+                       COALESCE(cs.status::text, 'OUTSIDE'), cs.changed_at,
+                       COALESCE(
+                           ARRAY_AGG(r.uid) FILTER (WHERE r.uid IS NOT NULL),
+                           '{}'
+                       )
+                FROM students s
+                LEFT JOIN student_current_status cs ON cs.student_id = s.id
+                LEFT JOIN rfid_cards r ON r.user_id = s.id AND r.is_active = TRUE
+                WHERE s.is_active = TRUE
+                GROUP BY s.id, cs.status, cs.changed_at
+                """
+            )
+            rows = cur.fetchall()
+        self.journal.apply_snapshot(rows)
+        self.journal.prune()
+        self._next_snapshot = time.monotonic() + self.snapshot_interval
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "online": self.online,
+            "synced": self.synced,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            **self.journal.stats(),
+        }
+
+
+# -------------------------
+# Gate recorder
+# -------------------------
+class EdgeRecorder:
+    """
+    RfidReaderDaemon recorder that resolves cards and toggles status from the
+    local journal, so a tap is acknowledged without a network round trip.
+    """
+
+    def __init__(self, journal: EdgeJournal, worker: Optional[SyncWorker] = None):
+        self.journal = journal
+        self.worker = worker
+
+    def _resolve(self, uid: str) -> Optional[dict]:
+        user = self.journal.lookup_card(uid)
+        if user:
+            return user
+        # Not in the last snapshot (e.g. registered since): ask the server if it's there
+        try:
+            user = get_user_from_uid(uid)
+        except UNAVAILABLE_ERRORS:
+            return None
+        if user:
+            self.journal.remember_card(uid, user)
+        return user
+
+    def _status(self, student_id: int) -> Optional[str]:
+        status = self.journal.local_status(student_id)
+        if status is not None:
+            return status
+        try:
+            return current_status.get_current_status(student_id)
+        except UNAVAILABLE_ERRORS:
+            return None
+
+    def tap(self, uid: str) -> Optional[TapResult]:
+        user = self._resolve(uid)
+        if not user:
+            return None
+
+        event = "MARK_ABSENT" if self._status(user["id"]) == INSIDE else "MARK_PRESENT"
+        local = self.journal.append(user["id"], user["name"], target_status(event))
+        if self.worker:
+            self.worker.wake()
+        return TapResult(user["name"], event, True, local.status, local.event_uuid)
+
+    def set_reason(self, ref, reason: str) -> None:
+        self.journal.set_reason(ref, reason)
+        if self.worker:
+            self.worker.wake()
+
+
+# -------------------------
+# Local status for other processes
+# -------------------------
+_journal: Optional[EdgeJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_journal(create: bool = True) -> Optional[EdgeJournal]:
+    """Process-wide journal. With create=False, None unless a gate already made the file."""
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                if not create and not os.path.exists(EDGE_JOURNAL_PATH):
+                    return None
+                _journal = EdgeJournal()
+    return _journal
+
+
+def local_status_by_name(name: str) -> Optional[str]:
+    """Status from the gate's local view (for answering while the server is down)."""
+    journal = get_journal(create=False)
+    return journal.status_by_name(name) if journal else None
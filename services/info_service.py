@@ -1,22 +1,66 @@
 from __future__ import annotations
 
-from typing import Optional
+import os
+import threading
+from typing import Dict, Optional
 import psycopg2.extras
 
-from db.database import get_conn, init_db
+from db import listener
+from db.cache import TTLCache
+from db.database import cursor
+from db.migrate import ensure_schema
+from db.search import SEARCH_MIN_SCORE, search_guests, search_projects
+
+# Rendered answers are cached per source table and dropped when that table
+# changes (info_changed NOTIFY, migration 0009); the TTL is a backstop.
+INFO_CHANNEL = "info_changed"
+INFO_CACHE_SIZE = int(os.getenv("INFO_CACHE_SIZE", "512"))
+INFO_CACHE_TTL = float(os.getenv("INFO_CACHE_TTL", "3600"))
+
+_caches: Dict[str, TTLCache] = {
+    table: TTLCache(INFO_CACHE_SIZE, INFO_CACHE_TTL)
+    for table in ("trait_info", "projects", "guests")
+}
+_subscribed = False
+_subscribe_lock = threading.Lock()
+
+
+def _cached(table: str, key, loader) -> Optional[str]:
+    global _subscribed
+    if not _subscribed:
+        with _subscribe_lock:
+            if not _subscribed:
+                listener.subscribe(INFO_CHANNEL, invalidate_info_cache)
+                _subscribed = True
+    return _caches[table].get_or_load(key, lambda _key: loader())
+
+
+def invalidate_info_cache(table: Optional[str] = None) -> None:
+    """Drop cached answers for ``table``, or for every table if None/unknown."""
+    cache = _caches.get(table) if table else None
+    for c in [cache] if cache else _caches.values():
+        c.clear()
+
+
+def info_cache_stats() -> Dict[str, dict]:
+    return {table: cache.stats() for table, cache in _caches.items()}
 
 
 def _fetch_one(query: str, params: tuple = ()) -> Optional[dict]:
-    init_db()
-    conn = get_conn()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute(query, params)
-    row = cur.fetchone()
-    conn.close()
+    ensure_schema()
+    with cursor(psycopg2.extras.RealDictCursor) as cur:
+        cur.execute(query, params)
+        row = cur.fetchone()
     return dict(row) if row else None
 
 
 def get_trait_response(field: str | None = None) -> str:
+    responses = _cached("trait_info", "responses", _render_trait_responses)
+    return responses.get(field) or responses[None]
+
+
+def _render_trait_responses() -> Dict[Optional[str], str]:
+    """Every variant of the centre answer, rendered from one row."""
     info = _fetch_one(
         """
         SELECT title, description, vision, mission, location, contact_email
@@ -27,7 +71,7 @@ def get_trait_response(field: str | None = None) -> str:
     )
 
     if not info:
-        return "Trait center information is not available."
+        return {None: "Trait center information is not available."}
 
     title = info.get("title") or "Trait Center"
     description = info.get("description") or ""
@@ -36,15 +80,6 @@ def get_trait_response(field: str | None = None) -> str:
     location = info.get("location") or ""
     contact_email = info.get("contact_email") or ""
 
-    if field == "vision":
-        return f"{title} vision: {vision or 'not provided.'}"
-    if field == "mission":
-        return f"{title} mission: {mission or 'not provided.'}"
-    if field == "location":
-        return f"{title} location: {location or 'not provided.'}"
-    if field == "contact":
-        return f"{title} contact email: {contact_email or 'not provided.'}"
-
     parts = [title]
     if description:
         parts.append(description)
@@ -52,21 +87,31 @@ def get_trait_response(field: str | None = None) -> str:
         parts.append(f"Location: {location}.")
     if contact_email:
         parts.append(f"Contact: {contact_email}.")
-    return " ".join(parts).strip()
+
+    return {
+        None: " ".join(parts).strip(),
+        "vision": f"{title} vision: {vision or 'not provided.'}",
+        "mission": f"{title} mission: {mission or 'not provided.'}",
+        "location": f"{title} location: {location or 'not provided.'}",
+        "contact": f"{title} contact email: {contact_email or 'not provided.'}",
+    }
 
 
 def get_guest_welcome_note(name: str | None = None) -> str:
+    return find_guest_welcome_note(name) or "Guest information is not available."
+
+
+def find_guest_welcome_note(name: str | None = None) -> Optional[str]:
+    """Welcome note for the best matching guest (latest guest if no name), or None."""
+    name = (name or "").strip()
+    return _cached("guests", name.lower(), lambda: _render_guest_welcome_note(name))
+
+
+def _render_guest_welcome_note(name: str) -> Optional[str]:
     if name:
-        info = _fetch_one(
-            """
-            SELECT name, welcome_note, organization, designation, visit_purpose, visit_date
-            FROM guests
-            WHERE name ILIKE %s
-            ORDER BY id DESC
-            LIMIT 1
-            """,
-            (f"%{name}%",),
-        )
+        ensure_schema()
+        matches = search_guests(name, limit=1, min_score=SEARCH_MIN_SCORE)
+        info = matches[0] if matches else None
     else:
         info = _fetch_one(
             """
@@ -78,7 +123,7 @@ def get_guest_welcome_note(name: str | None = None) -> str:
         )
 
     if not info:
-        return "Guest information is not available."
+        return None
 
     guest_name = info.get("name") or "Guest"
     welcome_note = info.get("welcome_note") or "Welcome"
@@ -102,19 +147,21 @@ def get_guest_welcome_note(name: str | None = None) -> str:
 
 
 def get_projects_summary() -> str:
-    init_db()
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT title
-        FROM projects
-        WHERE status = 'ONGOING'
-        ORDER BY id DESC
-        """
-    )
-    rows = cur.fetchall()
-    conn.close()
+    return _cached("projects", "summary", _render_projects_summary)
+
+
+def _render_projects_summary() -> str:
+    ensure_schema()
+    with cursor() as cur:
+        cur.execute(
+            """
+            SELECT title
+            FROM projects
+            WHERE status = 'ONGOING'
+            ORDER BY id DESC
+            """
+        )
+        rows = cur.fetchall()
 
     if not rows:
         return "There are no ongoing projects."
@@ -124,19 +171,22 @@ def get_projects_summary() -> str:
 
 
 def get_project_details(title: str) -> str:
-    info = _fetch_one(
-        """
-        SELECT title, description, domain, status, mentor, start_date, end_date
-        FROM projects
-        WHERE title ILIKE %s
-        ORDER BY id DESC
-        LIMIT 1
-        """,
-        (f"%{title}%",),
-    )
+    return find_project_details(title) or f"I couldn't find a project named {(title or '').strip()}."
+
+
+def find_project_details(title: str) -> Optional[str]:
+    """Details of the best matching project, or None if nothing matches."""
+    title = (title or "").strip()
+    return _cached("projects", ("details", title.lower()), lambda: _render_project_details(title))
+
+
+def _render_project_details(title: str) -> Optional[str]:
+    ensure_schema()
+    matches = search_projects(title, limit=1, min_score=SEARCH_MIN_SCORE)
+    info = matches[0] if matches else None
 
     if not info:
-        return f"I couldn't find a project named {title}."
+        return None
 
     parts = [info.get("title") or "Project"]
     if info.get("description"):
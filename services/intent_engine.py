@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import asyncio
+import glob
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import AsyncIterator, Callable, Dict, Iterator, NamedTuple, Optional
+
+from db.database import POOL_CONFIG
+from services.ai_service import ask_gemini, ask_gemini_async, stream_gemini, stream_gemini_async
+from services.attendance_service import (
+    mark_absent,
+    mark_present,
+    summary_today,
+    where_is,
+    who_absent_today,
+    who_inside_now,
+    who_present_today,
+)
+from services.info_service import (
+    find_guest_welcome_note,
+    find_project_details,
+    get_guest_welcome_note,
+    get_project_details,
+    get_projects_summary,
+    get_trait_response,
+)
+from services.name_matcher import resolve_name
+from services.parser import parse_command
+from services.text_chunker import message_parts, message_parts_async
+
+# One command router for every front-end (voice loop, WhatsApp on Flask and
+# ASGI). Intents the database can answer are handled locally; only UNKNOWN
+# goes to Gemini, and only for channels that allow it.
+
+NOT_UNDERSTOOD = "Sorry, I didn't understand."
+FALLBACK_REPLY = "🤖 I’m TRAIT Buddy. Try asking who is inside, where someone is, or about our projects."
+WRITES_NOT_ALLOWED = "Attendance can only be marked at the gate or with the voice assistant."
+
+# Intents whose "name" is a student (resolved against the roster)
+STUDENT_NAME_INTENTS = {"WHERE_IS", "MARK_PRESENT", "MARK_ABSENT"}
+WRITE_INTENTS = {"MARK_PRESENT", "MARK_ABSENT"}
+
+
+class Reply(NamedTuple):
+    text: str
+    intent: str
+    source: str  # "local", "llm" or "fallback"
+    latency: float
+
+
+class IntentMetrics:
+    """Per-intent request counts and latency (recent samples), thread-safe."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._sources: Dict[str, int] = defaultdict(int)
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, reply: Reply) -> None:
+        with self._lock:
+            self._counts[reply.intent] += 1
+            self._sources[reply.source] += 1
+            self._latencies[reply.intent].append(reply.latency)
+
+    def stats(self) -> dict:
+        with self._lock:
+            intents = {}
+            for intent, count in self._counts.items():
+                samples = sorted(self._latencies[intent])
+                intents[intent] = {
+                    "count": count,
+                    "latency_avg_ms": 1000 * sum(samples) / len(samples),
+                    "latency_p95_ms": 1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                    "latency_max_ms": 1000 * samples[-1],
+                }
+            return {"intents": intents, "sources": dict(self._sources)}
+
+
+def latest_meeting_summary() -> str:
+    """Newest minutes saved by the voice assistant's meeting mode."""
+    files = glob.glob(os.path.join("data", "meeting_*.txt"))
+    if not files:
+        return "📄 No meeting summary available yet."
+    with open(max(files, key=os.path.getmtime), "r") as f:
+        return f"📄 {f.read()}"
+
+
+class IntentEngine:
+    """
+    Parses a command, answers it from the attendance/info services when it
+    can, and otherwise asks the LLM (if ``llm_fallback``). ``allow_writes``
+    controls whether MARK_PRESENT/MARK_ABSENT are honoured on this channel.
+    """
+
+    def __init__(self, channel: str, allow_writes: bool, llm_fallback: bool,
+                 llm: Callable[[str], str] = ask_gemini,
+                 llm_async: Callable[[str], "asyncio.Future"] = ask_gemini_async,
+                 llm_stream: Callable[[str], Iterator[str]] = stream_gemini,
+                 llm_stream_async: Callable[[str], AsyncIterator[str]] = stream_gemini_async,
+                 metrics: Optional[IntentMetrics] = None):
+        self.channel = channel
+        self.allow_writes = allow_writes
+        self.llm_fallback = llm_fallback
+        self.llm = llm
+        self.llm_async = llm_async
+        self.llm_stream = llm_stream
+        self.llm_stream_async = llm_stream_async
+        self.metrics = metrics or IntentMetrics()
+        self._db_slots = None
+        self._db_loop = None
+
+    # -------------------------
+    # Local answers
+    # -------------------------
+    def answer_local(self, parsed: dict) -> Optional[str]:
+        """
+        Answer for a parsed command, or None if it needs the LLM. With
+        ``llm_fallback``, a student, project or guest that doesn't resolve
+        also returns None: the keyword parser misreads general questions.
+        """
+        intent = parsed.get("intent")
+
+        # The name is resolved before writes are refused, so "what is the
+        # present value of an annuity" reaches the LLM instead of a refusal.
+        resolved_name = None
+        if intent in STUDENT_NAME_INTENTS and parsed.get("name"):
+            spoken_name = parsed["name"]
+            match = resolve_name(spoken_name)
+
+            if not match.name:
+                # "where is chennai" on WhatsApp is a question for the LLM
+                if self.llm_fallback:
+                    return None
+                return f"I couldn't find a student named {spoken_name}."
+
+            if intent in WRITE_INTENTS and not self.allow_writes:
+                return WRITES_NOT_ALLOWED
+
+            if match.ambiguous:
+                other = next(c.name for c in match.candidates if c.name != match.name)
+                return f"Did you mean {match.name.capitalize()} or {other.capitalize()}?"
+
+            resolved_name = match.name
+
+        if intent == "WHO_PRESENT":
+            return who_present_today()
+
+        if intent == "WHO_ABSENT":
+            return who_absent_today()
+
+        if intent == "WHO_INSIDE_NOW":
+            return who_inside_now()
+
+        if intent == "WHERE_IS" and resolved_name:
+            return where_is(resolved_name)
+
+        if intent == "MEETING_SUMMARY":
+            return latest_meeting_summary()
+
+        if intent == "SUMMARY":
+            return summary_today()
+
+        if intent == "TRAIT_INFO":
+            return get_trait_response(parsed.get("field"))
+
+        if intent == "GUEST_WELCOME":
+            if self.llm_fallback:
+                return find_guest_welcome_note(parsed.get("name"))
+            return get_guest_welcome_note(parsed.get("name"))
+
+        if intent == "PROJECTS_LIST":
+            return get_projects_summary()
+
+        if intent == "PROJECT_DETAILS":
+            title = parsed.get("title")
+            if not title:
+                return get_projects_summary()
+            if self.llm_fallback:
+                return find_project_details(title)
+            return get_project_details(title)
+
+        if intent == "MARK_PRESENT" and resolved_name:
+            return mark_present(resolved_name)
+
+        if intent == "MARK_ABSENT" and resolved_name:
+            return mark_absent(resolved_name)
+
+        return None
+
+    # -------------------------
+    # Entry points
+    # -------------------------
+    def answer(self, text: str) -> Reply:
+        started = time.perf_counter()
+        parsed = parse_command(text) or {"intent": "UNKNOWN"}
+        intent = parsed.get("intent") or "UNKNOWN"
+
+        reply = self.answer_local(parsed)
+        source = "local"
+        if reply is None:
+            reply, source = self._fallback(text)
+
+        return self._finish(reply, intent, source, started)
+
+    async def answer_async(self, text: str) -> Reply:
+        """answer() for asyncio servers: local answers (psycopg2) run in a thread, Gemini is awaited."""
+        started = time.perf_counter()
+        parsed = parse_command(text) or {"intent": "UNKNOWN"}
+        intent = parsed.get("intent") or "UNKNOWN"
+
+        reply = None
+        if intent != "UNKNOWN":
+            reply = await self._answer_local_async(parsed)
+        source = "local"
+        if reply is None:
+            if self.llm_fallback:
+                try:
+                    reply, source = await self.llm_async(text), "llm"
+                except Exception:
+                    reply, source = FALLBACK_REPLY, "fallback"
+            else:
+                reply, source = NOT_UNDERSTOOD, "fallback"
+
+        return self._finish(reply, intent, source, started)
+
+    def answer_parts(self, text: str) -> Iterator[str]:
+        """
+        answer() for channels that take several messages: an LLM answer is
+        yielded in WhatsApp-sized parts while Gemini is still writing it.
+        """
+        started = time.perf_counter()
+        parsed = parse_command(text) or {"intent": "UNKNOWN"}
+        intent = parsed.get("intent") or "UNKNOWN"
+
+        reply = self.answer_local(parsed)
+        if reply is not None or not self.llm_fallback:
+            reply, source = (reply, "local") if reply is not None else (NOT_UNDERSTOOD, "fallback")
+            self._finish(reply, intent, source, started)
+            yield reply
+            return
+
+        parts = []
+        try:
+            for part in message_parts(self.llm_stream(text)):
+                parts.append(part)
+                yield part
+        except Exception:
+            if not parts:
+                self._finish(FALLBACK_REPLY, intent, "fallback", started)
+                yield FALLBACK_REPLY
+                return
+        self._finish("\n".join(parts), intent, "llm", started)
+
+    async def answer_parts_async(self, text: str) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        parsed = parse_command(text) or {"intent": "UNKNOWN"}
+        intent = parsed.get("intent") or "UNKNOWN"
+
+        reply = None
+        if intent != "UNKNOWN":
+            reply = await self._answer_local_async(parsed)
+        if reply is not None or not self.llm_fallback:
+            reply, source = (reply, "local") if reply is not None else (NOT_UNDERSTOOD, "fallback")
+            self._finish(reply, intent, source, started)
+            yield reply
+            return
+
+        parts = []
+        try:
+            async for part in message_parts_async(self.llm_stream_async(text)):
+                parts.append(part)
+                yield part
+        except Exception:
+            if not parts:
+                self._finish(FALLBACK_REPLY, intent, "fallback", started)
+                yield FALLBACK_REPLY
+                return
+        self._finish("\n".join(parts), intent, "llm", started)
+
+    async def _answer_local_async(self, parsed: dict) -> Optional[str]:
+        # Local answers use the sync psycopg2 pool from a thread. At most
+        # DB_POOL_MAX run at once, so a burst of webhooks queues here
+        # instead of timing out waiting for a pooled connection.
+        loop = asyncio.get_running_loop()
+        if self._db_loop is not loop:
+            self._db_loop = loop
+            self._db_slots = asyncio.Semaphore(POOL_CONFIG["maxconn"])
+        async with self._db_slots:
+            return await asyncio.to_thread(self.answer_local, parsed)
+
+    def _fallback(self, text: str):
+        if not self.llm_fallback:
+            return NOT_UNDERSTOOD, "fallback"
+        try:
+            return self.llm(text), "llm"
+        except Exception:
+            return FALLBACK_REPLY, "fallback"
+
+    def _finish(self, text: str, intent: str, source: str, started: float) -> Reply:
+        reply = Reply(text, intent, source, time.perf_counter() - started)
+        self.metrics.record(reply)
+        return reply
+
+
+# WhatsApp: read-only, Gemini for anything else. Voice: can mark attendance;
+# free-form questions go through its explicit AI mode instead.
+whatsapp_engine = IntentEngine("whatsapp", allow_writes=False, llm_fallback=True)
+voice_engine = IntentEngine("voice", allow_writes=True, llm_fallback=False)
+
+
+def handle_traitbuddy(text: str) -> str:
+    return whatsapp_engine.answer(text).text
+
+
+async def handle_traitbuddy_async(text: str) -> str:
+    return (await whatsapp_engine.answer_async(text)).text
+
+
+def handle_traitbuddy_parts(text: str) -> Iterator[str]:
+    """Reply as one or more messages; long AI answers start arriving early."""
+    return whatsapp_engine.answer_parts(text)
+
+
+def handle_traitbuddy_parts_async(text: str) -> AsyncIterator[str]:
+    return whatsapp_engine.answer_parts_async(text)
+
+
+def intent_stats() -> dict:
+    return {
+        "whatsapp": whatsapp_engine.metrics.stats(),
+        "voice": voice_engine.metrics.stats(),
+    }
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Awaitable, Callable, Dict, Optional
+
+from db.cache import TTLCache
+
+# Gemini answers are cached so the same question from many WhatsApp users
+# (or a repeated voice query) costs one upstream call.
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "21600"))  # 6 h
+# JSON file the cache is saved to so it survives restarts; empty disables
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+LLM_CACHE_FLUSH_SECONDS = float(os.getenv("LLM_CACHE_FLUSH_SECONDS", "30"))
+
+_SPACES = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.。,;:]+$")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """'  What is  TRAIT?? ' and 'what is trait' share a cache entry."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    text = _SPACES.sub(" ", text).strip()
+    return _TRAILING.sub("", text)
+
+
+class _Flight:
+    """One upstream call that concurrent identical prompts wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMCache:
+    """
+    LRU + TTL cache of model answers keyed on (model, normalized prompt).
+
+    Concurrent misses for the same key are coalesced ("single flight"):
+    one caller generates, the others wait for its answer (or its error).
+    Only non-empty answers are cached; errors never are.
+    """
+
+    def __init__(self, model: str, max_entries: int = LLM_CACHE_SIZE,
+                 ttl: float = LLM_CACHE_TTL, path: str = LLM_CACHE_PATH,
+                 flush_interval: float = LLM_CACHE_FLUSH_SECONDS):
+        self.model = model
+        self.path = path
+        self.flush_interval = flush_interval
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[str, "asyncio.Future[str]"] = {}
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+        self.coalesced = 0
+
+        if path:
+            self.load()
+
+    def key(self, prompt: str) -> str:
+        return f"{self.model}\x00{normalize_prompt(prompt)}"
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def get_or_generate(self, prompt: str, generate: Callable[[str], str]) -> str:
+        key = self.key(prompt)
+        value = self._cache.get(key, None)
+        if value is not None:
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        generation = self._cache.generation
+        try:
+            flight.value = self._call(generate, prompt)
+            self._remember(key, flight.value, generation)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def get_or_generate_async(self, prompt: str,
+                                    generate: Callable[[str], Awaitable[str]]) -> str:
+        """get_or_generate() for coroutines; coalesces callers on the same event loop."""
+        key = self.key(prompt)
+        value = self._cache.get(key, None)
+        if value is not None:
+            return value
+
+        pending = self._async_flights.get(key)
+        if pending is not None:
+            with self._lock:
+                self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_flights[key] = future
+        generation = self._cache.generation
+        try:
+            with self._lock:
+                self.upstream_calls += 1
+            try:
+                value = await generate(prompt)
+            except BaseException:
+                with self._lock:
+                    self.upstream_errors += 1
+                raise
+            self._remember(key, value, generation)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._async_flights[key]
+
+    def lookup(self, prompt: str) -> Optional[str]:
+        """Cached answer for ``prompt``, or None (for callers that stream instead)."""
+        return self._cache.get(self.key(prompt), None)
+
+    def remember(self, prompt: str, value: str) -> None:
+        """Cache an answer assembled outside get_or_generate (e.g. a finished stream)."""
+        self._remember(self.key(prompt), value, self._cache.generation)
+
+    def _call(self, generate: Callable[[str], str], prompt: str) -> str:
+        with self._lock:
+            self.upstream_calls += 1
+        try:
+            return generate(prompt)
+        except BaseException:
+            with self._lock:
+                self.upstream_errors += 1
+            raise
+
+    def _remember(self, key: str, value: Optional[str], generation: int) -> None:
+        if not value:
+            return
+        if self._cache.put(key, value, generation):
+            self._dirty = True
+            if self.path and time.monotonic() - self._last_flush >= self.flush_interval:
+                self.save()
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._dirty = True
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def load(self) -> int:
+        """Read entries saved by save(); returns how many were still fresh."""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            print(f"⚠️ LLM cache: ignoring unreadable {self.path}: {e}")
+            return 0
+
+        now = time.time()
+        loaded = 0
+        for key, value, expires_at in data.get("entries", []):
+            # A different GEMINI_MODEL means different keys; those entries just age out
+            if expires_at > now:
+                self._cache.put(key, value, ttl=expires_at - now)
+                loaded += 1
+        return loaded
+
+    def save(self) -> None:
+        """Write live entries to ``path`` (atomically, via a temp file)."""
+        if not self.path:
+            return
+        with self._save_lock:
+            now = time.time()
+            entries = [[k, v, now + left] for k, v, left in self._cache.items()]
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+            tmp = f"{self.path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(tmp, "w") as f:
+                    json.dump({"version": 1, "entries": entries}, f)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                self._dirty = True
+                print(f"⚠️ LLM cache: could not save {self.path}: {e}")
+
+    def flush(self) -> None:
+        """save() if anything changed since the last write (e.g. at shutdown)."""
+        if self._dirty:
+            self.save()
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        with self._lock:
+            lookups = stats["hits"] + stats["misses"]
+            stats.update({
+                "model": self.model,
+                # coalesced callers missed the cache but didn't cost an upstream call
+                "served_without_upstream": (stats["hits"] + self.coalesced) / lookups if lookups else 0.0,
+                "upstream_calls": self.upstream_calls,
+                "upstream_errors": self.upstream_errors,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights) + len(self._async_flights),
+                "persisted_to": self.path or None,
+            })
+        return stats
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+# Queries shorter than this match nothing; below SHORT_QUERY_CHARS the whole
+# query is compared with the whole name (plain ratio), because WRatio's
+# partial matching scores "ram" or "the" at 90 against any name containing it.
+MIN_QUERY_CHARS = 2
+SHORT_QUERY_CHARS = 4
+
+
+class NameCandidate(NamedTuple):
+    name: str
+    score: float
+
+
+class NameMatch(NamedTuple):
+    name: Optional[str]             # best match at/above threshold, None otherwise
+    score: float
+    ambiguous: bool                 # runner-up scored within the ambiguity margin
+    candidates: List[NameCandidate]
+
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def soundex(token: str) -> str:
+    """American Soundex code for one word ("" for non-alphabetic input)."""
+    letters = [c for c in token.lower() if c.isalpha()]
+    if not letters:
+        return ""
+
+    code = letters[0].upper()
+    last = _SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        digit = _SOUNDEX_CODES.get(c, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if c not in "hw":
+            last = digit
+    return code.ljust(4, "0")
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _block_keys(processed: str) -> set:
+    """Exact tokens, per-token phonetic codes and the initials string."""
+    tokens = processed.split()
+    keys = set(tokens)
+    keys.update("~" + soundex(t) for t in tokens if soundex(t))
+    if len(tokens) > 1:
+        keys.add("^" + "".join(t[0] for t in tokens))
+    return keys
+
+
+class NameIndex:
+    """
+    Fuzzy lookup over a fixed list of names.
+
+    Built once per roster: names are preprocessed up front and indexed by
+    token, phonetic code, initials and character trigram. A query scores
+    (with WRatio, as the linear matcher does) only the best-blocked
+    candidates instead of every name. Small lists are simply scanned.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        linear_scan_below: int = 1000,
+        max_candidates: int = 200,
+    ):
+        self.names = list(names)
+        self.linear_scan_below = linear_scan_below
+        self.max_candidates = max_candidates
+        self._processed = [default_process(n) for n in self.names]
+
+        self._blocks: Dict[str, List[int]] = defaultdict(list)
+        self._grams: Dict[str, List[int]] = defaultdict(list)
+        if len(self.names) >= linear_scan_below:
+            for i, processed in enumerate(self._processed):
+                for key in _block_keys(processed):
+                    self._blocks[key].append(i)
+                for gram in _trigrams(processed):
+                    self._grams[gram].append(i)
+
+        # Trigrams shared by a large share of the roster carry no signal and
+        # cost the most to count; skip them when ranking candidates.
+        self._max_posting = max(100, len(self.names) // 20)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _candidates(self, query: str) -> List[int]:
+        if len(self.names) < self.linear_scan_below:
+            return list(range(len(self.names)))
+
+        counts = Counter()
+        for key in _block_keys(query):
+            for i in self._blocks.get(key, ()):
+                counts[i] += 3
+        for gram in _trigrams(query):
+            posting = self._grams.get(gram)
+            if posting and len(posting) <= self._max_posting:
+                counts.update(posting)
+
+        if not counts:
+            return list(range(len(self.names)))
+        return [i for i, _ in counts.most_common(self.max_candidates)]
+
+    def search(self, query: str, limit: int = 5, score_cutoff: float = 0) -> List[NameCandidate]:
+        """Top ``limit`` names for ``query``, best first."""
+        processed = default_process(query or "")
+        if len(processed) < MIN_QUERY_CHARS or not self.names:
+            return []
+
+        ids = self._candidates(processed)
+        results = process.extract(
+            processed,
+            [self._processed[i] for i in ids],
+            scorer=fuzz.ratio if len(processed) < SHORT_QUERY_CHARS else fuzz.WRatio,
+            processor=None,
+            limit=limit,
+            score_cutoff=score_cutoff,
+        )
+        return [NameCandidate(self.names[ids[pos]], score) for _, score, pos in results]
+
+    def match(
+        self,
+        query: str,
+        threshold: float = 80,
+        limit: int = 5,
+        ambiguity_margin: float = 5,
+    ) -> NameMatch:
+        """
+        Best name at or above ``threshold``. The match is flagged ambiguous
+        when another distinct name also clears the threshold within
+        ``ambiguity_margin`` points of it.
+        """
+        candidates = self.search(query, limit=limit)
+        if not candidates:
+            return NameMatch(None, 0, False, [])
+
+        best = candidates[0]
+        if best.score < threshold:
+            return NameMatch(None, best.score, False, candidates)
+
+        ambiguous = any(
+            c.name != best.name and c.score >= threshold and best.score - c.score < ambiguity_margin
+            for c in candidates[1:]
+        )
+        return NameMatch(best.name, best.score, ambiguous, candidates)
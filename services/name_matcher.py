@@ -1,36 +1,37 @@
-from rapidfuzz import process, fuzz
-from db.database import get_conn, init_db
+from db.roster import get_roster
+from services.name_index import NameIndex, NameMatch
 
-def match_name(spoken_name: str, known_names: list, threshold=80):
+# Index for the roster snapshot, rebuilt only when the snapshot changes.
+_roster_index = (None, None)
+
+
+def get_name_index() -> NameIndex:
+    """Name index over the cached roster, rebuilt when the roster reloads."""
+    global _roster_index
+    roster = get_roster()
+    cached_roster, index = _roster_index
+    if cached_roster is not roster:
+        index = NameIndex(roster.names)
+        _roster_index = (roster, index)
+    return index
+
+
+def match_name(spoken_name: str, threshold=80):
     """
     Returns (best_match, confidence) or (None, 0)
     """
-    if not spoken_name or not known_names:
+    match = resolve_name(spoken_name, threshold=threshold)
+    if not match.name:
         return None, 0
+    return match.name, match.score
 
-    match = process.extractOne(
-        spoken_name,
-        known_names,
-        scorer=fuzz.WRatio
-    )
 
-    if not match:
-        return None, 0
+def resolve_name(spoken_name: str, threshold=80, limit=5) -> NameMatch:
+    """Top-``limit`` roster matches for a spoken name, with ambiguity flag."""
+    if not spoken_name:
+        return NameMatch(None, 0, False, [])
+    return get_name_index().match(spoken_name, threshold=threshold, limit=limit)
 
-    best_name, score, _ = match
-
-    if score >= threshold:
-        return best_name, score
-
-    return None, score
 
 def get_all_student_names():
-    init_db()
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute("SELECT name FROM students WHERE is_active = TRUE")
-    names = [row[0] for row in cur.fetchall()]
-
-    conn.close()
-    return names
+    return list(get_roster().names)
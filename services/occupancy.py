@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from typing import Dict, NamedTuple, Optional
+
+from db import listener
+from db.database import cursor
+from db.migrate import ensure_schema
+from db.roster import ROSTER_CHANNEL
+
+# Notified by the student_current_status triggers (migration 0008)
+OCCUPANCY_CHANNEL = "occupancy_changed"
+
+UNKNOWN_PROGRAM = "unassigned"
+
+
+class OccupancySnapshot(NamedTuple):
+    version: int
+    total: int
+    by_program: Dict[str, int]
+    inside_ids: frozenset
+    updated_at: float
+
+    def as_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "total": self.total,
+            "by_program": self.by_program,
+            "inside": sorted(self.inside_ids),
+            "updated_at": self.updated_at,
+        }
+
+
+class Occupancy:
+    """
+    Who is inside right now, kept in memory. Loaded once from
+    student_current_status and then updated from occupancy_changed
+    notifications. Each change bumps ``version``; wait_for_change() lets
+    streaming clients block until there is something new to send.
+    """
+
+    def __init__(self):
+        self._inside: Dict[int, str] = {}  # student_id -> program
+        self._version = 0
+        self._updated_at = time.time()
+        self._changed = threading.Condition()
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def load(self) -> None:
+        ensure_schema()
+        with cursor() as cur:
+            cur.execute(
+                """
+                SELECT cs.student_id, s.program
+                FROM student_current_status cs
+                JOIN students s ON s.id = cs.student_id
+                WHERE cs.status = 'INSIDE'
+                  AND s.is_active = TRUE
+                """
+            )
+            inside = {sid: program or UNKNOWN_PROGRAM for sid, program in cur.fetchall()}
+
+        with self._changed:
+            self._inside = inside
+            self._bump()
+        self._loaded = True
+
+    def ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                # Subscribe before loading: a connected listener LISTENs
+                # before subscribe() returns, and one still connecting calls
+                # on_notify(None) (a reload) once its LISTENs are in place,
+                # so no change falls in between.
+                listener.subscribe(OCCUPANCY_CHANNEL, self.on_notify)
+                listener.subscribe(ROSTER_CHANNEL, self.on_roster_changed)
+                self.load()
+
+    def on_notify(self, payload: Optional[str]) -> None:
+        if payload is None:
+            # (re)connected: notifications may have been missed
+            self.load()
+            return
+
+        change = json.loads(payload)
+        student_id = change["student_id"]
+        with self._changed:
+            if change["status"] == "INSIDE" and change.get("active", True):
+                program = change.get("program") or UNKNOWN_PROGRAM
+                if self._inside.get(student_id) == program:
+                    return
+                self._inside[student_id] = program
+            elif self._inside.pop(student_id, None) is None:
+                return
+            self._bump()
+
+    def on_roster_changed(self, payload: Optional[str]) -> None:
+        # deactivations and program changes are not status changes; on
+        # reconnect (None) on_notify already reloads
+        if payload is not None:
+            self.load()
+
+    def _bump(self) -> None:
+        # caller holds self._changed
+        self._version += 1
+        self._updated_at = time.time()
+        self._changed.notify_all()
+
+    def snapshot(self) -> OccupancySnapshot:
+        self.ensure_loaded()
+        with self._changed:
+            return OccupancySnapshot(
+                version=self._version,
+                total=len(self._inside),
+                by_program=dict(Counter(self._inside.values())),
+                inside_ids=frozenset(self._inside),
+                updated_at=self._updated_at,
+            )
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def wait_for_change(self, version: int, timeout: float) -> Optional[OccupancySnapshot]:
+        """Snapshot once ``version`` is outdated, or None after ``timeout`` seconds."""
+        self.ensure_loaded()
+        with self._changed:
+            if not self._changed.wait_for(lambda: self._version != version, timeout):
+                return None
+        return self.snapshot()
+
+
+_occupancy = Occupancy()
+
+
+def get_occupancy() -> Occupancy:
+    return _occupancy
+
+
+def occupancy_stream(keepalive: float = 15.0):
+    """
+    Server-Sent Events body: one ``occupancy`` event with the full snapshot
+    now and after every change, and a comment line as keepalive.
+    """
+    snapshot = _occupancy.snapshot()
+    while True:
+        yield f"id: {snapshot.version}\nevent: occupancy\ndata: {json.dumps(snapshot.as_dict())}\n\n"
+        while True:
+            newer = _occupancy.wait_for_change(snapshot.version, keepalive)
+            if newer:
+                snapshot = newer
+                break
+            yield ": keepalive\n\n"
+
+
+async def occupancy_stream_async(keepalive: float = 15.0, poll: float = 0.5):
+    """
+    occupancy_stream() for asyncio servers. Checks the version every
+    ``poll`` seconds instead of blocking a thread per connected dashboard.
+    """
+    snapshot = await asyncio.to_thread(_occupancy.snapshot)
+    while True:
+        yield f"id: {snapshot.version}\nevent: occupancy\ndata: {json.dumps(snapshot.as_dict())}\n\n"
+        waited = 0.0
+        while _occupancy.version == snapshot.version:
+            await asyncio.sleep(poll)
+            waited += poll
+            if waited >= keepalive:
+                yield ": keepalive\n\n"
+                waited = 0.0
+        snapshot = _occupancy.snapshot()
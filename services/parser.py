@@ -6,77 +6,115 @@ STOPWORDS = {
     "guest", "welcome", "note", "project", "projects",
     "trait", "center", "vision", "mission", "location",
     "contact", "info", "about", "details", "ongoing",
-    "list", "show", "tell", "me", "please", "purpose"
+    "list", "show", "tell", "me", "please", "purpose",
+    "now", "right", "currently", "today", "where", "who", "what"
+}
+
+# Names shorter than this (after stopwords are removed) are parser noise
+MIN_NAME_CHARS = 3
+
+# Every word of a "who is inside" / "summary" question must come from this
+# vocabulary, so "who is the best cricketer in the world" or "summary of the
+# french revolution" are left for the LLM instead of answered from attendance.
+ATTENDANCE_WORDS = {
+    "who", "who's", "is", "are", "all", "the", "a", "of", "for", "at", "in", "out",
+    "present", "absent", "inside", "outside", "here", "not", "still",
+    "now", "right", "currently", "today", "today's", "moment",
+    "lab", "trait", "center", "centre", "office", "students", "people", "everyone", "anyone",
+    "summary", "attendance", "daily", "give", "me", "show", "tell", "what", "what's", "please",
 }
 
 def normalize(text: str) -> str:
     return text.lower().strip().replace(".", "")
 
+def tokenize(text: str) -> list:
+    # Whole words only: "in" must not match "invented", "present" not "president"
+    return re.findall(r"[a-z0-9']+", text)
+
+def _name_or_none(words: list):
+    name = " ".join(w for w in words if w not in STOPWORDS)
+    return name if len(name) >= MIN_NAME_CHARS else None
+
+
 def extract_name(text: str):
-    words = text.split()
-    name_words = [w for w in words if w not in STOPWORDS]
-    return " ".join(name_words) if name_words else None
+    return _name_or_none(tokenize(text))
 
 
 def extract_after_keyword(text: str, keyword: str) -> str | None:
-    words = text.split()
+    words = tokenize(text)
     if keyword not in words:
         return None
 
     idx = words.index(keyword)
-    remainder = [w for w in words[idx + 1 :] if w not in STOPWORDS]
-    return " ".join(remainder) if remainder else None
+    return _name_or_none(words[idx + 1 :])
 
 def parse_command(text: str):
     raw = text.strip()
     t = normalize(raw)
+    words = set(tokenize(t))
+    attendance_only = words <= ATTENDANCE_WORDS
 
     # -------------------------
     # WHERE IS <name>
     # -------------------------
-    m = re.search(r"where\s+is\s+([a-z]+)", t)
+    m = re.search(r"where\s+is\s+(.+)", t)
     if m:
-        return {
-            "intent": "WHERE_IS",
-            "name": m.group(1)
-        }
+        name = extract_name(m.group(1))
+        if name:
+            return {
+                "intent": "WHERE_IS",
+                "name": name
+            }
+        return {"intent": "UNKNOWN"}
+
+    # -------------------------
+    # WHO IS INSIDE RIGHT NOW
+    # -------------------------
+    if attendance_only and {"who", "inside", "now"} <= words:
+        return {"intent": "WHO_INSIDE_NOW"}
 
     # -------------------------
     # WHO IS INSIDE / PRESENT
     # -------------------------
-    if "who" in t and ("present" in t or "inside" in t or "in" in t):
+    if attendance_only and "who" in words and words & {"present", "inside", "in"}:
         return {"intent": "WHO_PRESENT"}
 
     # -------------------------
     # WHO IS OUTSIDE / ABSENT
     # -------------------------
-    if "who" in t and ("absent" in t or "outside" in t or "out" in t):
+    if attendance_only and "who" in words and words & {"absent", "outside", "out"}:
         return {"intent": "WHO_ABSENT"}
 
+    # -------------------------
+    # MEETING SUMMARY (MoM)
+    # -------------------------
+    if "meeting" in words and words & {"summary", "minutes"}:
+        return {"intent": "MEETING_SUMMARY"}
+
     # -------------------------
     # SUMMARY
     # -------------------------
-    if "summary" in t:
+    if attendance_only and "summary" in words:
         return {"intent": "SUMMARY"}
 
     # -------------------------
     # TRAIT INFO
     # -------------------------
-    if "trait" in t or "trait center" in t or "about" in t and "trait" in t:
-        if "vision" in t:
+    if "trait" in words:
+        if "vision" in words:
             return {"intent": "TRAIT_INFO", "field": "vision"}
-        if "mission" in t:
+        if "mission" in words:
             return {"intent": "TRAIT_INFO", "field": "mission"}
-        if "location" in t:
+        if "location" in words:
             return {"intent": "TRAIT_INFO", "field": "location"}
-        if "contact" in t or "email" in t:
+        if words & {"contact", "email"}:
             return {"intent": "TRAIT_INFO", "field": "contact"}
         return {"intent": "TRAIT_INFO"}
 
     # -------------------------
     # GUEST WELCOME NOTE
     # -------------------------
-    if "guest" in t or "welcome" in t:
+    if words & {"guest", "welcome"}:
         name = extract_after_keyword(t, "guest") or extract_after_keyword(t, "for")
         if not name:
             name = extract_name(t)
@@ -85,8 +123,8 @@ def parse_command(text: str):
     # -------------------------
     # PROJECTS
     # -------------------------
-    if "project" in t or "projects" in t:
-        if "list" in t or "ongoing" in t or "show" in t or "what" in t:
+    if words & {"project", "projects"}:
+        if words & {"list", "ongoing", "show", "what"}:
             return {"intent": "PROJECTS_LIST"}
         title = extract_after_keyword(t, "project") or extract_name(t)
         if title:
@@ -99,7 +137,7 @@ def parse_command(text: str):
     #   "varshani present"
     #   "mark ravi present"
     # -------------------------
-    if "present" in t:
+    if "present" in words:
         name = extract_name(t)
         if name:
             return {
@@ -113,7 +151,7 @@ def parse_command(text: str):
     #   "varshani absent"
     #   "mark ravi absent"
     # -------------------------
-    if "absent" in t:
+    if "absent" in words:
         name = extract_name(t)
         if name:
             return {
@@ -121,6 +159,12 @@ def parse_command(text: str):
                 "name": name
             }
 
+    # -------------------------
+    # ATTENDANCE (general question)
+    # -------------------------
+    if attendance_only and "attendance" in words:
+        return {"intent": "SUMMARY"}
+
     # -------------------------
     # FALLBACK
     # -------------------------
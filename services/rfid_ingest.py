@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import List, NamedTuple, Optional
+
+from db.attendance import insert_events, lock_current_statuses, set_event_reason
+from db.database import connection
+from db.migrate import ensure_schema
+from db.rfid_cards import get_user_from_uid
+from rules.status_rules import INSIDE, OUTSIDE, apply_status
+from services.rfid_reader import TapResult
+from services.rfid_service import action_event
+
+# Group-commit tuning: a batch closes at MAX_BATCH taps or MAX_WAIT seconds
+# after its first tap, whichever comes first.
+RFID_MAX_BATCH = int(os.getenv("RFID_MAX_BATCH", "200"))
+RFID_MAX_WAIT = float(os.getenv("RFID_MAX_WAIT_MS", "20")) / 1000
+RFID_MAX_QUEUE = int(os.getenv("RFID_MAX_QUEUE", "10000"))
+
+
+class Tap(NamedTuple):
+    uid: str
+    action: str
+    reason: str
+    accepted_at: float
+    future: Future
+
+
+class RfidIngestor:
+    """
+    Queue in front of the RFID write path. ``submit`` returns immediately
+    with a Future for the TapResult (None for an unknown card); one worker
+    thread drains the queue in micro-batches and applies each batch in a
+    single transaction (one lock query, one multi-row insert, one commit).
+
+    Taps for the same student are applied in arrival order, using the same
+    transition rules as handle_rfid_event (rules.status_rules). The
+    "toggle" action flips the student's status as of their previous tap.
+    """
+
+    def __init__(self, max_batch=RFID_MAX_BATCH, max_wait=RFID_MAX_WAIT, max_queue=RFID_MAX_QUEUE):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._commit_latencies = deque(maxlen=1000)
+        self._counters = {"taps": 0, "batches": 0, "events_written": 0, "failed_batches": 0}
+        self._thread = threading.Thread(target=self._run, name="rfid-ingest", daemon=True)
+        self._thread.start()
+
+    def submit(self, uid: str, action: str, reason: str = "", block: bool = True) -> Future:
+        """
+        Accept a tap (``action`` is "in", "out" or "toggle"). Raises
+        queue.Full if the queue is full and ``block`` is False.
+        """
+        future = Future()
+        tap = Tap((uid or "").strip(), action, reason or "", time.monotonic(), future)
+        self._queue.put(tap, block=block)
+        return future
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after draining everything already queued."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    # -------------------------
+    # Worker
+    # -------------------------
+    def _next_batch(self) -> List[Tap]:
+        try:
+            first = self._queue.get(timeout=0.2)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                # After the deadline, still take whatever is already queued
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self._apply(batch)
+            except Exception as e:
+                print("RFID batch error:", e)
+                with self._lock:
+                    self._counters["failed_batches"] += 1
+                for tap in batch:
+                    if not tap.future.done():
+                        tap.future.set_exception(e)
+
+    def _apply(self, batch: List[Tap]) -> None:
+        ensure_schema()
+
+        resolved = []
+        for tap in batch:
+            user = get_user_from_uid(tap.uid)
+            if user:
+                resolved.append((tap, user))
+            else:
+                tap.future.set_result(None)
+
+        started = time.monotonic()
+        events = []
+        outcomes = []
+        with connection() as conn:
+            cur = conn.cursor()
+            statuses = lock_current_statuses(cur, (user["id"] for _, user in resolved))
+
+            for tap, user in resolved:
+                current = statuses.get(user["id"], OUTSIDE)
+                if tap.action == "toggle":
+                    event = "MARK_ABSENT" if current == INSIDE else "MARK_PRESENT"
+                else:
+                    event = action_event(tap.action)
+                new_status = apply_status(current, event)
+                if new_status is not None:
+                    statuses[user["id"]] = new_status
+                    events.append((user["id"], new_status, "RFID", tap.reason or None))
+                outcomes.append((tap, user, event, new_status is not None, new_status or current))
+
+            refs = iter(insert_events(cur, events))
+
+        commit_latency = time.monotonic() - started
+        with self._lock:
+            self._counters["taps"] += len(batch)
+            self._counters["batches"] += 1
+            self._counters["events_written"] += len(events)
+            self._commit_latencies.append(commit_latency)
+
+        for tap, user, event, recorded, status in outcomes:
+            # insert_events returns (id, timestamp) per written event, in order
+            ref = tuple(next(refs)) if recorded else None
+            tap.future.set_result(TapResult(user["name"], event, recorded, status, ref))
+
+    # -------------------------
+    # Monitoring
+    # -------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._commit_latencies)
+            stats = dict(self._counters)
+
+        stats["queue_depth"] = self._queue.qsize()
+        if latencies:
+            stats["commit_latency_avg_ms"] = sum(latencies) / len(latencies) * 1000
+            stats["commit_latency_p95_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            stats["commit_latency_max_ms"] = latencies[-1] * 1000
+        batches = stats["batches"]
+        stats["avg_batch_size"] = stats["taps"] / batches if batches else 0.0
+        return stats
+
+
+_ingestor = None
+_ingestor_lock = threading.Lock()
+
+
+def get_ingestor() -> RfidIngestor:
+    global _ingestor
+    if _ingestor is None:
+        with _ingestor_lock:
+            if _ingestor is None:
+                _ingestor = RfidIngestor()
+    return _ingestor
+
+
+def submit_rfid_event(uid: str, action: str, reason: str = "") -> Future:
+    """Queue a tap for batched processing; the Future resolves to a TapResult or None."""
+    return get_ingestor().submit(uid, action, reason)
+
+
+class IngestRecorder:
+    """
+    RfidReaderDaemon recorder that writes through the shared ingestion
+    queue, so taps from every reader in the process are group-committed.
+    tap() returns the Future at once; the daemon reads the next card while
+    the batch commits.
+    """
+
+    def tap(self, uid: str) -> Future:
+        return submit_rfid_event(uid, "toggle")
+
+    def set_reason(self, ref, reason: str) -> None:
+        event_id, timestamp = ref
+        set_event_reason(event_id, timestamp, reason)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        if _ingestor is not None:
+            _ingestor.stop(timeout)
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from db import current_status
+from db.attendance import record_transition, set_event_reason
+from db.rfid_cards import get_user_from_uid
+from rules.status_rules import INSIDE, target_status
+from services.rfid_service import result_message, unknown_card_message
+
+# Repeated reads of the same card within this many seconds of its previous
+# read are ignored (a held card is read continuously).
+RFID_DEBOUNCE_SECONDS = float(os.getenv("RFID_DEBOUNCE_SECONDS", "3"))
+
+SCAN_FAILED = "Sorry, that scan could not be recorded. Please try again."
+
+
+# -------------------------
+# Devices
+# -------------------------
+# A device is anything with read(timeout) -> Optional[str] (one UID per
+# card read, None when nothing arrived in time) and close().
+
+class LineDevice:
+    """
+    Reader that emits one UID per line on a text stream: keyboard-wedge
+    (HID) readers typing into stdin, or a FIFO/serial bridge file.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._lines = queue.Queue()
+        self._thread = threading.Thread(target=self._pump, name="rfid-line-device", daemon=True)
+        self._thread.start()
+
+    def _pump(self) -> None:
+        for line in self._stream:
+            self._lines.put(line.strip())
+        self._lines.put(None)  # EOF
+
+    def read(self, timeout: float = 1.0) -> Optional[str]:
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if line is None:
+            raise EOFError("RFID device stream closed")
+        return line
+
+    def close(self) -> None:
+        if self._stream is not sys.stdin:
+            self._stream.close()
+
+
+class SerialDevice:
+    """USB/UART reader sending one UID per line. Needs the optional pyserial package."""
+
+    def __init__(self, port: str, baudrate: int = 9600):
+        try:
+            import serial
+        except ImportError as e:
+            raise RuntimeError("Serial RFID readers need pyserial: pip install pyserial") from e
+        self._serial = serial.Serial(port, baudrate=baudrate, timeout=1.0)
+
+    def read(self, timeout: float = 1.0) -> Optional[str]:
+        self._serial.timeout = timeout
+        raw = self._serial.readline()
+        if not raw:
+            return None
+        return raw.decode("ascii", errors="ignore").strip() or None
+
+    def close(self) -> None:
+        self._serial.close()
+
+
+class FakeDevice:
+    """
+    In-process stand-in for a reader. Call tap(uid) (optionally several
+    times to mimic a held card); ``script`` replays UIDs with a fixed gap.
+    """
+
+    def __init__(self, script: Iterable[str] = (), interval: float = 0.5):
+        self._reads = queue.Queue()
+        self._closed = False
+        for i, uid in enumerate(script):
+            threading.Timer(i * interval, self.tap, args=(uid,)).start()
+
+    def tap(self, uid: str, repeats: int = 1) -> None:
+        for _ in range(repeats):
+            self._reads.put(uid)
+
+    def read(self, timeout: float = 1.0) -> Optional[str]:
+        if self._closed:
+            raise EOFError("fake device closed")
+        try:
+            return self._reads.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self._closed = True
+
+
+def open_device(spec: str):
+    """
+    Build a device from a spec string:
+      stdin                      keyboard-wedge reader / manual typing
+      file:/path/to/fifo         one UID per line from a file or FIFO
+      serial:/dev/ttyUSB0[@9600] serial reader (pyserial)
+      fake:UID1,UID1,UID2        replay UIDs, 0.5s apart
+    """
+    kind, _, arg = spec.partition(":")
+    if kind == "stdin":
+        return LineDevice(sys.stdin)
+    if kind == "file":
+        return LineDevice(open(arg, "r", encoding="utf-8"))
+    if kind == "serial":
+        port, _, baud = arg.partition("@")
+        return SerialDevice(port, int(baud or 9600))
+    if kind == "fake":
+        return FakeDevice([u for u in arg.split(",") if u])
+    raise ValueError(f"Unknown RFID device spec: {spec}")
+
+
+# -------------------------
+# Debouncing
+# -------------------------
+class Debouncer:
+    def __init__(self, window: float = RFID_DEBOUNCE_SECONDS, max_entries: int = 10000):
+        self.window = window
+        self.max_entries = max_entries
+        self._last_seen = {}
+
+    def accept(self, uid: str, now: Optional[float] = None) -> bool:
+        """
+        True if this read should be processed. Every read (accepted or not)
+        restarts the window, so a card held on the reader fires only once.
+        """
+        now = time.monotonic() if now is None else now
+        last = self._last_seen.get(uid)
+        self._last_seen[uid] = now
+
+        if len(self._last_seen) > self.max_entries:
+            cutoff = now - self.window
+            self._last_seen = {u: t for u, t in self._last_seen.items() if t >= cutoff}
+
+        return last is None or now - last >= self.window
+
+
+# -------------------------
+# Audio worker
+# -------------------------
+class ExitReason(NamedTuple):
+    name: str
+    save: Callable[[str], object]  # stores the captured reason on the event
+
+
+class AudioWorker:
+    """
+    Serializes everything that uses the speaker/microphone on one background
+    thread, so announcements and exit-reason questions never hold up the
+    next card read.
+    """
+
+    def __init__(self, speak: Callable[[str], None], listen: Optional[Callable[..., str]] = None,
+                 listen_seconds: int = 4):
+        self.speak = speak
+        self.listen = listen
+        self.listen_seconds = listen_seconds
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="rfid-audio", daemon=True)
+        self._thread.start()
+
+    def announce(self, text: str) -> None:
+        self._jobs.put(("say", text))
+
+    def capture_reason(self, exit_event: ExitReason) -> None:
+        self._jobs.put(("reason", exit_event))
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            kind, arg = job
+            try:
+                if kind == "say":
+                    self.speak(arg)
+                else:
+                    self._ask_reason(arg)
+            except Exception as e:
+                print("RFID audio error:", e)
+
+    def _ask_reason(self, exit_event: ExitReason) -> None:
+        self.speak(f"Why is {exit_event.name} going out?")
+        reason = (self.listen(seconds=self.listen_seconds) or "").strip()
+        exit_event.save(reason or "No reason given")
+        print(f"📝 Exit reason for {exit_event.name}: {reason or 'No reason given'}")
+
+
+# -------------------------
+# Recorders
+# -------------------------
+# A recorder turns an accepted card read into a stored event:
+# tap(uid) -> Optional[TapResult] (None for unknown cards), or a Future of
+# one for recorders that write in the background, and set_reason(ref,
+# reason) for the reason captured afterwards.
+
+class TapResult(NamedTuple):
+    name: str
+    event: str
+    recorded: bool
+    status: str
+    ref: object  # recorder-specific handle for set_reason
+
+
+class DirectRecorder:
+    """Toggles the student in/out straight in PostgreSQL."""
+
+    def tap(self, uid: str) -> Optional[TapResult]:
+        user = get_user_from_uid(uid)
+        if not user:
+            return None
+
+        status = current_status.get_current_status(user["id"])
+        event = "MARK_ABSENT" if status == INSIDE else "MARK_PRESENT"
+
+        result = record_transition(target_status(event), student_id=user["id"], activity_type="RFID")
+        if not result:
+            return None
+        return TapResult(user["name"], event, result.recorded, result.status,
+                         (result.event_id, result.timestamp))
+
+    def set_reason(self, ref, reason: str) -> None:
+        event_id, timestamp = ref
+        set_event_reason(event_id, timestamp, reason)
+
+
+# -------------------------
+# Daemon
+# -------------------------
+class RfidReaderDaemon:
+    """
+    Reads cards from ``device``, drops duplicate reads, toggles each
+    student in/out based on their current status and records the event
+    (through ``recorder``). Spoken feedback and exit reasons are handled by
+    the AudioWorker in the background; when the recorder returns a Future,
+    the next card is read while it resolves and the feedback follows.
+    """
+
+    def __init__(self, device, audio: AudioWorker, recorder=None,
+                 debounce_window: float = RFID_DEBOUNCE_SECONDS, capture_reasons: bool = True):
+        self.device = device
+        self.audio = audio
+        self.recorder = recorder or DirectRecorder()
+        self.debouncer = Debouncer(debounce_window)
+        self.capture_reasons = capture_reasons and audio.listen is not None
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def handle_read(self, uid: str) -> Optional[str]:
+        """
+        Process one raw read. Returns the result message, or None if
+        debounced or if the recorder answered with a Future (its message is
+        reported when the Future resolves).
+        """
+        uid = (uid or "").strip()
+        if not uid or not self.debouncer.accept(uid):
+            return None
+
+        result = self.recorder.tap(uid)
+        if isinstance(result, Future):
+            result.add_done_callback(lambda future: self._report(self._resolved(uid, future)))
+            return None
+        return self._feedback(uid, result)
+
+    def _resolved(self, uid: str, future: Future) -> str:
+        try:
+            return self._feedback(uid, future.result())
+        except Exception as e:
+            print("RFID error:", e)
+            return SCAN_FAILED
+
+    def _feedback(self, uid: str, result: Optional[TapResult]) -> str:
+        if not result:
+            return unknown_card_message(uid)
+
+        if result.recorded and result.event == "MARK_ABSENT" and self.capture_reasons:
+            ref = result.ref
+            self.audio.capture_reason(
+                ExitReason(result.name, lambda reason: self.recorder.set_reason(ref, reason))
+            )
+
+        return result_message(result.name, result.event, result.recorded, result.status)
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                uid = self.device.read(timeout=0.5)
+            except EOFError:
+                break
+            if uid is None:
+                continue
+            if uid.lower() == "exit":
+                break
+
+            try:
+                message = self.handle_read(uid)
+            except Exception as e:
+                print("RFID error:", e)
+                message = SCAN_FAILED
+            self._report(message)
+
+        self.device.close()
+
+    def _report(self, message: Optional[str]) -> None:
+        if message:
+            print("✅", message)
+            self.audio.announce(message)
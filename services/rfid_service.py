@@ -1,5 +1,26 @@
-from services.attendance_service import mark_present, mark_absent
+from db.attendance import record_transition
 from db.rfid_cards import get_user_from_uid
+from rules.status_rules import target_status, INSIDE
+
+
+def action_event(action: str) -> str:
+    return "MARK_PRESENT" if action.lower() == "in" else "MARK_ABSENT"
+
+
+def unknown_card_message(uid: str) -> str:
+    return f"Unknown RFID card: {uid}. Please register this UID."
+
+
+def result_message(name: str, event: str, recorded: bool, status: str) -> str:
+    if not recorded:
+        where = "inside" if status == INSIDE else "outside"
+        return f"{name} is already {where}."
+
+    if event == "MARK_PRESENT":
+        return f"{name} marked present."
+    else:
+        return f"{name} marked absent."
+
 
 def handle_rfid_event(uid: str, action: str, reason: str = ""):
     """
@@ -8,13 +29,17 @@ def handle_rfid_event(uid: str, action: str, reason: str = ""):
     user = get_user_from_uid(uid)
 
     if not user:
-        return f"Unknown RFID card: {uid}. Please register this UID."
+        return unknown_card_message(uid)
 
-    name = user["name"]
+    event = action_event(action)
+    result = record_transition(
+        target_status(event),
+        student_id=user["id"],
+        activity_type="RFID",
+        reason=reason or None,
+    )
 
-    if action.lower() == "in":
-        mark_present(name, activity_type="RFID", reason=reason or None)
-        return f"{name} marked present."
-    else:
-        mark_absent(name, activity_type="RFID", reason=reason or None)
-        return f"{name} marked absent."
+    if not result:
+        return unknown_card_message(uid)
+
+    return result_message(user["name"], event, result.recorded, result.status)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import os
+import re
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+
+# Streamed AI answers are cut into sentences for text-to-speech and into
+# a few larger parts for WhatsApp, as soon as each one is complete.
+WHATSAPP_STREAM_MIN_CHARS = int(os.getenv("WHATSAPP_STREAM_MIN_CHARS", "280"))
+WHATSAPP_MAX_CHARS = 4096  # Cloud API limit for a text body
+
+# End of a sentence: . ! ? (optionally closed by quotes/brackets) and then
+# whitespace, or a line break. "3.5" and "e.g.x" don't split; a known
+# abbreviation before the dot doesn't either.
+_BOUNDARY = re.compile(r"""(?<=[.!?…])["')\]]*\s+|\n+""")
+_ABBREVIATIONS = {"dr", "mr", "mrs", "ms", "prof", "st", "vs", "etc", "e.g", "i.e", "no", "approx"}
+
+
+def _is_abbreviation(text: str) -> bool:
+    words = text.rstrip(".").rsplit(None, 1)
+    return bool(words) and words[-1].lower() in _ABBREVIATIONS
+
+
+class SentenceChunker:
+    """
+    feed() text pieces as they arrive and get back the sentences they
+    complete; flush() returns whatever is left at the end of the stream.
+    Sentences shorter than ``min_chars`` are joined with the next one, so
+    "Yes." doesn't become its own TTS request. With ``keep_separators`` the
+    whitespace/line breaks after each sentence are kept (for WhatsApp).
+    """
+
+    def __init__(self, min_chars: int = 0, keep_separators: bool = False):
+        self.min_chars = min_chars
+        self.keep_separators = keep_separators
+        self._buffer = ""
+
+    def feed(self, piece: str) -> List[str]:
+        self._buffer += piece
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            candidate = self._buffer[start:match.start()].strip()
+            if not candidate or _is_abbreviation(candidate) or len(candidate) < self.min_chars:
+                continue
+            sentences.append(self._buffer[start:match.end()] if self.keep_separators else candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        rest, self._buffer = self._buffer, ""
+        if not rest.strip():
+            return None
+        return rest if self.keep_separators else rest.strip()
+
+
+def sentences(pieces: Iterable[str], min_chars: int = 0,
+              keep_separators: bool = False) -> Iterator[str]:
+    """Complete sentences from a stream of text pieces."""
+    chunker = SentenceChunker(min_chars, keep_separators)
+    for piece in pieces:
+        yield from chunker.feed(piece)
+    rest = chunker.flush()
+    if rest:
+        yield rest
+
+
+async def sentences_async(pieces: AsyncIterable[str], min_chars: int = 0,
+                          keep_separators: bool = False) -> AsyncIterator[str]:
+    chunker = SentenceChunker(min_chars, keep_separators)
+    async for piece in pieces:
+        for sentence in chunker.feed(piece):
+            yield sentence
+    rest = chunker.flush()
+    if rest:
+        yield rest
+
+
+def _split_long(text: str, limit: int) -> List[str]:
+    # A single "sentence" over the API limit (e.g. a huge list): cut at spaces
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind(" ", 0, limit)
+        cut = cut if cut > 0 else limit
+        parts.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    parts.append(text)
+    return parts
+
+
+class MessageBatcher:
+    """
+    Groups sentences into WhatsApp-sized messages: a message is released
+    once it holds at least ``min_chars``, and never exceeds ``max_chars``.
+    """
+
+    def __init__(self, min_chars: int = WHATSAPP_STREAM_MIN_CHARS,
+                 max_chars: int = WHATSAPP_MAX_CHARS):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._sentences: List[str] = []
+        self._length = 0
+
+    def add(self, sentence: str) -> List[str]:
+        """``sentence`` includes its trailing separator (sentences(keep_separators=True))."""
+        ready = []
+        if self._sentences and self._length + len(sentence.rstrip()) > self.max_chars:
+            ready.extend(self.flush())
+        self._sentences.append(sentence)
+        self._length += len(sentence)
+        if self._length >= self.min_chars:
+            ready.extend(self.flush())
+        return ready
+
+    def flush(self) -> List[str]:
+        text = "".join(self._sentences).strip()
+        self._sentences, self._length = [], 0
+        if not text:
+            return []
+        return _split_long(text, self.max_chars)
+
+
+def message_parts(pieces: Iterable[str], min_chars: int = WHATSAPP_STREAM_MIN_CHARS,
+                  max_chars: int = WHATSAPP_MAX_CHARS) -> Iterator[str]:
+    """WhatsApp messages from a stream of text pieces, each sent as soon as it is full."""
+    batcher = MessageBatcher(min_chars, max_chars)
+    for sentence in sentences(pieces, keep_separators=True):
+        yield from batcher.add(sentence)
+    yield from batcher.flush()
+
+
+async def message_parts_async(pieces: AsyncIterable[str], min_chars: int = WHATSAPP_STREAM_MIN_CHARS,
+                              max_chars: int = WHATSAPP_MAX_CHARS) -> AsyncIterator[str]:
+    batcher = MessageBatcher(min_chars, max_chars)
+    async for sentence in sentences_async(pieces, keep_separators=True):
+        for part in batcher.add(sentence):
+            yield part
+    for part in batcher.flush():
+        yield part
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Iterable, List, NamedTuple, Optional
+
+from db.cache import TTLCache
+from db.database import UNAVAILABLE_ERRORS
+from db.processed_messages import claim_message_ids, purge_processed_messages
+
+# Meta redelivers a webhook until it gets a 200, for up to a few days, and
+# may batch several messages into one delivery.
+WEBHOOK_DEDUPE_TTL = float(os.getenv("WEBHOOK_DEDUPE_TTL", str(3 * 24 * 3600)))
+WEBHOOK_DEDUPE_SIZE = int(os.getenv("WEBHOOK_DEDUPE_SIZE", "50000"))
+# Also record ids in PostgreSQL (processed_messages) so restarts and other
+# app processes see them
+WEBHOOK_DEDUPE_DB = os.getenv("WEBHOOK_DEDUPE_DB", "0") not in ("0", "false", "False", "")
+
+
+class IncomingMessage(NamedTuple):
+    id: str
+    sender: str
+    type: str
+    text: Optional[str]
+    timestamp: Optional[str]
+
+
+def extract_messages(payload: dict) -> List[IncomingMessage]:
+    """Every message in a delivery, across all entries and changes, in order."""
+    messages = []
+    for entry in payload.get("entry") or ():
+        for change in entry.get("changes") or ():
+            value = change.get("value") or {}
+            # statuses (sent/delivered/read) arrive in the same shape without "messages"
+            for message in value.get("messages") or ():
+                message_type = message.get("type") or ("text" if "text" in message else "unknown")
+                messages.append(IncomingMessage(
+                    id=message.get("id") or "",
+                    sender=message.get("from") or "",
+                    type=message_type,
+                    text=(message.get("text") or {}).get("body"),
+                    timestamp=message.get("timestamp"),
+                ))
+    return messages
+
+
+def persisted_ids(messages: Iterable[IncomingMessage]) -> List[str]:
+    return [m.id for m in messages if m.id]
+
+
+class MessageDeduper:
+    """
+    Remembers handled message ids for ``ttl`` seconds (bounded LRU in
+    memory, optionally also in PostgreSQL) and filters repeats out of each
+    delivery. Messages without an id are never treated as duplicates.
+    """
+
+    def __init__(self, ttl: float = WEBHOOK_DEDUPE_TTL, max_entries: int = WEBHOOK_DEDUPE_SIZE,
+                 persist: bool = WEBHOOK_DEDUPE_DB, purge_interval: float = 3600.0):
+        self.ttl = ttl
+        self.persist = persist
+        self.purge_interval = purge_interval
+        self._seen = TTLCache(max_entries, ttl)
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+        self._counters = {
+            "deliveries": 0,
+            "messages": 0,
+            "duplicates_dropped": 0,
+            "max_messages_per_delivery": 0,
+            "db_errors": 0,
+        }
+
+    def filter_new(self, messages: Iterable[IncomingMessage]) -> List[IncomingMessage]:
+        messages = list(messages)
+        fresh = self.filter_memory(messages)
+
+        if self.persist and fresh:
+            try:
+                fresh = self.filter_claimed(fresh, claim_message_ids(persisted_ids(fresh)))
+                if self.purge_due():
+                    purge_processed_messages(self.ttl)
+            except UNAVAILABLE_ERRORS as e:
+                self.database_unavailable(e)
+
+        self.record(messages, fresh)
+        return fresh
+
+    # Building blocks, also used by the async server with its own DB calls
+
+    def filter_memory(self, messages: List[IncomingMessage]) -> List[IncomingMessage]:
+        return [m for m in messages if not m.id or self._seen.add(m.id)]
+
+    @staticmethod
+    def filter_claimed(messages: List[IncomingMessage], claimed: Iterable[str]) -> List[IncomingMessage]:
+        claimed = set(claimed)
+        return [m for m in messages if not m.id or m.id in claimed]
+
+    def purge_due(self) -> bool:
+        with self._lock:
+            if time.monotonic() < self._next_purge:
+                return False
+            self._next_purge = time.monotonic() + self.purge_interval
+            return True
+
+    def database_unavailable(self, error: Exception) -> None:
+        # Better to risk a duplicate reply than to drop messages
+        with self._lock:
+            self._counters["db_errors"] += 1
+        print("Webhook dedupe: database unavailable, using memory only:", error)
+
+    def record(self, messages: List[IncomingMessage], fresh: List[IncomingMessage]) -> None:
+        with self._lock:
+            c = self._counters
+            c["deliveries"] += 1
+            c["messages"] += len(messages)
+            c["duplicates_dropped"] += len(messages) - len(fresh)
+            c["max_messages_per_delivery"] = max(c["max_messages_per_delivery"], len(messages))
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+        deliveries = stats["deliveries"]
+        stats["messages_per_delivery"] = stats["messages"] / deliveries if deliveries else 0.0
+        stats["persisted"] = self.persist
+        stats["remembered_ids"] = len(self._seen)
+        return stats
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+# Webhook requests are acknowledged as soon as the payload is queued; a small
+# pool of threads does the slow part (AI reply, Graph API send).
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "4"))
+WEBHOOK_MAX_QUEUE = int(os.getenv("WEBHOOK_MAX_QUEUE", "200"))
+
+
+class WebhookWorkerPool:
+    """
+    Bounded queue plus worker threads calling ``handler(payload)``.
+
+    submit() never blocks: when the queue is full it returns False and the
+    webhook answers 503, so Meta redelivers later instead of us buffering
+    without limit. stop() stops accepting and drains what is queued.
+    """
+
+    def __init__(self, handler: Callable[[dict], None], workers: int = WEBHOOK_WORKERS,
+                 max_queue: int = WEBHOOK_MAX_QUEUE):
+        self.handler = handler
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._accepting = True
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._counters = {"accepted": 0, "rejected": 0, "processed": 0, "failed": 0}
+        self._threads = [
+            threading.Thread(target=self._run, name=f"webhook-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, payload: dict) -> bool:
+        if not self._accepting:
+            self._count("rejected")
+            return False
+        try:
+            self._queue.put_nowait((time.monotonic(), payload))
+        except queue.Full:
+            self._count("rejected")
+            return False
+        self._count("accepted")
+        return True
+
+    def stop(self, timeout: Optional[float] = 30.0) -> bool:
+        """Stop accepting, finish queued payloads. Returns False if ``timeout`` ran out first."""
+        self._accepting = False
+        self._stopping.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for _ in self._threads:
+            # one sentinel per worker, queued behind the remaining payloads;
+            # with a full queue, workers exit once it runs empty instead
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for t in self._threads:
+            t.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(t.is_alive() for t in self._threads)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] += 1
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            if item is None:
+                return
+            queued_at, payload = item
+            try:
+                self.handler(payload)
+                self._count("processed")
+            except Exception as e:
+                self._count("failed")
+                print("Webhook worker error:", e)
+            with self._lock:
+                self._latencies.append(time.monotonic() - queued_at)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = dict(self._counters)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        return {
+            **counters,
+            "queue_depth": self._queue.qsize(),
+            "workers": len(self._threads),
+            "accepting": self._accepting,
+            "latency_avg_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p95_ms": 1000 * p95,
+        }
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from db import outbox
+from db.database import UNAVAILABLE_ERRORS
+
+WHATSAPP_TOKEN = os.getenv("WHATSAPP_TOKEN")
+PHONE_NUMBER_ID = os.getenv("PHONE_NUMBER_ID")
+# Point at scripts/fake_graph_api.py (e.g. http://localhost:5001/v24.0) for local testing
+GRAPH_API_BASE = os.getenv("GRAPH_API_BASE", "https://graph.facebook.com/v24.0").rstrip("/")
+GRAPH_API_TIMEOUT = float(os.getenv("GRAPH_API_TIMEOUT", "10"))
+
+# Outbound tuning
+SEND_RATE = float(os.getenv("WHATSAPP_SEND_RATE", "20"))  # messages per second
+SEND_BURST = int(os.getenv("WHATSAPP_SEND_BURST", "20"))
+SEND_WORKERS = int(os.getenv("WHATSAPP_SEND_WORKERS", "2"))
+SEND_MAX_ATTEMPTS = int(os.getenv("WHATSAPP_SEND_MAX_ATTEMPTS", "6"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take one token if available and return 0, else return seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+
+class GraphClient:
+    """Keep-alive HTTP session for the WhatsApp Cloud API messages endpoint."""
+
+    def __init__(self, base_url: str = GRAPH_API_BASE, token: Optional[str] = WHATSAPP_TOKEN,
+                 phone_number_id: Optional[str] = PHONE_NUMBER_ID, timeout: float = GRAPH_API_TIMEOUT,
+                 pool_size: int = SEND_WORKERS):
+        self.url = f"{base_url.rstrip('/')}/{phone_number_id}/messages"
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        })
+        # retries are handled by OutboundSender, per message
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1), max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def send_text(self, to: str, text: str) -> requests.Response:
+        payload = {
+            "messaging_product": "whatsapp",
+            "to": to,
+            "text": {"body": text},
+        }
+        return self.session.post(self.url, json=payload, timeout=self.timeout)
+
+
+# Response helpers below work for both requests and httpx responses
+
+def retry_after_seconds(response) -> Optional[float]:
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+def retry_delay(attempts: int, response, min_backoff: float, max_backoff: float) -> float:
+    """Seconds before the next attempt: jittered exponential backoff, at least Retry-After."""
+    backoff = min(max_backoff, min_backoff * 2 ** (attempts - 1))
+    return max(retry_after_seconds(response) or 0.0, backoff * random.uniform(0.5, 1.0))
+
+
+def provider_message_id(response) -> Optional[str]:
+    try:
+        messages = response.json().get("messages") or []
+    except ValueError:
+        return None
+    return messages[0].get("id") if messages else None
+
+
+class OutboundSender:
+    """
+    Durable, rate-limited reply queue. send() writes the reply to the outbox
+    table and returns; worker threads claim due rows, send them through one
+    pooled session under a shared token bucket, and retry 429/5xx/network
+    failures with jittered exponential backoff (honouring Retry-After).
+    """
+
+    def __init__(self, client: Optional[GraphClient] = None, workers: int = SEND_WORKERS,
+                 rate: float = SEND_RATE, burst: int = SEND_BURST, max_attempts: int = SEND_MAX_ATTEMPTS,
+                 batch_size: int = 10, idle_poll: float = 2.0, stale_after: float = 120.0,
+                 min_backoff: float = 1.0, max_backoff: float = 300.0):
+        self.client = client or GraphClient(pool_size=workers)
+        self.bucket = TokenBucket(rate, burst)
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.idle_poll = idle_poll
+        self.stale_after = stale_after
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._delivery = deque(maxlen=1000)  # enqueue -> delivered
+        self._request = deque(maxlen=1000)   # one HTTP call
+        self._counters = {"queued": 0, "sent": 0, "retried": 0, "failed": 0, "direct": 0, "rate_limited_wait_s": 0.0}
+        self._threads = [
+            threading.Thread(target=self._run, name=f"whatsapp-sender-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def send(self, to: str, text: str) -> None:
+        try:
+            outbox.enqueue_message(to, text)
+        except UNAVAILABLE_ERRORS as e:
+            # No outbox without the database: still try to answer, once
+            print("Outbox unavailable, sending directly:", e)
+            self._count("direct")
+            self._send_direct(to, text)
+            return
+        self._count("queued")
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """Finish in-flight sends; anything still queued stays in the outbox."""
+        self._stop.set()
+        self._wake.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for t in self._threads:
+            t.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def _count(self, key: str, amount=1) -> None:
+        with self._lock:
+            self._counters[key] += amount
+
+    def _send_direct(self, to: str, text: str) -> None:
+        self._count("rate_limited_wait_s", self.bucket.acquire())
+        try:
+            response = self.client.send_text(to, text)
+            print("SEND STATUS:", response.status_code, response.text)
+        except requests.RequestException as e:
+            print("SEND ERROR:", e)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                batch = outbox.claim_messages(self.batch_size, self.stale_after)
+            except UNAVAILABLE_ERRORS as e:
+                print("Outbox unavailable:", e)
+                batch = []
+            except Exception as e:
+                print("Outbox claim error:", e)
+                batch = []
+
+            for message in batch:
+                if self._stop.is_set():
+                    # give the rest back right away instead of waiting for stale_after
+                    outbox.mark_retry(message.id, 0, "sender stopped")
+                    continue
+                try:
+                    self._deliver(message)
+                except Exception as e:
+                    # left in SENDING; claimed again after stale_after
+                    print(f"Outbox error (outbox {message.id}):", e)
+
+            if len(batch) < self.batch_size:
+                self._wake.wait(self.idle_poll)
+                self._wake.clear()
+
+    def _deliver(self, message: outbox.OutboxMessage) -> None:
+        self._count("rate_limited_wait_s", self.bucket.acquire())
+
+        response = None
+        started = time.monotonic()
+        try:
+            response = self.client.send_text(message.recipient, message.body)
+            error = None if response.ok else f"HTTP {response.status_code}: {response.text[:200]}"
+            retryable = response.status_code in RETRY_STATUSES
+        except requests.RequestException as e:
+            error = str(e)
+            retryable = True
+        with self._lock:
+            self._request.append(time.monotonic() - started)
+
+        if error is None:
+            delivered_in = outbox.mark_sent(message.id, provider_message_id(response))
+            with self._lock:
+                self._counters["sent"] += 1
+                if delivered_in is not None:
+                    self._delivery.append(delivered_in)
+            return
+
+        if retryable and message.attempts < self.max_attempts:
+            delay = retry_delay(message.attempts, response, self.min_backoff, self.max_backoff)
+            outbox.mark_retry(message.id, delay, error)
+            self._count("retried")
+        else:
+            outbox.mark_failed(message.id, error)
+            self._count("failed")
+            print(f"SEND FAILED (outbox {message.id}):", error)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            delivery = sorted(self._delivery)
+            request = sorted(self._request)
+
+        def pct(values, p):
+            return 1000 * values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+        try:
+            counters["outbox"] = outbox.outbox_counts()
+        except UNAVAILABLE_ERRORS:
+            counters["outbox"] = None
+        counters.update({
+            "delivery_p50_ms": pct(delivery, 0.5),
+            "delivery_p95_ms": pct(delivery, 0.95),
+            "request_p50_ms": pct(request, 0.5),
+            "request_p95_ms": pct(request, 0.95),
+        })
+        return counters
+
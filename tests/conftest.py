@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Allow `python -m pytest` from anywhere: modules import as db.*, services.*
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
@@ -0,0 +1,149 @@
+import time
+
+import pytest
+from google.genai import errors
+
+from services import ai_service
+from services.ai_service import AIUnavailable, CircuitBreaker, GeminiClient
+
+
+# -------------------------
+# CircuitBreaker
+# -------------------------
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failures=3, cooldown=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.times_opened == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failures=2, cooldown=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_one_probe_after_cooldown():
+    breaker = CircuitBreaker(failures=1, cooldown=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()  # the probe
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # everyone else waits for its outcome
+
+
+def test_probe_success_closes_and_failure_reopens():
+    breaker = CircuitBreaker(failures=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.times_opened == 2
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_released_probe_lets_another_through():
+    breaker = CircuitBreaker(failures=1, cooldown=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+# -------------------------
+# GeminiClient against a stub model client
+# -------------------------
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModels:
+    """genai-like .models that raises the queued errors, then answers."""
+
+    def __init__(self, errors_to_raise=()):
+        self.errors = list(errors_to_raise)
+        self.calls = 0
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return _Response(f"answer: {contents}")
+
+
+class StubClient:
+    def __init__(self, models):
+        self.models = models
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    def install(errors_to_raise=()):
+        models = StubModels(errors_to_raise)
+        monkeypatch.setattr(ai_service, "_client", StubClient(models))
+        monkeypatch.setattr(ai_service, "backoff_delay", lambda attempts: 0.0)
+        return models
+    return install
+
+
+def _server_error():
+    return errors.ServerError(503, {"error": {"message": "unavailable"}})
+
+
+def _client_error():
+    return errors.ClientError(400, {"error": {"message": "blocked"}})
+
+
+def test_retries_transient_errors(stub):
+    models = stub([_server_error(), _server_error()])
+    client = GeminiClient(breaker=CircuitBreaker(failures=5))
+    assert client.generate("hi") == "answer: hi"
+    assert models.calls == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_gives_up_after_max_attempts(stub):
+    models = stub([_server_error()] * ai_service.GEMINI_MAX_ATTEMPTS)
+    client = GeminiClient(breaker=CircuitBreaker(failures=5))
+    with pytest.raises(AIUnavailable) as raised:
+        client.generate("hi")
+    assert raised.value.reason == "http_503"
+    assert models.calls == ai_service.GEMINI_MAX_ATTEMPTS
+
+
+def test_client_errors_are_not_retried_and_keep_breaker_closed(stub):
+    models = stub([_client_error()])
+    breaker = CircuitBreaker(failures=1)
+    client = GeminiClient(breaker=breaker)
+    with pytest.raises(AIUnavailable):
+        client.generate("hi")
+    assert models.calls == 1
+    assert breaker.state == "closed"
+
+
+def test_open_breaker_rejects_without_calling(stub):
+    models = stub()
+    breaker = CircuitBreaker(failures=1, cooldown=60)
+    breaker.record_failure()
+    client = GeminiClient(breaker=breaker)
+    with pytest.raises(AIUnavailable) as raised:
+        client.generate("hi")
+    assert raised.value.reason == "circuit_open"
+    assert models.calls == 0
+    assert client.stats()["rejected"] == 1
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.llm_cache import LLMCache, normalize_prompt
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  What is  TRAIT?? ") == normalize_prompt("what is trait")
+
+
+def test_hit_after_first_call():
+    cache = LLMCache("model")
+    calls = []
+
+    def generate(prompt):
+        calls.append(prompt)
+        return f"answer to {prompt}"
+
+    assert cache.get_or_generate("What is TRAIT?", generate) == "answer to What is TRAIT?"
+    assert cache.get_or_generate("what is trait", generate) == "answer to What is TRAIT?"
+    assert len(calls) == 1
+
+
+def test_concurrent_misses_share_one_upstream_call():
+    cache = LLMCache("model")
+    release = threading.Event()
+    calls = []
+
+    def generate(prompt):
+        calls.append(prompt)
+        release.wait(5)
+        return "answer"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get_or_generate, "same question", generate) for _ in range(8)]
+        # let every caller reach the flight before the leader returns
+        deadline = time.monotonic() + 5
+        while cache.coalesced < 7 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [f.result(5) for f in futures]
+
+    assert results == ["answer"] * 8
+    assert len(calls) == 1
+    assert cache.stats()["upstream_calls"] == 1
+    assert cache.coalesced == 7
+
+
+def test_errors_reach_waiters_and_are_not_cached():
+    cache = LLMCache("model")
+
+    def fail(prompt):
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_generate("q", fail)
+    assert cache.lookup("q") is None
+    assert cache.get_or_generate("q", lambda p: "ok") == "ok"
+    assert cache.stats()["upstream_errors"] == 1
+
+
+def test_empty_answers_are_not_cached():
+    cache = LLMCache("model")
+    cache.get_or_generate("q", lambda p: "")
+    assert cache.lookup("q") is None
+
+
+def test_async_callers_on_one_loop_share_one_call():
+    cache = LLMCache("model")
+    calls = []
+
+    async def generate(prompt):
+        calls.append(prompt)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_generate_async("q", generate) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["answer"] * 5
+    assert len(calls) == 1
+    assert cache.coalesced == 4
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "llm_cache.json")
+    cache = LLMCache("model", path=path)
+    cache.get_or_generate("q", lambda p: "answer")
+    cache.save()
+
+    restored = LLMCache("model", path=path)
+    assert restored.lookup("Q?") == "answer"
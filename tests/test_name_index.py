@@ -0,0 +1,63 @@
+import pytest
+
+from services.name_index import NameIndex, soundex
+
+NAMES = ["ram kumar", "theodore smith", "alice", "ravindra kumar", "bob b", "varshani"]
+
+
+@pytest.fixture(params=[1000, 1], ids=["linear", "blocked"])
+def index(request):
+    # linear_scan_below=1 forces the blocked (token/phonetic/trigram) path
+    return NameIndex(NAMES, linear_scan_below=request.param)
+
+
+def test_soundex():
+    assert soundex("Robert") == "R163"
+    assert soundex("Rupert") == "R163"
+    assert soundex("Ashcraft") == "A261"
+    assert soundex("123") == ""
+
+
+def test_exact_and_misheard_names_match(index):
+    assert index.match("alice").name == "alice"
+    assert index.match("alce").name == "alice"
+    assert index.match("varshini").name == "varshani"
+    assert index.match("ram kumr").name == "ram kumar"
+
+
+def test_first_name_matches_full_name(index):
+    match = index.match("ravi")
+    assert match.name == "ravindra kumar"
+    assert match.score >= 80
+
+
+@pytest.mark.parametrize("query", ["", "a", "the", "ram", "xyz"])
+def test_short_queries_do_not_match_longer_names(index, query):
+    # WRatio's partial matching would score "the"/"ram" at 90 against
+    # "theodore smith"/"ram kumar"; short queries use a whole-name ratio
+    assert index.match(query).name is None
+
+
+def test_short_query_matches_identical_name():
+    index = NameIndex(NAMES + ["ram"])
+    assert index.match("ram").name == "ram"
+
+
+def test_below_threshold_returns_candidates_without_name(index):
+    match = index.match("jonathan", threshold=80)
+    assert match.name is None
+    assert match.score < 80
+
+
+def test_close_runner_up_is_ambiguous():
+    index = NameIndex(["priya ravi", "priya rani"])
+    match = index.match("priya ra", threshold=70)
+    assert match.name in ("priya ravi", "priya rani")
+    assert match.ambiguous
+
+
+def test_search_limit_and_order(index):
+    results = index.search("kumar", limit=2)
+    assert len(results) == 2
+    assert results[0].score >= results[1].score
+    assert {r.name for r in results} == {"ram kumar", "ravindra kumar"}
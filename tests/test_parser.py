@@ -0,0 +1,85 @@
+import pytest
+
+from services import intent_engine
+from services.name_index import NameIndex
+from services.parser import extract_name, parse_command
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("who is inside", {"intent": "WHO_PRESENT"}),
+    ("Who is present today?", {"intent": "WHO_PRESENT"}),
+    ("who is inside right now", {"intent": "WHO_INSIDE_NOW"}),
+    ("who is absent", {"intent": "WHO_ABSENT"}),
+    ("who is outside the lab", {"intent": "WHO_ABSENT"}),
+    ("summary", {"intent": "SUMMARY"}),
+    ("give me today's summary", {"intent": "SUMMARY"}),
+    ("attendance summary", {"intent": "SUMMARY"}),
+    ("meeting summary", {"intent": "MEETING_SUMMARY"}),
+    ("where is ravi", {"intent": "WHERE_IS", "name": "ravi"}),
+    ("where is ravi kumar now", {"intent": "WHERE_IS", "name": "ravi kumar"}),
+    ("varshani present", {"intent": "MARK_PRESENT", "name": "varshani"}),
+    ("mark ravi absent", {"intent": "MARK_ABSENT", "name": "ravi"}),
+    ("tell me about trait vision", {"intent": "TRAIT_INFO", "field": "vision"}),
+    ("trait contact", {"intent": "TRAIT_INFO", "field": "contact"}),
+    ("show ongoing projects", {"intent": "PROJECTS_LIST"}),
+    ("project drone", {"intent": "PROJECT_DETAILS", "title": "drone"}),
+])
+def test_attendance_and_info_commands(text, expected):
+    assert parse_command(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Who is the best cricketer in the world?",
+    "who is out of stock",
+    "summary of the french revolution",
+    "who invented python",
+    "who is the president of India",
+    "where is it",
+    "mark a present",
+])
+def test_general_questions_are_unknown(text):
+    # left for the LLM instead of answered from attendance
+    assert parse_command(text) == {"intent": "UNKNOWN"}
+
+
+def test_where_is_skips_stopwords():
+    assert parse_command("where is the library") == {"intent": "WHERE_IS", "name": "library"}
+
+
+def test_keywords_match_whole_words_only():
+    # "in" inside "invented", "present" inside "president"
+    assert parse_command("who invented the president")["intent"] == "UNKNOWN"
+
+
+def test_extract_name_rejects_short_names():
+    assert extract_name("mark al present") is None
+    assert extract_name("mark ravi present") == "ravi"
+
+
+# -------------------------
+# Routing on an LLM-fallback channel
+# -------------------------
+@pytest.fixture
+def whatsapp(monkeypatch):
+    index = NameIndex(["ravi kumar", "theodore smith"])
+    monkeypatch.setattr(intent_engine, "resolve_name", lambda name: index.match(name))
+    monkeypatch.setattr(intent_engine, "where_is", lambda name: f"{name} is inside.")
+    return intent_engine.IntentEngine("whatsapp", allow_writes=False, llm_fallback=True)
+
+
+@pytest.mark.parametrize("text", [
+    "What is the present value of an annuity?",
+    "where is the library",
+    "where is the",
+])
+def test_unresolved_names_go_to_the_llm(whatsapp, text):
+    assert whatsapp.answer_local(parse_command(text)) is None
+
+
+def test_known_student_is_answered_locally(whatsapp):
+    assert whatsapp.answer_local(parse_command("where is ravi kumar")) == "ravi kumar is inside."
+
+
+def test_writes_refused_only_for_known_students(whatsapp):
+    reply = whatsapp.answer_local(parse_command("ravi kumar present"))
+    assert reply == intent_engine.WRITES_NOT_ALLOWED
@@ -0,0 +1,40 @@
+from services.rfid_reader import Debouncer
+
+
+def test_first_read_is_accepted():
+    assert Debouncer(window=3).accept("A", now=100.0)
+
+
+def test_repeat_within_window_is_dropped():
+    debouncer = Debouncer(window=3)
+    assert debouncer.accept("A", now=100.0)
+    assert not debouncer.accept("A", now=102.9)
+
+
+def test_read_after_window_is_accepted():
+    debouncer = Debouncer(window=3)
+    assert debouncer.accept("A", now=100.0)
+    assert debouncer.accept("A", now=103.0)
+
+
+def test_held_card_fires_once():
+    # every read restarts the window, so a card left on the reader never re-fires
+    debouncer = Debouncer(window=3)
+    accepted = [debouncer.accept("A", now=100.0 + i) for i in range(10)]
+    assert accepted == [True] + [False] * 9
+
+
+def test_cards_are_debounced_independently():
+    debouncer = Debouncer(window=3)
+    assert debouncer.accept("A", now=100.0)
+    assert debouncer.accept("B", now=100.5)
+    assert not debouncer.accept("A", now=101.0)
+
+
+def test_old_entries_are_pruned():
+    debouncer = Debouncer(window=3, max_entries=10)
+    for i in range(20):
+        debouncer.accept(f"card-{i}", now=float(i * 10))
+    assert len(debouncer._last_seen) <= 10
+    # a pruned card is treated as new
+    assert debouncer.accept("card-0", now=1000.0)
@@ -0,0 +1,80 @@
+import asyncio
+
+from services.text_chunker import (
+    MessageBatcher,
+    SentenceChunker,
+    message_parts,
+    message_parts_async,
+    sentences,
+)
+
+
+def test_sentences_across_pieces():
+    pieces = ["Hello the", "re. How are", " you? Fine", "!"]
+    assert list(sentences(pieces)) == ["Hello there.", "How are you?", "Fine!"]
+
+
+def test_decimals_and_abbreviations_do_not_split():
+    text = "Version 3.5 is out. Ask Dr. Rao about it, e.g. tomorrow. Done."
+    assert list(sentences([text])) == ["Version 3.5 is out.", "Ask Dr. Rao about it, e.g. tomorrow.", "Done."]
+
+
+def test_line_breaks_split():
+    assert list(sentences(["one\ntwo\n\nthree"])) == ["one", "two", "three"]
+
+
+def test_short_sentences_join_the_next_one():
+    chunker = SentenceChunker(min_chars=10)
+    assert chunker.feed("Yes. That is right. ") == ["Yes. That is right."]
+
+
+def test_feed_keeps_incomplete_tail_until_flush():
+    chunker = SentenceChunker()
+    assert chunker.feed("First. Second") == ["First."]
+    assert chunker.flush() == "Second"
+    assert chunker.flush() is None
+
+
+def test_keep_separators():
+    assert list(sentences(["A b.\nC d. E"], keep_separators=True)) == ["A b.\n", "C d. ", "E"]
+
+
+def test_batcher_releases_at_min_chars():
+    batcher = MessageBatcher(min_chars=20, max_chars=100)
+    assert batcher.add("Short one. ") == []
+    assert batcher.add("Another sentence. ") == ["Short one. Another sentence."]
+    assert batcher.flush() == []
+
+
+def test_batcher_never_exceeds_max_chars():
+    batcher = MessageBatcher(min_chars=1000, max_chars=30)
+    ready = batcher.add("Twenty chars long.. ") + batcher.add("Another twenty here. ")
+    assert ready == ["Twenty chars long.."]
+    assert batcher.flush() == ["Another twenty here."]
+
+
+def test_oversized_sentence_is_cut_at_spaces():
+    parts = MessageBatcher(min_chars=1, max_chars=10).add("aaaa bbbb cccc dddd")
+    assert parts == ["aaaa bbbb", "cccc dddd"]
+    assert all(len(p) <= 10 for p in parts)
+
+
+def test_message_parts_keeps_all_text():
+    text = "One sentence here. " * 30
+    parts = list(message_parts([text[i:i + 7] for i in range(0, len(text), 7)], min_chars=100, max_chars=200))
+    assert len(parts) > 1
+    assert all(len(p) <= 200 for p in parts)
+    assert " ".join(parts).split() == text.split()
+
+
+def test_message_parts_async_matches_sync():
+    pieces = ["First part. ", "Second part is longer. ", "Third."]
+
+    async def stream():
+        for piece in pieces:
+            yield piece
+
+    async def collect():
+        return [part async for part in message_parts_async(stream(), min_chars=15)]
+
+    assert asyncio.run(collect()) == list(message_parts(pieces, min_chars=15))
@@ -1,12 +1,15 @@
-import requests
 import os
+import queue
+import threading
+import time
+
+import requests
 
 # 🔑 Add your Sarvam API Key here
 SARVAM_API_KEY = "sk_gvxrfi85_xJ13r6NhY039asvqx2pOlpYd"
 
-def speak(text):
-    print("🗣️ TRAIT Buddy:", text)
-
+def synthesize(text):
+    """MP3 bytes for ``text`` from Sarvam, or None on failure."""
     url = "https://api.sarvam.ai/text-to-speech"
 
     headers = {
@@ -24,13 +27,59 @@ def speak(text):
         response = requests.post(url, headers=headers, json=data)
 
         if response.status_code == 200:
-            with open("output.mp3", "wb") as f:
-                f.write(response.content)
+            return response.content
 
-            os.system("mpg123 output.mp3")
-
-        else:
-            print("❌ Sarvam error:", response.text)
+        print("❌ Sarvam error:", response.text)
 
     except Exception as e:
-        print(f"❌ Speech error: {e}")
\ No newline at end of file
+        print(f"❌ Speech error: {e}")
+
+    return None
+
+
+def play(audio, path="output.mp3"):
+    with open(path, "wb") as f:
+        f.write(audio)
+
+    os.system(f"mpg123 {path}")
+
+
+def speak(text):
+    print("🗣️ TRAIT Buddy:", text)
+
+    audio = synthesize(text)
+    if audio:
+        play(audio)
+
+
+def speak_stream(chunks, synthesize=synthesize, play=play):
+    """
+    Speak text chunks (e.g. sentences of a streamed AI answer) as they
+    arrive: while one chunk plays, the next is already being synthesized.
+    Returns seconds until the first audio started playing (None if silent).
+    """
+    started = time.monotonic()
+    audio_queue = queue.Queue(maxsize=2)
+
+    def produce():
+        try:
+            for chunk in chunks:
+                print("🗣️ TRAIT Buddy:", chunk)
+                audio = synthesize(chunk)
+                if audio:
+                    audio_queue.put(audio)
+        except Exception as e:
+            print(f"❌ Speech error: {e}")
+        finally:
+            audio_queue.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    first_audio = None
+    while True:
+        audio = audio_queue.get()
+        if audio is None:
+            return first_audio
+        if first_audio is None:
+            first_audio = time.monotonic() - started
+        play(audio)